@@ -0,0 +1,192 @@
+"""
+AQLHR Employee Change Feed
+==========================
+
+Append-only log of employee changes with monotonic sequence numbers. Recent
+changes live in an in-memory ring buffer; when a directory is configured,
+every change is also appended to rotating JSON-lines segment files, so
+consumers can catch up from further back and sequence numbers survive a
+restart.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+import asyncio
+import bisect
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+_SEQ_PREFIX = '{"seq": '
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class ChangeFeedGap(Exception):
+    """Raised when the changes after `since` are no longer (or not yet) available"""
+
+
+class ChangeFeed:
+    """Sequence-numbered change log: ring buffer plus optional segment files"""
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        segment_dir: Optional[str] = None,
+        segment_size: int = 10_000,
+        max_segments: int = 100
+    ):
+        self.capacity = capacity
+        self.segment_dir = segment_dir
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        # Change with sequence number n lives at ring[n % capacity]
+        self.ring: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self.first_seq = 1
+        self.last_seq = 0
+        self._changed = asyncio.Event()
+
+        # First sequence number of each segment file, ascending
+        self.segments: List[int] = []
+        self._segment_file = None
+        self._segment_count = 0
+        if segment_dir:
+            os.makedirs(segment_dir, exist_ok=True)
+            self._load_segments()
+
+    def _segment_path(self, first_seq: int) -> str:
+        return os.path.join(self.segment_dir, f"changes-{first_seq:012d}.jsonl")
+
+    def _load_segments(self) -> None:
+        """Resume numbering after the newest change on disk and warm the ring"""
+        self.segments = sorted(
+            int(name[len("changes-"):-len(".jsonl")])
+            for name in os.listdir(self.segment_dir)
+            if name.startswith("changes-") and name.endswith(".jsonl")
+        )
+        if not self.segments:
+            return
+        changes = list(self._read_segment(self.segments[-1]))
+        self._segment_count = len(changes)
+        if changes:
+            self.last_seq = changes[-1]['seq']
+            for change in changes[-self.capacity:]:
+                self._remember(change)
+            self.first_seq = changes[-self.capacity:][0]['seq']
+        else:
+            self.last_seq = self.segments[-1] - 1
+            self.first_seq = self.last_seq + 1
+        logger.info(f"Change feed resumed at sequence {self.last_seq} from {len(self.segments)} segments")
+
+    def _read_segment(self, first_seq: int, since: int = 0) -> Iterator[Dict[str, Any]]:
+        """Changes in one segment file with seq > since"""
+        with open(self._segment_path(first_seq), encoding='utf-8') as f:
+            for line in f:
+                # Lines start with '{"seq": N,' so older changes are skipped unparsed
+                if line.startswith(_SEQ_PREFIX):
+                    seq = line[len(_SEQ_PREFIX):line.find(',')]
+                    if seq.isdigit() and int(seq) <= since:
+                        continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn line from a crash mid-write
+                    continue
+
+    def _remember(self, change: Dict[str, Any]) -> None:
+        self.ring[change['seq'] % self.capacity] = change
+        self.first_seq = max(self.first_seq, change['seq'] - self.capacity + 1)
+
+    def _persist(self, change: Dict[str, Any]) -> None:
+        if self._segment_file is None or self._segment_count >= self.segment_size:
+            if self._segment_file is not None:
+                self._segment_file.close()
+            if self._segment_count >= self.segment_size or not self.segments:
+                self.segments.append(change['seq'])
+                self._segment_count = 0
+            path = self._segment_path(self.segments[-1])
+            torn = os.path.exists(path) and os.path.getsize(path) and not _ends_with_newline(path)
+            self._segment_file = open(path, 'a', encoding='utf-8')
+            if torn:
+                self._segment_file.write("\n")
+            while len(self.segments) > self.max_segments:
+                os.remove(self._segment_path(self.segments.pop(0)))
+        self._segment_file.write(json.dumps(change, default=str) + "\n")
+        self._segment_file.flush()
+        self._segment_count += 1
+
+    def append(self, op: str, employee_id: str, data: Optional[Dict[str, Any]] = None,
+               fields: Optional[List[str]] = None) -> int:
+        """Record one change and wake waiting consumers; returns its sequence number"""
+        self.last_seq += 1
+        change = {
+            'seq': self.last_seq,
+            'op': op,
+            'employee_id': employee_id,
+            'at': datetime.now().isoformat(),
+            'fields': fields,
+            'data': data
+        }
+        self._remember(change)
+        if self.segment_dir:
+            self._persist(change)
+
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        return self.last_seq
+
+    def advance_to(self, seq: int) -> None:
+        """Continue numbering after `seq` when the feed is behind it, e.g. an
+        in-memory feed restarted from a snapshot; earlier changes are a gap"""
+        if seq > self.last_seq:
+            self.last_seq = seq
+            self.first_seq = seq + 1
+
+    def check(self, since: int) -> None:
+        """Raise ChangeFeedGap unless every change after `since` is retained.
+
+        That fails when old changes have been dropped, or when `since` is
+        ahead of the feed (e.g. after a restart without segment files).
+        """
+        if since > self.last_seq:
+            raise ChangeFeedGap(f"Sequence {since} is ahead of the feed (latest {self.last_seq})")
+        if since + 1 < self.first_seq and (not self.segments or since + 1 < self.segments[0]):
+            raise ChangeFeedGap(f"Changes after sequence {since} are no longer retained")
+
+    def read(self, since: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Up to `limit` changes with seq > since, oldest first; raises ChangeFeedGap"""
+        self.check(since)
+        if since + 1 >= self.first_seq:
+            stop = min(self.last_seq, since + limit)
+            return [self.ring[seq % self.capacity] for seq in range(since + 1, stop + 1)]
+        return self._read_segments(since, limit)
+
+    def _read_segments(self, since: int, limit: int) -> List[Dict[str, Any]]:
+        position = bisect.bisect_right(self.segments, since + 1) - 1
+        changes: List[Dict[str, Any]] = []
+        for first_seq in self.segments[position:]:
+            for change in self._read_segment(first_seq, since):
+                changes.append(change)
+                if len(changes) >= limit:
+                    return changes
+        return changes
+
+    async def wait(self, since: int, timeout: float) -> None:
+        """Return once a change after `since` exists, or after `timeout` seconds"""
+        if since < self.last_seq or timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def close(self) -> None:
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
@@ -0,0 +1,55 @@
+"""Shared fixtures for the employee service tests"""
+
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+import employee_service as svc
+from change_feed import ChangeFeed
+from payroll import PayrollStore
+
+DEPARTMENTS = ("HR", "IT", "Finance", "Operations")
+
+
+def employee_row(seq: int, **fields: Any) -> Dict[str, Any]:
+    """EmployeeCreate payload for employee `seq`, with `fields` overridden"""
+    return {
+        'first_name': f"First{seq}",
+        'last_name': f"Last{seq}",
+        'email': f"employee{seq}@example.sa",
+        'phone': "0500000000",
+        'national_id': f"{1000000000 + seq}",
+        'date_of_birth': "1990-01-01",
+        'nationality': "SA",
+        'is_saudi': bool(seq % 3),
+        'department_id': DEPARTMENTS[seq % len(DEPARTMENTS)],
+        'position_title': "Specialist",
+        'hire_date': "2024-01-01",
+        'contract_type': "permanent",
+        'salary': 8000.0,
+        **fields
+    }
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """employee_service with empty in-memory stores and indexes, a fresh
+    change feed and payroll store, and sequence and job files under tmp_path"""
+    monkeypatch.setattr(svc, "change_feed", ChangeFeed())
+    monkeypatch.setattr(svc, "payroll_runs", PayrollStore())
+    monkeypatch.setattr(svc, "SNAPSHOT_PATH", None)
+    svc.open_storage("memory")
+    svc.open_sequence_allocator(str(tmp_path / "employee_sequences.db"))
+    svc.open_job_queue(str(tmp_path / "jobs.db"))
+    svc.rebuild_indexes()
+    svc.performance_columns.clear()
+    yield svc
+    svc.job_queue.close()
+    svc.employee_number_allocator.close()
+
+
+@pytest.fixture
+def client(service):
+    """Test client of the service; startup hooks (storage, workers) do not run"""
+    return TestClient(service.app)
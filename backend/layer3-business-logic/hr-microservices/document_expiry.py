@@ -0,0 +1,71 @@
+"""
+AQLHR Document Expiry Index
+===========================
+
+Employee documents (iqama, passport, contracts, ...) ordered by expiry date,
+so "what expires in the next 30 days" is a binary search plus a slice rather
+than a scan of every employee's document list.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentExpiryIndex:
+    """Documents with an expiry date, kept sorted by (expiry_date, id)"""
+
+    def __init__(self):
+        self.entries: List[Tuple[date, str]] = []
+        self.documents: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.documents.clear()
+
+    def add(self, document: Any) -> None:
+        """Index a document; documents without an expiry date are ignored"""
+        if document.expiry_date is None:
+            return
+        if document.id in self.documents:
+            self.remove(document.id)
+        self.documents[document.id] = document
+        bisect.insort(self.entries, (document.expiry_date, document.id))
+
+    def remove(self, document_id: str) -> None:
+        document = self.documents.pop(document_id, None)
+        if document is None:
+            return
+        key = (document.expiry_date, document_id)
+        position = bisect.bisect_left(self.entries, key)
+        if position < len(self.entries) and self.entries[position] == key:
+            del self.entries[position]
+
+    def iter_range(self, start: Optional[date], end: date) -> Iterator[Any]:
+        """Documents expiring in [start, end) in expiry order; start=None means no lower bound"""
+        position = 0 if start is None else bisect.bisect_left(self.entries, (start,))
+        stop = bisect.bisect_left(self.entries, (end,))
+        for index in range(position, stop):
+            yield self.documents[self.entries[index][1]]
+
+    def expiring(
+        self,
+        start: Optional[date],
+        end: date,
+        document_type: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Any]:
+        """Up to `limit` documents expiring in [start, end), optionally of one type"""
+        documents = []
+        for document in self.iter_range(start, end):
+            if len(documents) >= limit:
+                break
+            if document_type is None or document.document_type == document_type:
+                documents.append(document)
+        return documents
@@ -0,0 +1,1182 @@
+"""
+AQLHR Employee Service Benchmarks
+=================================
+
+Micro-benchmarks for the employee microservice hot paths. Each benchmark
+populates the in-memory stores with synthetic employees and reports latency
+at increasing headcounts.
+
+Usage:
+    python employee_benchmarks.py [benchmark] [size ...]
+"""
+
+from datetime import datetime, date, timedelta
+from typing import Callable, Dict, List
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import employee_service as svc
+from change_feed import ChangeFeed, ChangeFeedGap
+from job_queue import JobQueue, WorkerPool
+from performance_analytics import PerformanceGroupBy
+from snapshots import write_snapshot
+from employee_storage import ColumnarEmployeeTable, ColumnarStorage, EmployeeDict, InMemoryStorage, SQLiteStorage
+from employee_service import (
+    ContractType,
+    Employee,
+    EmployeeDocument,
+    EmployeePerformance,
+    EmployeeService,
+    EmployeeStatus,
+)
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEPARTMENTS = [f"DEPT-{i:02d}" for i in range(20)]
+
+
+def reset_stores() -> None:
+    """Clear all module-level stores and indexes"""
+    svc.employees_db.clear()
+    svc.performance_db.clear()
+    svc.documents_db.clear()
+    svc.onboarding_db.clear()
+    svc.employee_number_index.clear()
+    svc.national_id_index.clear()
+    svc.email_index.clear()
+    svc.filter_index.clear()
+    svc.workforce_counters.clear()
+    svc.saudization.clear()
+    svc.creation_order.clear()
+    svc.onboarding_task_index.clear()
+    svc.performance_columns.clear()
+    svc.document_expiry_index.clear()
+    svc.reporting_lines.clear()
+    svc.employee_search.clear()
+    svc.employment_db.clear()
+    svc.employment_intervals.clear()
+    svc.employee_json.clear()
+    svc.onboarding_json.clear()
+
+
+def make_employee(seq: int) -> Employee:
+    """Build a synthetic employee without running full validation"""
+    now = datetime.now()
+    return Employee.model_construct(
+        id=str(uuid.uuid4()),
+        employee_number=f"EMP-{now.year}-{seq:04d}",
+        created_at=now,
+        updated_at=now,
+        created_by="benchmark",
+        updated_by="benchmark",
+        first_name=f"First{seq % 500}",
+        last_name=f"Last{seq}",
+        first_name_ar=None,
+        last_name_ar=None,
+        email=f"employee{seq}@example.sa",
+        phone="0500000000",
+        national_id=f"{1000000000 + seq}",
+        date_of_birth=date(1990, 1, 1),
+        nationality="SA" if seq % 3 else "EG",
+        is_saudi=bool(seq % 3),
+        department_id=DEPARTMENTS[seq % len(DEPARTMENTS)],
+        position_title="Specialist",
+        position_title_ar=None,
+        manager_id=None,
+        hire_date=date(2020, 1, 1),
+        contract_type=ContractType.PERMANENT,
+        salary=8000.0 + seq % 5000,
+        status=EmployeeStatus.ACTIVE,
+    )
+
+
+def populate(size: int) -> List[Employee]:
+    """Fill the stores with `size` employees, maintaining all indexes"""
+    reset_stores()
+    employees = []
+    for seq in range(1, size + 1):
+        employee = make_employee(seq)
+        svc.employees_db[employee.id] = employee
+        EmployeeService._index_employee(employee)
+        employees.append(employee)
+    return employees
+
+
+def time_async(fn: Callable, iterations: int) -> float:
+    """Run an async callable `iterations` times and return mean microseconds"""
+    async def run():
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await fn()
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    return elapsed / iterations * 1_000_000
+
+
+def bench_lookups(sizes: List[int]) -> List[Dict[str, float]]:
+    """Lookup latency by employee number, national ID and email"""
+    results = []
+    for size in sizes:
+        employees = populate(size)
+        sample = random.sample(employees, min(1000, size))
+        cursor = iter(sample * 10)
+
+        row = {'size': size}
+        row['by_number_us'] = time_async(
+            lambda: EmployeeService.get_employee_by_number(next(cursor).employee_number), 5000
+        )
+        cursor = iter(sample * 10)
+        row['by_national_id_us'] = time_async(
+            lambda: EmployeeService.get_employee_by_national_id(next(cursor).national_id), 5000
+        )
+        cursor = iter(sample * 10)
+        row['by_email_us'] = time_async(
+            lambda: EmployeeService.get_employee_by_email(next(cursor).email), 5000
+        )
+        results.append(row)
+        print(
+            f"{size:>9,} employees | number {row['by_number_us']:6.2f} us"
+            f" | national_id {row['by_national_id_us']:6.2f} us"
+            f" | email {row['by_email_us']:6.2f} us"
+        )
+    reset_stores()
+    return results
+
+
+def bench_list_filters(sizes: List[int]) -> List[Dict[str, float]]:
+    """list_employees latency for common filter combinations"""
+    scenarios = {
+        'no_filter': {},
+        'department': {'department_id': DEPARTMENTS[3]},
+        'dept_status_saudi': {
+            'department_id': DEPARTMENTS[3],
+            'status': EmployeeStatus.ACTIVE,
+            'is_saudi': True,
+        },
+        'deep_page': {'status': EmployeeStatus.ACTIVE, 'skip': 0},
+    }
+    results = []
+    for size in sizes:
+        populate(size)
+        scenarios['deep_page']['skip'] = size // 2
+        row = {'size': size}
+        for name, kwargs in scenarios.items():
+            row[f'{name}_us'] = time_async(
+                lambda: EmployeeService.list_employees(limit=100, **kwargs), 200
+            )
+        results.append(row)
+        print(f"{size:>9,} employees | " + " | ".join(
+            f"{name} {row[f'{name}_us']:8.1f} us" for name in scenarios
+        ))
+    reset_stores()
+    return results
+
+
+def bench_statistics(sizes: List[int]) -> List[Dict[str, float]]:
+    """Statistics summary latency from counters vs. a verifying recompute"""
+    results = []
+    for size in sizes:
+        populate(size)
+        row = {'size': size}
+        row['summary_us'] = time_async(EmployeeService.get_employee_statistics, 1000)
+        row['verify_us'] = time_async(
+            lambda: EmployeeService.get_employee_statistics(verify=True), 3
+        )
+        results.append(row)
+        print(
+            f"{size:>9,} employees | summary {row['summary_us']:8.1f} us"
+            f" | verify {row['verify_us']:12.1f} us"
+        )
+    reset_stores()
+    return results
+
+
+def bench_cursor_pages(sizes: List[int]) -> List[Dict[str, float]]:
+    """Deep-page latency: offset pagination vs. keyset cursors"""
+    results = []
+    for size in sizes:
+        employees = populate(size)
+        cursor = EmployeeService.encode_cursor(employees[size // 2])
+        row = {'size': size}
+        row['offset_deep_us'] = time_async(
+            lambda: EmployeeService.list_employees(is_saudi=True, skip=size // 3, limit=100), 200
+        )
+        row['cursor_deep_us'] = time_async(
+            lambda: EmployeeService.list_employees_after(cursor=cursor, is_saudi=True, limit=100), 200
+        )
+        results.append(row)
+        print(
+            f"{size:>9,} employees | offset {row['offset_deep_us']:8.1f} us"
+            f" | cursor {row['cursor_deep_us']:8.1f} us"
+        )
+    reset_stores()
+    return results
+
+
+def make_create_row(seq: int) -> Dict[str, object]:
+    """Raw EmployeeCreate payload as a bulk client would send it"""
+    return {
+        'first_name': f"First{seq}",
+        'last_name': f"Last{seq}",
+        'email': f"employee{seq}@example.sa",
+        'phone': "0500000000",
+        'national_id': f"{1000000000 + seq}",
+        'date_of_birth': "1990-01-01",
+        'nationality': "SA",
+        'is_saudi': bool(seq % 3),
+        'department_id': DEPARTMENTS[seq % len(DEPARTMENTS)],
+        'position_title': "Specialist",
+        'hire_date': "2024-01-01",
+        'contract_type': "permanent",
+        'salary': 8000.0,
+    }
+
+
+def bench_bulk_create(sizes: List[int]) -> List[Dict[str, float]]:
+    """Bulk ingestion throughput vs. one create_employee call per row"""
+    results = []
+    for size in sizes:
+        rows = [make_create_row(seq) for seq in range(1, size + 1)]
+        row = {'size': size}
+
+        reset_stores()
+        start = time.perf_counter()
+        asyncio.run(EmployeeService.bulk_create_employees(rows, "benchmark"))
+        row['bulk_rows_per_s'] = size / (time.perf_counter() - start)
+
+        reset_stores()
+        sample = rows[:min(size, 5000)]
+
+        async def create_one_by_one():
+            for payload in sample:
+                await EmployeeService.create_employee(svc.EmployeeCreate(**payload), "benchmark")
+
+        start = time.perf_counter()
+        asyncio.run(create_one_by_one())
+        row['single_rows_per_s'] = len(sample) / (time.perf_counter() - start)
+
+        results.append(row)
+        print(
+            f"{size:>9,} rows | bulk {row['bulk_rows_per_s']:10,.0f} rows/s"
+            f" | single {row['single_rows_per_s']:10,.0f} rows/s"
+        )
+    reset_stores()
+    return results
+
+
+def bench_bulk_update(sizes: List[int]) -> List[Dict[str, float]]:
+    """Salary-revision batch vs. one update_employee call per employee"""
+    results = []
+    for size in sizes:
+        employees = populate(size)
+        rows = [
+            {'id': employee.id, 'version': employee.version, 'salary': employee.salary * 1.05}
+            for employee in employees
+        ]
+        row = {'size': size}
+
+        start = time.perf_counter()
+        asyncio.run(EmployeeService.bulk_update_employees(rows, "benchmark"))
+        row['bulk_rows_per_s'] = size / (time.perf_counter() - start)
+
+        sample = employees[:min(size, 5000)]
+
+        async def update_one_by_one():
+            for employee in sample:
+                await EmployeeService.update_employee(
+                    employee.id, svc.EmployeeUpdate(salary=employee.salary + 100), "benchmark"
+                )
+
+        start = time.perf_counter()
+        asyncio.run(update_one_by_one())
+        row['single_rows_per_s'] = len(sample) / (time.perf_counter() - start)
+
+        results.append(row)
+        print(
+            f"{size:>9,} rows | bulk {row['bulk_rows_per_s']:10,.0f} rows/s"
+            f" | single {row['single_rows_per_s']:10,.0f} rows/s"
+        )
+    reset_stores()
+    return results
+
+
+def bench_export(sizes: List[int]) -> List[Dict[str, float]]:
+    """Streaming export throughput and peak traced memory"""
+    import tracemalloc
+
+    results = []
+    for size in sizes:
+        populate(size)
+        row = {'size': size}
+        for export_format in ("ndjson", "csv"):
+            tracemalloc.start()
+            start = time.perf_counter()
+            exported = sum(len(chunk) for chunk in EmployeeService.export_employees(export_format))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            row[f'{export_format}_rows_per_s'] = size / elapsed
+            row[f'{export_format}_peak_kb'] = peak / 1024
+            row[f'{export_format}_mb'] = exported / 1024 / 1024
+        results.append(row)
+        print(f"{size:>9,} employees | " + " | ".join(
+            f"{fmt} {row[f'{fmt}_rows_per_s']:9,.0f} rows/s, peak {row[f'{fmt}_peak_kb']:7.0f} KiB"
+            for fmt in ("ndjson", "csv")
+        ))
+    reset_stores()
+    return results
+
+
+def bench_storage(sizes: List[int]) -> List[Dict[str, float]]:
+    """create/get/list throughput for the in-memory and SQLite backends"""
+    results = []
+    record_models = {
+        'performance': svc.EmployeePerformance,
+        'documents': svc.EmployeeDocument,
+        'onboarding': svc.OnboardingTask,
+        'employment': svc.EmploymentInterval,
+    }
+    original = svc.storage
+    for size in sizes:
+        for backend in ("memory", "sqlite"):
+            with tempfile.TemporaryDirectory() as tmp:
+                if backend == "memory":
+                    svc.use_storage(InMemoryStorage())
+                else:
+                    svc.use_storage(SQLiteStorage(os.path.join(tmp, "bench.db"), Employee, record_models))
+
+                payloads = [svc.EmployeeCreate(**make_create_row(seq)) for seq in range(1, size + 1)]
+
+                async def create_all():
+                    for payload in payloads:
+                        await EmployeeService.create_employee(payload, "benchmark")
+
+                start = time.perf_counter()
+                asyncio.run(create_all())
+                svc.storage.flush()
+                create_rate = size / (time.perf_counter() - start)
+
+                ids = random.sample(list(svc.creation_order), min(size, 2000))
+                cursor = iter(ids * 5)
+                get_us = time_async(lambda: EmployeeService.get_employee(next(cursor)[1]), len(ids) * 5)
+                list_us = time_async(
+                    lambda: EmployeeService.list_employees(department_id=DEPARTMENTS[1], limit=100), 200
+                )
+
+                row = {'size': size, 'backend': backend, 'create_per_s': create_rate,
+                       'get_us': get_us, 'list_us': list_us}
+                results.append(row)
+                print(
+                    f"{size:>9,} employees | {backend:<6} | create {create_rate:8,.0f}/s"
+                    f" | get {get_us:7.1f} us | list(100) {list_us:8.1f} us"
+                )
+                svc.storage.close()
+    svc.use_storage(original)
+    return results
+
+
+def bench_memory(sizes: List[int]) -> List[Dict[str, float]]:
+    """Retained bytes per employee: dict of Employee models vs. columnar store"""
+    import tracemalloc
+
+    packed_fields = ('employee_number', 'national_id', 'email', 'phone', 'last_name', 'last_name_ar')
+    results = []
+    for size in sizes:
+        row = {'size': size}
+        for name, factory in (
+            ('dict', EmployeeDict),
+            ('columnar', lambda: ColumnarEmployeeTable(Employee, packed_fields)),
+        ):
+            tracemalloc.start()
+            baseline, _ = tracemalloc.get_traced_memory()
+            store = factory()
+            for seq in range(1, size + 1):
+                employee = Employee(**make_employee(seq).__dict__)
+                store[employee.id] = employee
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            row[f'{name}_bytes_per_employee'] = (current - baseline) / size
+            del store
+        results.append(row)
+        print(
+            f"{size:>9,} employees | dict {row['dict_bytes_per_employee']:7.0f} B/employee"
+            f" | columnar {row['columnar_bytes_per_employee']:7.0f} B/employee"
+        )
+    return results
+
+
+def bench_job_queue(sizes: List[int]) -> List[Dict[str, float]]:
+    """Enqueue latency during a hire burst and worker-pool drain rate"""
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            queue = JobQueue(os.path.join(tmp, "jobs.db"))
+            start = time.perf_counter()
+            for seq in range(size):
+                queue.enqueue("noop", {'employee_id': str(seq)})
+            enqueue_us = (time.perf_counter() - start) / size * 1_000_000
+
+            async def handler(payload):
+                await asyncio.sleep(0.001)
+
+            async def drain():
+                pool = WorkerPool(queue, {"noop": handler}, workers=16, poll_interval=0.01)
+                await pool.start()
+                while queue.stats()['by_status']['completed'] < size:
+                    await asyncio.sleep(0.05)
+                await pool.stop()
+
+            start = time.perf_counter()
+            asyncio.run(drain())
+            drain_rate = size / (time.perf_counter() - start)
+            queue.close()
+
+        row = {'size': size, 'enqueue_us': enqueue_us, 'drain_per_s': drain_rate}
+        results.append(row)
+        print(f"{size:>9,} jobs | enqueue {enqueue_us:7.1f} us/job | drain {drain_rate:9,.0f} jobs/s")
+    return results
+
+
+def bench_onboarding_queues(sizes: List[int]) -> List[Dict[str, float]]:
+    """Per-assignee queue, overdue list and task completion latency"""
+    results = []
+    for size in sizes:
+        reset_stores()
+        employees = [make_employee(seq) for seq in range(size)]
+        for employee in employees:
+            svc.employees_db[employee.id] = employee
+        start_date = date.today() - timedelta(days=3)
+        for employee in employees:
+            svc.onboarding_db[employee.id] = EmployeeService._build_onboarding_tasks(employee, start_date)
+        as_of = date.today()
+
+        async def queue():
+            svc.onboarding_task_index.queue('IT_DEPARTMENT', 50)
+
+        async def overdue():
+            svc.onboarding_task_index.overdue('COMPLIANCE_TEAM', as_of, 50)
+
+        async def summary():
+            svc.onboarding_task_index.overdue_summary(as_of)
+
+        queue_us = time_async(queue, 200)
+        overdue_us = time_async(overdue, 200)
+        summary_us = time_async(summary, 200)
+
+        sample = iter(random.sample(employees, min(1000, size)))
+
+        async def complete():
+            employee = next(sample)
+            task_id = svc.onboarding_db[employee.id][0].id
+            await EmployeeService.complete_onboarding_task(employee.id, task_id)
+
+        complete_us = time_async(complete, min(1000, size))
+
+        row = {
+            'size': size, 'queue_us': queue_us, 'overdue_us': overdue_us,
+            'summary_us': summary_us, 'complete_us': complete_us
+        }
+        results.append(row)
+        print(
+            f"{size:>9,} hires | queue(50) {queue_us:7.1f} us | overdue(50) {overdue_us:7.1f} us"
+            f" | summary {summary_us:7.1f} us | complete {complete_us:7.1f} us"
+        )
+    return results
+
+
+def bench_performance_analytics(sizes: List[int]) -> List[Dict[str, float]]:
+    """Review ingest cost and analytics latency per grouping"""
+    competencies = ['communication', 'teamwork', 'leadership', 'technical', 'initiative']
+    periods = [f"{year}-H{half}" for year in (2023, 2024) for half in (1, 2)]
+    results = []
+    for size in sizes:
+        reset_stores()
+        employees = [make_employee(seq) for seq in range(max(1, size // 4))]
+        for employee in employees:
+            employee.manager_id = f"MGR-{hash(employee.id) % 500}"
+        reviews = [
+            (employee, EmployeePerformance.model_construct(
+                employee_id=employee.id,
+                review_period=periods[seq % len(periods)],
+                overall_rating=round(random.uniform(1, 5), 1),
+                goals_achievement=random.uniform(0, 100),
+                competency_scores={name: random.uniform(1, 5) for name in random.sample(competencies, 3)},
+                feedback="",
+                reviewer_id="benchmark",
+                review_date=datetime.now()
+            ))
+            for seq, employee in enumerate(employees * 4)
+        ]
+
+        start = time.perf_counter()
+        for employee, review in reviews:
+            svc.performance_columns.add_review(employee.id, review, employee.department_id, employee.manager_id)
+        ingest_us = (time.perf_counter() - start) / len(reviews) * 1_000_000
+
+        row = {'size': len(reviews), 'ingest_us': ingest_us}
+        for group_by in PerformanceGroupBy:
+            async def summarize():
+                svc.performance_columns.summary(group_by)
+            row[f"{group_by.value}_ms"] = time_async(summarize, 5) / 1000
+        results.append(row)
+        print(
+            f"{len(reviews):>9,} reviews | ingest {ingest_us:5.1f} us | by department {row['department_ms']:7.1f} ms"
+            f" | by manager {row['manager_ms']:7.1f} ms | by period {row['period_ms']:7.1f} ms"
+        )
+    return results
+
+
+def bench_document_expiry(sizes: List[int]) -> List[Dict[str, float]]:
+    """Document add/remove cost and 30-day expiry range query latency"""
+    document_types = ['iqama', 'passport', 'contract', 'medical']
+    results = []
+    for size in sizes:
+        reset_stores()
+        today = date.today()
+        documents = [
+            EmployeeDocument.model_construct(
+                id=str(uuid.uuid4()),
+                employee_id=str(seq),
+                document_type=document_types[seq % len(document_types)],
+                document_name=f"doc-{seq}",
+                file_path=f"/docs/{seq}",
+                uploaded_by="benchmark",
+                uploaded_at=datetime.now(),
+                expiry_date=today + timedelta(days=random.randint(-365, 3 * 365))
+            )
+            for seq in range(size)
+        ]
+
+        start = time.perf_counter()
+        for document in documents:
+            svc.document_expiry_index.add(document)
+        add_us = (time.perf_counter() - start) / size * 1_000_000
+
+        end = today + timedelta(days=30)
+
+        async def expiring():
+            svc.document_expiry_index.expiring(today, end, 'iqama', 100)
+
+        range_us = time_async(expiring, 200)
+
+        sample = random.sample(documents, min(1000, size))
+        start = time.perf_counter()
+        for document in sample:
+            svc.document_expiry_index.remove(document.id)
+        remove_us = (time.perf_counter() - start) / len(sample) * 1_000_000
+
+        row = {'size': size, 'add_us': add_us, 'range_us': range_us, 'remove_us': remove_us}
+        results.append(row)
+        print(
+            f"{size:>9,} documents | add {add_us:5.1f} us | 30-day iqama range(100) {range_us:7.1f} us"
+            f" | remove {remove_us:5.1f} us"
+        )
+    return results
+
+
+def bench_reporting_lines(sizes: List[int]) -> List[Dict[str, float]]:
+    """Subtree headcount, listing and span-of-control on a depth ~12 org tree"""
+    results = []
+    for size in sizes:
+        employees = populate(size)
+        # Branching factor 3 gives depth ~10-12 at 10k-1M employees
+        for position, employee in enumerate(employees[1:], start=1):
+            employee.manager_id = employees[(position - 1) // 3].id
+            svc.reporting_lines.set(employee.id, employee.manager_id)
+        vp = employees[1]
+        director = employees[13]
+
+        async def headcount():
+            svc.reporting_lines.headcount(vp.id)
+
+        async def list_page():
+            await EmployeeService.list_reports(vp.id, is_saudi=False, limit=100)
+
+        async def span():
+            svc.reporting_lines.span_of_control(director.id)
+
+        headcount_us = time_async(headcount, 1000)
+        list_us = time_async(list_page, 50)
+        span_us = time_async(span, 20)
+
+        movers = random.sample(employees[40:], min(1000, size - 40))
+        start = time.perf_counter()
+        for employee in movers:
+            svc.reporting_lines.set(employee.id, employees[random.randrange(1, 40)].id)
+        move_us = (time.perf_counter() - start) / len(movers) * 1_000_000
+
+        row = {
+            'size': size, 'headcount_us': headcount_us, 'list_us': list_us,
+            'span_us': span_us, 'director_headcount': svc.reporting_lines.headcount(director.id),
+            'move_us': move_us
+        }
+        results.append(row)
+        print(
+            f"{size:>9,} employees | headcount {headcount_us:5.2f} us | list(100) {list_us:8.1f} us"
+            f" | span({row['director_headcount']:,}) {span_us / 1000:7.1f} ms | move {move_us:5.1f} us"
+        )
+    return results
+
+
+SEARCH_NAMES = [
+    ('Mohammed', 'محمد'), ('Ahmed', 'أحمد'), ('Abdullah', 'عبدالله'), ('Fatimah', 'فاطمة'),
+    ('Noura', 'نورة'), ('Khalid', 'خالد'), ('Sarah', 'سارة'), ('Omar', 'عمر'),
+    ('Aisha', 'عائشة'), ('Youssef', 'يوسف'), ('Ibrahim', 'إبراهيم'), ('Mustafa', 'مصطفى'),
+    ('Huda', 'هدى'), ('Faisal', 'فيصل'), ('Reem', 'ريم'), ('Sultan', 'سلطان'),
+]
+SEARCH_FAMILIES = [
+    ('Al-Qahtani', 'القحطاني'), ('Al-Otaibi', 'العتيبي'), ('Al-Ghamdi', 'الغامدي'),
+    ('Al-Harbi', 'الحربي'), ('Al-Zahrani', 'الزهراني'), ('Al-Shammari', 'الشمري'),
+    ('Al-Dosari', 'الدوسري'), ('Al-Mutairi', 'المطيري'), ('Al-Anazi', 'العنزي'),
+]
+SEARCH_TITLES = [
+    ('Software Engineer', 'مهندس برمجيات'), ('HR Specialist', 'أخصائي موارد بشرية'),
+    ('Accountant', 'محاسب'), ('Sales Manager', 'مدير مبيعات'), ('Nurse', 'ممرضة'),
+]
+
+
+def bench_search(sizes: List[int]) -> List[Dict[str, float]]:
+    """Index cost and p50/p99 latency for a mix of bilingual search queries"""
+    queries = [
+        'mohammed', 'moham', 'mohamed al-qahtani', 'محمد', 'مُحَمَّد القحطاني', 'احمد',
+        'ibrahim engineer', 'fatima', 'نوره', 'zahrani 1234', 'accountant', 'sultan al-dosary',
+    ]
+    results = []
+    for size in sizes:
+        reset_stores()
+        records = []
+        for seq in range(size):
+            first, first_ar = SEARCH_NAMES[seq % len(SEARCH_NAMES)]
+            family, family_ar = SEARCH_FAMILIES[seq // len(SEARCH_NAMES) % len(SEARCH_FAMILIES)]
+            title, title_ar = SEARCH_TITLES[seq % len(SEARCH_TITLES)]
+            records.append((str(uuid.uuid4()), {
+                'first_name': first, 'first_name_ar': first_ar,
+                # A numeric suffix keeps the vocabulary growing with headcount
+                'last_name': f"{family} {seq % 5000}", 'last_name_ar': family_ar,
+                'position_title': title, 'position_title_ar': title_ar,
+            }))
+
+        start = time.perf_counter()
+        for employee_id, values in records:
+            svc.employee_search.add(employee_id, values)
+        index_us = (time.perf_counter() - start) / size * 1_000_000
+
+        timings = []
+        for _ in range(20):
+            for query in queries:
+                start = time.perf_counter()
+                svc.employee_search.search(query, 20)
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p99 = timings[int(len(timings) * 0.99)]
+
+        row = {'size': size, 'index_us': index_us, 'p50_ms': p50, 'p99_ms': p99}
+        results.append(row)
+        print(f"{size:>9,} employees | index {index_us:5.1f} us | search p50 {p50:6.2f} ms | p99 {p99:6.2f} ms")
+    return results
+
+
+def bench_change_feed(sizes: List[int]) -> List[Dict[str, float]]:
+    """Change append cost (ring only / with segment files) and catch-up read rate"""
+    employee = make_employee(1)
+    data = employee.model_dump(mode='json')
+    results = []
+    for size in sizes:
+        row: Dict[str, float] = {'size': size}
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, segment_dir in (('memory', None), ('segments', tmp)):
+                feed = ChangeFeed(capacity=max(1, size // 2), segment_dir=segment_dir)
+                start = time.perf_counter()
+                for _ in range(size):
+                    feed.append('updated', employee.id, data, ['salary'])
+                row[f"{name}_append_us"] = (time.perf_counter() - start) / size * 1_000_000
+
+                # Second half is served from the ring, first half from segments
+                start = time.perf_counter()
+                since = 0
+                try:
+                    while since < feed.last_seq:
+                        since = feed.read(since, 1000)[-1]['seq']
+                except ChangeFeedGap:
+                    since = feed.first_seq - 1
+                    while since < feed.last_seq:
+                        since = feed.read(since, 1000)[-1]['seq']
+                row[f"{name}_read_per_s"] = feed.last_seq / (time.perf_counter() - start)
+                feed.close()
+        results.append(row)
+        print(
+            f"{size:>9,} changes | append {row['memory_append_us']:5.1f} us (ring) "
+            f"{row['segments_append_us']:5.1f} us (segments) | catch-up {row['segments_read_per_s']:10,.0f} changes/s"
+        )
+    return results
+
+
+def bench_nitaqat(sizes: List[int]) -> List[Dict[str, float]]:
+    """Nitaqat summary latency and batch what-if scenario throughput"""
+    rng = random.Random(19)
+    contracts = list(svc.NITAQAT_CONTRACT_WEIGHTS)
+    scenarios = [
+        [
+            svc.NitaqatScenarioAction(
+                action=rng.choice(list(svc.ScenarioAction)),
+                department_id=rng.choice(DEPARTMENTS),
+                is_saudi=rng.random() < 0.5,
+                count=rng.randint(1, 50),
+                contract_type=rng.choice(contracts),
+                to_contract_type=rng.choice(contracts)
+            )
+            for _ in range(rng.randint(1, 5))
+        ]
+        for _ in range(10_000)
+    ]
+    results = []
+    for size in sizes:
+        populate(size)
+        row = {'size': size}
+        row['summary_us'] = time_async(lambda: asyncio.sleep(0, svc.saudization.summary()), 200)
+
+        start = time.perf_counter()
+        svc.saudization.evaluate(scenarios)
+        row['scenarios_per_s'] = len(scenarios) / (time.perf_counter() - start)
+
+        results.append(row)
+        print(
+            f"{size:>9,} employees | summary {row['summary_us']:7.1f} us"
+            f" | what-if {row['scenarios_per_s']:10,.0f} scenarios/s"
+        )
+    reset_stores()
+    return results
+
+
+def bench_payroll(sizes: List[int]) -> List[Dict[str, float]]:
+    """Monthly payroll run time (in memory / persisted) and payslip export rate"""
+    results = []
+    for size in sizes:
+        populate(size)
+        row: Dict[str, float] = {'size': size}
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, directory in (('memory', None), ('persisted', tmp)):
+                svc.payroll_runs = svc.PayrollStore(directory)
+                start = time.perf_counter()
+                run = asyncio.run(EmployeeService.run_payroll("2026-01", "benchmark"))
+                row[f"{name}_run_s"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in run.export("ndjson"):
+                pass
+            row['export_per_s'] = size / (time.perf_counter() - start)
+
+        results.append(row)
+        print(
+            f"{size:>9,} employees | run {row['memory_run_s'] * 1000:8.1f} ms"
+            f" ({row['persisted_run_s'] * 1000:8.1f} ms persisted)"
+            f" | export {row['export_per_s']:10,.0f} payslips/s"
+        )
+    svc.payroll_runs = svc.PayrollStore()
+    reset_stores()
+    return results
+
+
+def bench_employment_intervals(sizes: List[int]) -> List[Dict[str, float]]:
+    """Interval index rebuild rate, incremental hire/move latency,
+    point-in-time headcount latency and a five-year monthly series over
+    synthetic hire/move/termination histories"""
+    results = []
+    first_day = date(2015, 1, 1).toordinal()
+    for size in sizes:
+        rng = random.Random(size)
+        histories = []
+        for seq in range(size):
+            hired = first_day + rng.randrange(3650)
+            department_id = rng.choice(DEPARTMENTS)
+            ended = hired + rng.randrange(1000, 2000) if rng.random() < 0.15 else None
+            if rng.random() < 0.3:
+                moved = hired + rng.randrange(1, 1000)
+                intervals = [
+                    (department_id, date.fromordinal(hired), date.fromordinal(moved)),
+                    (rng.choice(DEPARTMENTS), date.fromordinal(moved), ended and date.fromordinal(ended))
+                ]
+            else:
+                intervals = [(department_id, date.fromordinal(hired), ended and date.fromordinal(ended))]
+            histories.append((f"E{seq}", intervals))
+
+        index = svc.EmploymentIntervalIndex()
+        start = time.perf_counter()
+        index.load_many(histories)
+        rebuild = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for seq in range(1000):
+            employee_id = f"NEW{seq}"
+            index.hire(employee_id, DEPARTMENTS[seq % len(DEPARTMENTS)], date(2025, 1, 1))
+            index.move(employee_id, DEPARTMENTS[(seq + 1) % len(DEPARTMENTS)], date(2025, 6, 1))
+        change_us = (time.perf_counter() - start) / 2000 * 1_000_000
+
+        days = [date.fromordinal(first_day + rng.randrange(4000)) for _ in range(1000)]
+        start = time.perf_counter()
+        for day in days:
+            index.headcount(day)
+        point_us = (time.perf_counter() - start) / len(days) * 1_000_000
+
+        start = time.perf_counter()
+        for day in days[:100]:
+            index.headcount_by_department(day)
+        by_department_us = (time.perf_counter() - start) / 100 * 1_000_000
+
+        start = time.perf_counter()
+        for _ in range(100):
+            index.monthly_series(date(2020, 1, 1), date(2024, 12, 31), DEPARTMENTS[1])
+        series_us = (time.perf_counter() - start) / 100 * 1_000_000
+
+        row = {
+            'size': size,
+            'rebuild_per_s': size / rebuild,
+            'change_us': change_us,
+            'headcount_us': point_us,
+            'by_department_us': by_department_us,
+            'monthly_series_us': series_us
+        }
+        results.append(row)
+        print(
+            f"{size:>9,} employees | rebuild {row['rebuild_per_s']:10,.0f}/s | hire/move {change_us:6.2f} us"
+            f" | headcount {point_us:6.2f} us | by department {by_department_us:7.1f} us"
+            f" | 60-month series {series_us:8.1f} us"
+        )
+    return results
+
+
+def bench_sparse_fields(sizes: List[int]) -> List[Dict[str, float]]:
+    """100-row GET /employees page: full response_model serialization versus
+    a fields=id,first_name,last_name projection, per storage backend"""
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    route = next(route for route in svc.app.routes if getattr(route, 'path', None) == "/employees"
+                 and "GET" in route.methods)
+    fields = ['id', 'first_name', 'last_name']
+    packed_fields = ('employee_number', 'national_id', 'email', 'phone', 'last_name', 'last_name_ar')
+    results = []
+    original = svc.storage
+    for size in sizes:
+        for backend in ("memory", "columnar"):
+            svc.use_storage(InMemoryStorage() if backend == "memory" else ColumnarStorage(Employee, packed_fields))
+            populate(size)
+
+            async def full_page():
+                employees = await EmployeeService.list_employees(skip=size // 2, limit=100)
+                content = await serialize_response(field=route.response_field, response_content=employees)
+                return JSONResponse(content).body
+
+            async def projected_page():
+                employees = await EmployeeService.list_employees(skip=size // 2, limit=100, fields=fields)
+                return svc.projected_json(employees, fields).body
+
+            full_bytes = len(asyncio.run(full_page()))
+            projected_bytes = len(asyncio.run(projected_page()))
+            row = {
+                'size': size,
+                'backend': backend,
+                'full_us': time_async(full_page, 200),
+                'projected_us': time_async(projected_page, 200),
+                'full_kb': full_bytes / 1024,
+                'projected_kb': projected_bytes / 1024
+            }
+            results.append(row)
+            print(
+                f"{size:>9,} employees | {backend:<8} | full {row['full_us']:8.0f} us, {row['full_kb']:6.1f} KiB"
+                f" | fields {row['projected_us']:6.0f} us, {row['projected_kb']:5.1f} KiB"
+                f" | {row['full_us'] / row['projected_us']:4.1f}x faster"
+            )
+    svc.use_storage(original)
+    reset_stores()
+    return results
+
+
+def bench_json_responses(sizes: List[int]) -> List[Dict[str, float]]:
+    """Response encoding: FastAPI's response_model validation plus
+    jsonable_encoder versus the cached serialized-bytes path, for a
+    100-row page, a single employee and an onboarding task list"""
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    def response_field(path: str):
+        return next(route for route in svc.app.routes if getattr(route, 'path', None) == path
+                    and "GET" in route.methods).response_field
+
+    list_field = response_field("/employees")
+    detail_field = response_field("/employees/{employee_id}")
+    onboarding_field = response_field("/employees/{employee_id}/onboarding")
+
+    async def generic(field, content):
+        return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+    results = []
+    for size in sizes:
+        employees = populate(size)
+        asyncio.run(EmployeeService.create_onboarding_tasks_bulk(employees[:1000]))
+        rng = random.Random(size)
+        pages = [rng.randrange(max(size - 100, 1)) for _ in range(50)]
+        sample = [employees[rng.randrange(min(size, 1000))] for _ in range(1000)]
+
+        def page(skip):
+            return asyncio.run(EmployeeService.list_employees(skip=skip, limit=100))
+
+        page_rows = [page(skip) for skip in pages]
+        row: Dict[str, float] = {'size': size}
+        for name, current, cached, items in (
+            ('page', lambda rows: generic(list_field, rows), svc.employees_json, page_rows),
+            ('detail', lambda employee: generic(detail_field, employee),
+             lambda employee: svc.json_response(svc.employee_json.get(employee.id, employee, employee.version)),
+             sample),
+            ('onboarding', lambda employee: generic(onboarding_field, svc.onboarding_db[employee.id]),
+             lambda employee: svc.json_response(
+                 svc.onboarding_json.get(employee.id, svc.onboarding_db[employee.id])
+             ),
+             sample),
+        ):
+            position = iter(items * 20)
+            row[f'{name}_generic_us'] = time_async(lambda: current(next(position)), len(items) * 5)
+
+            async def fast():
+                return cached(next(position))
+
+            svc.employee_json.clear()
+            svc.onboarding_json.clear()
+            position = iter(items * 20)
+            # First pass serializes each record once; the rest hit the cache
+            row[f'{name}_cold_us'] = time_async(fast, len(items))
+            row[f'{name}_cached_us'] = time_async(fast, len(items) * 4)
+
+        results.append(row)
+        print(f"{size:>9,} employees | " + " | ".join(
+            f"{name} {row[f'{name}_generic_us']:7.1f} -> {row[f'{name}_cold_us']:6.1f} cold,"
+            f" {row[f'{name}_cached_us']:6.1f} us cached"
+            for name in ('page', 'detail', 'onboarding')
+        ))
+    reset_stores()
+    return results
+
+
+def _shard_load(url: str, tenants: List[str], seconds: float, seed: int) -> int:
+    """One load-generator process: GET /employees pages for random tenants
+    through the router; returns requests completed"""
+    import httpx
+
+    rng = random.Random(seed)
+    completed = 0
+    deadline = time.perf_counter() + seconds
+    with httpx.Client(base_url=url, timeout=30) as client:
+        while time.perf_counter() < deadline:
+            client.get(
+                "/employees", params={'limit': 100}, headers={'X-Establishment-ID': rng.choice(tenants)}
+            ).raise_for_status()
+            completed += 1
+    return completed
+
+
+def _start_router(urls: List[str], tenants: List[str], port: int, workers: int) -> subprocess.Popen:
+    """uvicorn tenant_shards:app over the given shards, once it is healthy"""
+    import httpx
+
+    environment = dict(os.environ, SHARD_URLS=",".join(urls), EMPLOYEE_TENANTS=",".join(tenants))
+    environment.pop('TENANT_SHARDS_PATH', None)
+    router = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "tenant_shards:app", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning"
+        ],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=environment
+    )
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=5).status_code == 200:
+                return router
+        except httpx.TransportError:
+            pass
+        if router.poll() is not None or time.monotonic() > deadline:
+            router.kill()
+            raise RuntimeError("Shard router did not start")
+        time.sleep(0.1)
+
+
+def bench_tenant_shards(sizes: List[int]) -> List[Dict[str, float]]:
+    """GET /employees throughput through the router with 1, 2, 4 and 8
+    tenants, one shard process each.
+
+    Needs uvicorn, and one core per shard for the scaling to show. Each size
+    is split evenly across the tenants; the router runs one worker and two
+    load processes per shard.
+    """
+    import importlib.util
+    import multiprocessing
+
+    if importlib.util.find_spec("uvicorn") is None:
+        print("skipped: uvicorn is not installed")
+        return []
+    import httpx
+    from tenant_shards import ShardMap, ShardSupervisor
+
+    seconds = 5.0
+    results = []
+    for size in sizes:
+        for shards in (1, 2, 4, 8):
+            tenants = [f"EST-{i:03d}" for i in range(shards)]
+            with tempfile.TemporaryDirectory() as tmp:
+                supervisor = ShardSupervisor(ShardMap.from_tenants(tenants), 8201, tmp)
+                supervisor.start()
+                router = _start_router(supervisor.urls, tenants, 8200, shards)
+                url = "http://127.0.0.1:8200"
+                try:
+                    per_tenant = size // shards
+                    for position, tenant in enumerate(tenants):
+                        first = position * per_tenant + 1
+                        httpx.post(
+                            f"{url}/employees/bulk",
+                            json=[make_create_row(seq) for seq in range(first, first + per_tenant)],
+                            headers={'X-Establishment-ID': tenant},
+                            timeout=600
+                        ).raise_for_status()
+
+                    with multiprocessing.Pool(shards * 2) as pool:
+                        counts = pool.starmap(
+                            _shard_load, [(url, tenants, seconds, seed) for seed in range(shards * 2)]
+                        )
+                finally:
+                    router.terminate()
+                    router.wait()
+                    supervisor.stop()
+
+            row = {'size': size, 'shards': shards, 'requests_per_s': sum(counts) / seconds}
+            results.append(row)
+            print(f"{size:>9,} employees | {shards} shards | {row['requests_per_s']:8,.0f} req/s")
+    return results
+
+
+def bench_snapshots(sizes: List[int]) -> List[Dict[str, float]]:
+    """Startup time: reopening the SQLite backend (load + index rebuild)
+    versus restoring a snapshot of the memory and columnar backends, with
+    the snapshot encode/write cost and file size. The in-memory rebuild is
+    the lower bound of any startup that re-derives the indexes. Employees
+    carry their standard onboarding tasks."""
+    packed_fields = ('employee_number', 'national_id', 'email', 'phone', 'last_name', 'last_name_ar')
+    record_models = {
+        'performance': svc.EmployeePerformance,
+        'documents': svc.EmployeeDocument,
+        'onboarding': svc.OnboardingTask,
+        'employment': svc.EmploymentInterval,
+    }
+    results = []
+    original = svc.storage
+    for size in sizes:
+        for backend in ("sqlite", "memory", "columnar"):
+            with tempfile.TemporaryDirectory() as tmp:
+                database = os.path.join(tmp, "employees.db")
+                if backend == "sqlite":
+                    svc.use_storage(SQLiteStorage(database, Employee, record_models))
+                elif backend == "memory":
+                    svc.use_storage(InMemoryStorage())
+                else:
+                    svc.use_storage(ColumnarStorage(Employee, packed_fields))
+                employees = populate(size)
+                asyncio.run(EmployeeService.create_onboarding_tasks_bulk(employees))
+                del employees
+
+                if backend == "sqlite":
+                    svc.storage.close()
+                    start = time.perf_counter()
+                    svc.use_storage(SQLiteStorage(database, Employee, record_models))
+                    startup_s = time.perf_counter() - start
+                    svc.storage.close()
+                    row = {'size': size, 'backend': backend, 'startup_s': startup_s}
+                    results.append(row)
+                    print(f"{size:>9,} employees | {backend:<8} | reopen + rebuild {startup_s:6.2f} s")
+                    continue
+
+                start = time.perf_counter()
+                svc.rebuild_indexes()
+                rebuild_s = time.perf_counter() - start
+
+                path = os.path.join(tmp, "state.snapshot")
+                start = time.perf_counter()
+                snapshot = svc.take_snapshot()
+                encode_s = time.perf_counter() - start
+                start = time.perf_counter()
+                snapshot_bytes = write_snapshot(path, snapshot)
+                write_s = time.perf_counter() - start
+                del snapshot
+
+                start = time.perf_counter()
+                svc.restore_snapshot(path)
+                startup_s = time.perf_counter() - start
+
+            row = {
+                'size': size,
+                'backend': backend,
+                'startup_s': startup_s,
+                'rebuild_s': rebuild_s,
+                'snapshot_encode_s': encode_s,
+                'snapshot_write_s': write_s,
+                'snapshot_mb': snapshot_bytes / 1024 ** 2
+            }
+            results.append(row)
+            print(
+                f"{size:>9,} employees | {backend:<8} | restore {startup_s:6.2f} s"
+                f" (in-memory rebuild {rebuild_s:6.2f} s)"
+                f" | snapshot {encode_s:5.2f} s + write {write_s:5.2f} s, {row['snapshot_mb']:7.1f} MiB"
+            )
+    svc.use_storage(original)
+    reset_stores()
+    return results
+
+
+BENCHMARKS: Dict[str, Callable[[List[int]], List[Dict[str, float]]]] = {
+    'lookups': bench_lookups,
+    'list_filters': bench_list_filters,
+    'statistics': bench_statistics,
+    'cursor_pages': bench_cursor_pages,
+    'bulk_create': bench_bulk_create,
+    'bulk_update': bench_bulk_update,
+    'export': bench_export,
+    'storage': bench_storage,
+    'memory': bench_memory,
+    'job_queue': bench_job_queue,
+    'onboarding_queues': bench_onboarding_queues,
+    'performance_analytics': bench_performance_analytics,
+    'document_expiry': bench_document_expiry,
+    'reporting_lines': bench_reporting_lines,
+    'search': bench_search,
+    'change_feed': bench_change_feed,
+    'nitaqat': bench_nitaqat,
+    'payroll': bench_payroll,
+    'employment_intervals': bench_employment_intervals,
+    'sparse_fields': bench_sparse_fields,
+    'json_responses': bench_json_responses,
+    'tenant_shards': bench_tenant_shards,
+    'snapshots': bench_snapshots,
+}
+
+
+def main(argv: List[str]) -> None:
+    """Run one benchmark (or all of them) at the requested sizes"""
+    names = [argv[0]] if argv and argv[0] in BENCHMARKS else list(BENCHMARKS)
+    sizes = [int(arg) for arg in argv if arg.isdigit()] or DEFAULT_SIZES
+    with tempfile.TemporaryDirectory() as tmp:
+        svc.open_storage("memory")
+        svc.open_sequence_allocator(os.path.join(tmp, "employee_sequences.db"))
+        for name in names:
+            print(f"== {name} ==")
+            BENCHMARKS[name](sizes)
+        svc.employee_number_allocator.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,211 @@
+"""
+AQLHR Employee Indexes
+======================
+
+In-memory index structures used by the employee microservice to answer
+filtered queries without scanning every employee record.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Number of bits examined at a time when walking a bitmap
+_WINDOW_BITS = 4096
+
+
+class BitmapIndex:
+    """Bitmap index over a fixed set of fields.
+
+    Every row gets a stable slot number in insertion order. For each indexed
+    field value we keep a Python int whose set bits are the slots holding that
+    value, so a multi-field filter is a handful of bitwise ANDs and
+    pagination walks only the bits needed for the requested page.
+
+    New rows are queued as slot lists and ORed into the bitmaps in one pass
+    on the next read or update: OR-ing each row's bit into an n-bit int
+    copies the whole int, which made bulk loads quadratic.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = list(fields)
+        self.slots: Dict[str, int] = {}
+        self.row_ids: List[Optional[str]] = []
+        self.bitmaps: Dict[str, Dict[Any, int]] = {field: {} for field in self.fields}
+        self.all_rows = 0
+        # field -> value -> slots added since the bitmaps were last merged
+        self.pending: Dict[str, Dict[Any, List[int]]] = {field: {} for field in self.fields}
+
+    def clear(self) -> None:
+        """Drop every row from the index"""
+        self.slots.clear()
+        self.row_ids.clear()
+        for values in self.bitmaps.values():
+            values.clear()
+        for slots in self.pending.values():
+            slots.clear()
+        self.all_rows = 0
+
+    def add(self, row_id: str, values: Dict[str, Any]) -> None:
+        """Register a new row with its indexed field values"""
+        slot = len(self.row_ids)
+        self.slots[row_id] = slot
+        self.row_ids.append(row_id)
+        for field in self.fields:
+            self.pending[field].setdefault(values[field], []).append(slot)
+
+    def _merge_pending(self) -> None:
+        """OR the queued slots into the bitmaps, one int per field value"""
+        if self.all_rows.bit_length() == len(self.row_ids):
+            return
+        for field, values in self.pending.items():
+            field_bitmaps = self.bitmaps[field]
+            for value, slots in values.items():
+                field_bitmaps[value] = field_bitmaps.get(value, 0) | _slot_bits(slots)
+            values.clear()
+        # Rows are never removed, so every slot below len(row_ids) is live
+        self.all_rows = (1 << len(self.row_ids)) - 1
+
+    def update(self, row_id: str, field: str, old_value: Any, new_value: Any) -> None:
+        """Move a row from one field value to another"""
+        if old_value == new_value or row_id not in self.slots:
+            return
+        self._merge_pending()
+        bit = 1 << self.slots[row_id]
+        field_bitmaps = self.bitmaps[field]
+        remaining = field_bitmaps.get(old_value, 0) & ~bit
+        if remaining:
+            field_bitmaps[old_value] = remaining
+        else:
+            field_bitmaps.pop(old_value, None)
+        field_bitmaps[new_value] = field_bitmaps.get(new_value, 0) | bit
+
+    def query(self, **criteria: Any) -> int:
+        """Return the bitmap of rows matching every given field value"""
+        self._merge_pending()
+        bits = self.all_rows
+        for field, value in criteria.items():
+            bits &= self.bitmaps[field].get(value, 0)
+            if not bits:
+                break
+        return bits
+
+    def page(self, bits: int, skip: int = 0, limit: int = 100) -> List[str]:
+        """Row ids for the set bits of `bits`, skipping the first `skip`"""
+        if skip < 0:
+            raise ValueError(f"skip must not be negative, got {skip}")
+        if limit <= 0 or skip >= bits.bit_count():
+            return []
+
+        offset = _nth_set_bit(bits, skip) if skip else 0
+        bits >>= offset
+        row_ids = []
+        while bits and len(row_ids) < limit:
+            # Jump straight to the next set bit so sparse bitmaps stay cheap
+            gap = (bits & -bits).bit_length() - 1
+            bits >>= gap
+            offset += gap
+            window = bits & ((1 << _WINDOW_BITS) - 1)
+            while window and len(row_ids) < limit:
+                low = window & -window
+                row_ids.append(self.row_ids[offset + low.bit_length() - 1])
+                window ^= low
+            bits >>= _WINDOW_BITS
+            offset += _WINDOW_BITS
+        return row_ids
+
+    def iter_rows(self, bits: int) -> Iterator[str]:
+        """Lazily yield row ids for every set bit of `bits`, in slot order"""
+        offset = 0
+        while bits:
+            gap = (bits & -bits).bit_length() - 1
+            bits >>= gap
+            offset += gap
+            window = bits & ((1 << _WINDOW_BITS) - 1)
+            while window:
+                low = window & -window
+                yield self.row_ids[offset + low.bit_length() - 1]
+                window ^= low
+            bits >>= _WINDOW_BITS
+            offset += _WINDOW_BITS
+
+
+def _slot_bits(slots: List[int]) -> int:
+    """Int with the given (ascending) slot bits set, built in one pass"""
+    buffer = bytearray((slots[-1] >> 3) + 1)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _nth_set_bit(bits: int, n: int) -> int:
+    """Position of the n-th (0-based) set bit, found by binary search on popcount"""
+    if n < 0:
+        raise ValueError(f"n must not be negative, got {n}")
+    lo, hi = 0, bits.bit_length()
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (bits & ((1 << (mid + 1)) - 1)).bit_count() > n:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+class WorkforceCounters:
+    """Running headcount counters keyed by department, status and Saudi flag.
+
+    Callers apply +1/-1 deltas as employees are created, changed or
+    terminated, so summaries are read straight from the counters instead of
+    being recomputed from every record.
+    """
+
+    def __init__(self, active_status: Any):
+        self.active_status = active_status
+        self.clear()
+
+    def clear(self) -> None:
+        """Reset every counter to zero"""
+        self.total = 0
+        self.active = 0
+        self.saudi = 0
+        self.by_status: Dict[Any, int] = {}
+        self.by_department: Dict[str, Dict[str, Any]] = {}
+
+    def apply(self, department_id: str, status: Any, is_saudi: bool, delta: int) -> None:
+        """Add (delta=1) or remove (delta=-1) one employee from the counters"""
+        active = delta if status == self.active_status else 0
+        saudi = delta if is_saudi else 0
+
+        self.total += delta
+        self.active += active
+        self.saudi += saudi
+        self.by_status[status] = self.by_status.get(status, 0) + delta
+
+        department = self.by_department.get(department_id)
+        if department is None:
+            department = self.by_department[department_id] = {
+                'total': 0, 'active': 0, 'saudi': 0, 'by_status': {}
+            }
+        department['total'] += delta
+        department['active'] += active
+        department['saudi'] += saudi
+        department['by_status'][status] = department['by_status'].get(status, 0) + delta
+        if department['total'] == 0:
+            del self.by_department[department_id]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict copy of the counters, suitable for comparison"""
+        return {
+            'total': self.total,
+            'active': self.active,
+            'saudi': self.saudi,
+            'by_status': {k: v for k, v in self.by_status.items() if v},
+            'by_department': {
+                dept: {
+                    'total': counts['total'],
+                    'active': counts['active'],
+                    'saudi': counts['saudi'],
+                    'by_status': {k: v for k, v in counts['by_status'].items() if v},
+                }
+                for dept, counts in self.by_department.items()
+            },
+        }
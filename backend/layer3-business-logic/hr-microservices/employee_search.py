@@ -0,0 +1,234 @@
+"""
+AQLHR Employee Search
+=====================
+
+Bilingual (Arabic / English) name and job-title search. Text is normalized
+the same way at index and query time; every distinct token is indexed by
+its character trigrams, so prefix and typo-tolerant matching works on the
+vocabulary rather than on every employee.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+import bisect
+import heapq
+import re
+import unicodedata
+
+# Arabic letter variants folded to one form. Hamza and madda carriers are
+# already split off by NFKD, so only letters without a decomposition remain.
+_ARABIC_FOLDS = str.maketrans({
+    '\u0671': '\u0627',  # alef wasla -> alef
+    '\u0649': '\u064a',  # alef maksura -> ya
+    '\u0629': '\u0647',  # ta marbuta -> ha
+    '\u0640': None,       # tatweel
+})
+_TOKEN = re.compile(r'\w+')
+
+# Prefix matches considered per query term (shortest / alphabetical first)
+MAX_PREFIX_EXPANSIONS = 64
+
+
+def normalize(text: str) -> str:
+    """Fold case, accents, hamza carriers and Arabic letter variants; strip harakat"""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.translate(_ARABIC_FOLDS)
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text: Optional[str]) -> Tuple[str, ...]:
+    """Normalized word tokens of `text` (cached: names and titles repeat a lot)"""
+    if not text:
+        return ()
+    if text.isascii():
+        return tuple(_TOKEN.findall(text.lower()))
+    return tuple(_TOKEN.findall(normalize(text)))
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_typos(term: str) -> int:
+    if len(term) <= 3:
+        return 0
+    return 1 if len(term) <= 6 else 2
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 once it is known to exceed `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class EmployeeSearchIndex:
+    """Inverted token index with a trigram index over the token vocabulary.
+
+    `fields` maps each indexed field to its ranking weight. Postings are kept
+    per weight so a name match can outrank a job-title match for the same
+    token.
+    """
+
+    def __init__(self, fields: Dict[str, float]):
+        self.fields = fields
+        self.clear()
+
+    def clear(self) -> None:
+        # weight -> token -> employee ids
+        self.postings: Dict[float, Dict[str, Set[str]]] = {
+            weight: {} for weight in set(self.fields.values())
+        }
+        # employee id -> (weight, token) pairs, for updates and re-scoring
+        self.documents: Dict[str, Set[Tuple[float, str]]] = {}
+        # token -> number of (weight, employee) postings, and its trigram index
+        self.token_refs: Dict[str, int] = {}
+        self.vocabulary: List[str] = []
+        self.grams: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _add_token(self, token: str) -> None:
+        refs = self.token_refs.get(token, 0)
+        self.token_refs[token] = refs + 1
+        if refs:
+            return
+        bisect.insort(self.vocabulary, token)
+        for gram in _trigrams(token):
+            self.grams.setdefault(gram, set()).add(token)
+
+    def _drop_token(self, token: str) -> None:
+        refs = self.token_refs[token] - 1
+        if refs:
+            self.token_refs[token] = refs
+            return
+        del self.token_refs[token]
+        del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+        for gram in _trigrams(token):
+            tokens = self.grams[gram]
+            tokens.discard(token)
+            if not tokens:
+                del self.grams[gram]
+
+    def add(self, employee_id: str, values: Dict[str, Optional[str]]) -> None:
+        """Index (or re-index) an employee's searchable field values"""
+        entries = {
+            (self.fields[field], token)
+            for field, value in values.items()
+            if field in self.fields
+            for token in tokenize(value)
+        }
+        old_entries = self.documents.get(employee_id, set())
+        for weight, token in old_entries - entries:
+            postings = self.postings[weight]
+            postings[token].discard(employee_id)
+            if not postings[token]:
+                del postings[token]
+            self._drop_token(token)
+        for weight, token in entries - old_entries:
+            self.postings[weight].setdefault(token, set()).add(employee_id)
+            self._add_token(token)
+        self.documents[employee_id] = entries
+
+    def remove(self, employee_id: str) -> None:
+        if employee_id in self.documents:
+            self.add(employee_id, {})
+            del self.documents[employee_id]
+
+    def _expand(self, term: str) -> Dict[str, float]:
+        """Vocabulary tokens matching a query term, with a match score in (0, 1]"""
+        matches: Dict[str, float] = {}
+        if term in self.token_refs:
+            matches[term] = 1.0
+
+        if len(term) >= 2:
+            position = bisect.bisect_left(self.vocabulary, term)
+            for token in self.vocabulary[position:position + MAX_PREFIX_EXPANSIONS]:
+                if not token.startswith(term):
+                    break
+                if token != term:
+                    matches[token] = 0.6 + 0.3 * len(term) / len(token)
+
+        typos = _max_typos(term)
+        if typos:
+            # A token within `typos` edits shares all but at most 3 * typos of
+            # the term's trigrams, so it must contain one of the rarest
+            # 3 * typos + 1 of them
+            grams = sorted(_trigrams(term), key=lambda gram: len(self.grams.get(gram, ())))
+            candidates: Set[str] = set()
+            for gram in grams[:3 * typos + 1]:
+                candidates.update(self.grams.get(gram, ()))
+            for token in candidates:
+                if token in matches:
+                    continue
+                distance = _edit_distance(term, token, typos)
+                if distance <= typos:
+                    matches[token] = 0.7 - 0.2 * distance
+        return matches
+
+    def _term_scores(self, term: str) -> List[Tuple[float, float, str, Set[str]]]:
+        """(weighted score, field weight, token, employee ids) for a term, best first"""
+        scored = [
+            (score * weight, weight, token, postings[token])
+            for token, score in self._expand(term).items()
+            for weight, postings in self.postings.items()
+            if token in postings
+        ]
+        scored.sort(key=lambda item: (-item[0], item[2]))
+        return scored
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Employee ids matching every query term, best first, with scores"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+        expanded = [self._term_scores(term) for term in terms]
+        if not all(expanded):
+            return []
+
+        if len(expanded) == 1:
+            # Postings are already in score order: stop once the page is full
+            results: Dict[str, float] = {}
+            for score, _, _, employee_ids in expanded[0]:
+                for employee_id in employee_ids:
+                    if employee_id not in results:
+                        results[employee_id] = score
+                        if len(results) >= limit:
+                            return list(results.items())
+            return list(results.items())
+
+        # Intersect the terms with set operations, smallest term first, then
+        # give each surviving employee the best tier it hit for every term
+        expanded.sort(key=lambda scored: sum(len(ids) for *_, ids in scored))
+        matches: Set[str] = set().union(*(ids for *_, ids in expanded[0]))
+        for scored in expanded[1:]:
+            matches = set().union(*(matches & ids for *_, ids in scored))
+            if not matches:
+                return []
+
+        scores = dict.fromkeys(matches, 0.0)
+        for scored in expanded:
+            remaining = set(matches)
+            for score, _, _, employee_ids in scored:
+                hits = remaining & employee_ids
+                for employee_id in hits:
+                    scores[employee_id] += score
+                remaining -= hits
+                if not remaining:
+                    break
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
@@ -6,14 +6,38 @@ This microservice handles all employee-related operations including
 onboarding, data management, performance tracking, and lifecycle management.
 """
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
-from datetime import datetime, date
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+from typing import List, Optional, Dict, Any, Tuple, Iterable, Iterator, MutableMapping
+from datetime import datetime, date, timedelta
 from enum import Enum
 import uuid
 import logging
 import asyncio
+import base64
+import bisect
+import csv
+import io
+import json
+import os
+import time
+
+from change_feed import ChangeFeed, ChangeFeedGap
+from document_expiry import DocumentExpiryIndex
+from employee_indexes import BitmapIndex, WorkforceCounters
+from employee_search import EmployeeSearchIndex
+from employment_intervals import EmploymentIntervalIndex
+from employee_storage import create_storage
+from job_queue import JobQueue, JobStatus, RetryJob, WorkerPool
+from json_cache import SerializedCache
+from nitaqat import DEFAULT_BANDS, SaudizationEngine, ScenarioAction, ScenarioError, parse_bands
+from onboarding import CLOSED_TASK_STATUSES, OnboardingTaskIndex, OnboardingTemplateRegistry
+from org_hierarchy import ReportingHierarchy, ReportingLineError
+from payroll import OPEN_ENDED, PayrollRun, PayrollStore, compute_run, period_bounds
+from performance_analytics import PerformanceColumns, PerformanceGroupBy
+from sequence_allocator import BlockSequenceAllocator
+from snapshots import Snapshot, SnapshotError, SnapshotGate, encode_snapshot, read_snapshot, write_snapshot
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +49,33 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# A tenant shard (see tenant_shards) serves its one establishment only and
+# refuses requests the router sent for any other
+SHARD_TENANT = os.getenv("SHARD_TENANT") or None
+TENANT_HEADER = "X-Establishment-ID"
+
+
+@app.middleware("http")
+async def check_tenant(request: Request, call_next):
+    """Reject requests not scoped to this shard's tenant"""
+    if SHARD_TENANT is not None and request.url.path != "/health":
+        tenant = request.headers.get(TENANT_HEADER)
+        if tenant != SHARD_TENANT:
+            return JSONResponse(
+                status_code=421,
+                content={'detail': f"Shard serves establishment {SHARD_TENANT}, not {tenant}"}
+            )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def hold_changes_for_snapshots(request: Request, call_next):
+    """Requests that may change the state wait while a snapshot is pickled"""
+    if request.method in ("GET", "HEAD", "OPTIONS"):
+        return await call_next(request)
+    async with snapshot_gate.changing():
+        return await call_next(request)
+
 
 class EmployeeStatus(str, Enum):
     ACTIVE = "active"
@@ -47,7 +98,7 @@ class EmployeeBase(BaseModel):
     last_name: str = Field(..., min_length=1, max_length=50)
     first_name_ar: Optional[str] = Field(None, max_length=50)
     last_name_ar: Optional[str] = Field(None, max_length=50)
-    email: str = Field(..., regex=r'^[^@]+@[^@]+\.[^@]+$')
+    email: str = Field(..., pattern=r'^[^@]+@[^@]+\.[^@]+$')
     phone: str = Field(..., min_length=10, max_length=15)
     national_id: str = Field(..., min_length=10, max_length=10)
     date_of_birth: date
@@ -84,6 +135,23 @@ class EmployeeUpdate(BaseModel):
     status: Optional[EmployeeStatus] = None
 
 
+class EmployeeBatchUpdate(EmployeeUpdate):
+    """One row of a batch update: the changes plus the version they were made against"""
+    model_config = ConfigDict(extra='forbid')
+    
+    id: str
+    version: int
+
+
+class GovernmentRegistrationResult(BaseModel):
+    """Outcome of registering an employee with one government system"""
+    system: str
+    status: str
+    latency_ms: float
+    completed_at: datetime
+    error: Optional[str] = None
+
+
 class Employee(EmployeeBase):
     """Complete employee model"""
     id: str
@@ -92,6 +160,9 @@ class Employee(EmployeeBase):
     updated_at: datetime
     created_by: str
     updated_by: str
+    # Bumped on every change; the record's ETag and the optimistic-concurrency token
+    version: int = 1
+    government_registrations: Dict[str, GovernmentRegistrationResult] = Field(default_factory=dict)
 
 
 class EmployeePerformance(BaseModel):
@@ -118,6 +189,14 @@ class EmployeeDocument(BaseModel):
     expiry_date: Optional[date] = None
 
 
+class EmployeeDocumentCreate(BaseModel):
+    """Employee document upload model"""
+    document_type: str
+    document_name: str
+    file_path: str
+    expiry_date: Optional[date] = None
+
+
 class OnboardingTask(BaseModel):
     """Onboarding task model"""
     id: str
@@ -130,21 +209,396 @@ class OnboardingTask(BaseModel):
     completed_at: Optional[datetime] = None
 
 
-# In-memory storage (replace with actual database in production)
-employees_db: Dict[str, Employee] = {}
-performance_db: Dict[str, List[EmployeePerformance]] = {}
-documents_db: Dict[str, List[EmployeeDocument]] = {}
-onboarding_db: Dict[str, List[OnboardingTask]] = {}
+class EmploymentInterval(BaseModel):
+    """A stretch of employment in one department; end_date is exclusive"""
+    employee_id: str
+    department_id: str
+    start_date: date
+    end_date: Optional[date] = None
+
+
+class NitaqatScenarioAction(BaseModel):
+    """One change in a Nitaqat what-if scenario"""
+    action: ScenarioAction
+    department_id: str
+    is_saudi: bool
+    count: int = Field(..., gt=0)
+    contract_type: ContractType = ContractType.PERMANENT
+    # Conversions only: the contract type employees are moved to
+    to_contract_type: Optional[ContractType] = None
+
+
+class NitaqatScenario(BaseModel):
+    """A named set of workforce changes evaluated together"""
+    name: Optional[str] = None
+    actions: List[NitaqatScenarioAction]
+
+
+# Files the service keeps default to EMPLOYEE_DATA_DIR; they are opened at
+# startup, so importing this module creates nothing
+EMPLOYEE_DATA_DIR = os.getenv("EMPLOYEE_DATA_DIR", "/app/data")
+
+# Storage backend (EMPLOYEE_STORAGE_BACKEND=memory|columnar|sqlite), opened
+# at startup (see open_storage); the module-level names below are the
+# collections of the active backend, see use_storage()
+EMPLOYEE_STORAGE_BACKEND = os.getenv("EMPLOYEE_STORAGE_BACKEND", "memory")
+EMPLOYEE_DB_PATH = os.getenv("EMPLOYEE_DB_PATH") or os.path.join(EMPLOYEE_DATA_DIR, "employees.db")
+STORAGE_RECORD_MODELS = {
+    'performance': EmployeePerformance,
+    'documents': EmployeeDocument,
+    'onboarding': OnboardingTask,
+    'employment': EmploymentInterval
+}
+# Mostly-unique strings the columnar backend packs instead of interning
+STORAGE_PACKED_FIELDS = (
+    'employee_number', 'national_id', 'email', 'phone',
+    'last_name', 'last_name_ar'
+)
+storage = None
+employees_db: Optional[MutableMapping[str, Employee]] = None
+performance_db: Optional[MutableMapping[str, List[EmployeePerformance]]] = None
+documents_db: Optional[MutableMapping[str, List[EmployeeDocument]]] = None
+onboarding_db: Optional[MutableMapping[str, List[OnboardingTask]]] = None
+employment_db: Optional[MutableMapping[str, List[EmploymentInterval]]] = None
+
+# Standard onboarding checklist applied to every new hire
+STANDARD_ONBOARDING_TASKS: List[Dict[str, Any]] = [
+    {
+        'task_name': 'IT Setup',
+        'task_description': 'Setup computer, email, and system access',
+        'assigned_to': 'IT_DEPARTMENT',
+        'days_to_complete': 1
+    },
+    {
+        'task_name': 'HR Documentation',
+        'task_description': 'Complete employment contracts and policies',
+        'assigned_to': 'HR_DEPARTMENT',
+        'days_to_complete': 2
+    },
+    {
+        'task_name': 'Government Registration',
+        'task_description': 'Register with GOSI, HRSD, and other authorities',
+        'assigned_to': 'COMPLIANCE_TEAM',
+        'days_to_complete': 5
+    },
+    {
+        'task_name': 'Department Orientation',
+        'task_description': 'Introduction to team and role-specific training',
+        'assigned_to': 'DEPARTMENT_MANAGER',
+        'days_to_complete': 3
+    },
+    {
+        'task_name': 'Safety Training',
+        'task_description': 'Complete mandatory safety and security training',
+        'assigned_to': 'SAFETY_OFFICER',
+        'days_to_complete': 2
+    }
+]
+
+# Onboarding checklists per department / contract type (STANDARD_ONBOARDING_TASKS
+# is the fallback), optionally loaded from ONBOARDING_TEMPLATES_PATH
+onboarding_templates = OnboardingTemplateRegistry(STANDARD_ONBOARDING_TASKS)
+if os.getenv("ONBOARDING_TEMPLATES_PATH"):
+    onboarding_templates.load_file(os.environ["ONBOARDING_TEMPLATES_PATH"])
+
+# Open onboarding tasks by assignee, ordered by due date
+onboarding_task_index = OnboardingTaskIndex()
+
+# Government registration limits: per-system call timeout (seconds) and a
+# global cap on registration calls in flight across all employees
+GOVERNMENT_REGISTRATION_TIMEOUT = float(os.getenv("GOVERNMENT_REGISTRATION_TIMEOUT", 10))
+government_registration_slots = asyncio.Semaphore(
+    int(os.getenv("GOVERNMENT_REGISTRATION_CONCURRENCY", 50))
+)
+
+# Durable queue for post-hire government registration, drained by a worker
+# pool started with the app (see open_job_queue)
+GOVERNMENT_REGISTRATION_JOB = "government_registration"
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH") or os.path.join(EMPLOYEE_DATA_DIR, "employee_jobs.db")
+job_queue: Optional[JobQueue] = None
+
+# Employee numbers are leased in blocks from a file shared by all workers
+# (see open_sequence_allocator)
+EMPLOYEE_SEQUENCE_PATH = (
+    os.getenv("EMPLOYEE_SEQUENCE_PATH") or os.path.join(EMPLOYEE_DATA_DIR, "employee_sequences.db")
+)
+employee_number_allocator: Optional[BlockSequenceAllocator] = None
+
+# Append-only log of employee changes for incremental consumers; segment
+# files (CHANGE_FEED_DIR) extend it beyond the in-memory ring and across restarts
+change_feed = ChangeFeed(
+    capacity=int(os.getenv("CHANGE_FEED_CAPACITY", 100_000)),
+    segment_dir=os.getenv("CHANGE_FEED_DIR") or None,
+    segment_size=int(os.getenv("CHANGE_FEED_SEGMENT_SIZE", 10_000)),
+    max_segments=int(os.getenv("CHANGE_FEED_MAX_SEGMENTS", 100))
+)
+CHANGE_FEED_MAX_WAIT = 60.0
+
+# Change feed ops for an employee's reviews, documents and onboarding tasks;
+# every other op carries the employee record itself
+RECORD_CHANGE_OPS = ('performance_added', 'document_added', 'document_removed', 'onboarding_updated')
+
+# Secondary indexes (field value -> employee id), maintained by EmployeeService
+employee_number_index: Dict[str, str] = {}
+national_id_index: Dict[str, str] = {}
+email_index: Dict[str, str] = {}
+
+# Bitmap index over the list_employees filter fields
+FILTER_FIELDS = ('department_id', 'status', 'is_saudi')
+filter_index = BitmapIndex(FILTER_FIELDS)
+
+# Running workforce counters behind the statistics summary
+workforce_counters = WorkforceCounters(EmployeeStatus.ACTIVE)
+
+# (created_at, id) keys in sorted order, backing keyset (cursor) pagination
+creation_order: List[Tuple[datetime, str]] = []
+
+# Top-level keys of the statistics summary, selectable with ?fields=
+STATISTICS_FIELDS = (
+    'total_employees', 'active_employees', 'saudi_employees', 'non_saudi_employees',
+    'saudization_rate', 'employees_by_status', 'employees_by_department'
+)
+
+# Name / job-title search; names rank above job titles
+SEARCH_FIELDS = {
+    'first_name': 3.0,
+    'last_name': 3.0,
+    'first_name_ar': 3.0,
+    'last_name_ar': 3.0,
+    'position_title': 1.0,
+    'position_title_ar': 1.0
+}
+employee_search = EmployeeSearchIndex(SEARCH_FIELDS)
+
+# Manager -> reports hierarchy with maintained subtree headcounts
+reporting_lines = ReportingHierarchy()
+
+# Employment intervals by department for point-in-time headcount
+employment_intervals = EmploymentIntervalIndex()
+
+# Column arrays of all performance reviews for calibration analytics
+performance_columns = PerformanceColumns()
+
+# Counted (non-terminated) headcount by department, Saudi flag and contract
+# type for Nitaqat. Bands come from NITAQAT_BANDS ("platinum:40,green:25,...");
+# departments map to establishments via NITAQAT_ESTABLISHMENTS_PATH, the rest
+# belong to ESTABLISHMENT_ID.
+NITAQAT_CONTRACT_WEIGHTS = {
+    ContractType.PERMANENT.value: 1.0,
+    ContractType.TEMPORARY.value: 1.0,
+    ContractType.CONTRACT.value: 1.0,
+    # Interns do not count towards Saudization
+    ContractType.INTERN.value: 0.0
+}
+saudization = SaudizationEngine(
+    NITAQAT_CONTRACT_WEIGHTS,
+    parse_bands(os.environ["NITAQAT_BANDS"]) if os.getenv("NITAQAT_BANDS") else DEFAULT_BANDS,
+    os.getenv("ESTABLISHMENT_ID", "default")
+)
+if os.getenv("NITAQAT_ESTABLISHMENTS_PATH"):
+    saudization.load_file(os.environ["NITAQAT_ESTABLISHMENTS_PATH"])
+
+# Monthly payroll runs, persisted to PAYROLL_RUNS_DIR when set. Allowances
+# are a share of basic salary; pay covers the days employed in the period.
+PAYROLL_ALLOWANCE_RATES = {
+    'housing': float(os.getenv("PAYROLL_HOUSING_ALLOWANCE_RATE", "0.25")),
+    'transport': float(os.getenv("PAYROLL_TRANSPORT_ALLOWANCE_RATE", "0.10"))
+}
+payroll_runs = PayrollStore(os.getenv("PAYROLL_RUNS_DIR") or None)
+
+# Serialized JSON for the read endpoints: employees keyed by id and version,
+# onboarding task lists by employee id (invalidated whenever they change)
+EMPLOYEE_JSON_CACHE_SIZE = int(os.getenv("EMPLOYEE_JSON_CACHE_SIZE", 100_000))
+employee_json = SerializedCache(Employee, EMPLOYEE_JSON_CACHE_SIZE)
+onboarding_json = SerializedCache(List[OnboardingTask], EMPLOYEE_JSON_CACHE_SIZE)
+
+# Documents ordered by expiry date; a periodic sweep queues expiry events for
+# documents entering the DOCUMENT_EXPIRY_HORIZON_DAYS window, in batches.
+# The sweep watermark is in memory, so a restart re-announces the window.
+document_expiry_index = DocumentExpiryIndex()
+DOCUMENT_EXPIRY_JOB = "document_expiry"
+DOCUMENT_EXPIRY_HORIZON_DAYS = int(os.getenv("DOCUMENT_EXPIRY_HORIZON_DAYS", 30))
+DOCUMENT_EXPIRY_SWEEP_INTERVAL = float(os.getenv("DOCUMENT_EXPIRY_SWEEP_INTERVAL", 3600))
+DOCUMENT_EXPIRY_BATCH_SIZE = int(os.getenv("DOCUMENT_EXPIRY_BATCH_SIZE", 500))
+document_expiry_swept_through: Optional[date] = None
+
+# Memory and columnar backends snapshot their stores and indexes to
+# SNAPSHOT_PATH every SNAPSHOT_INTERVAL seconds (0: only at shutdown) and
+# restore from it at startup, replaying later changes from the change feed
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH") or None
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", 300))
+SNAPSHOT_BACKENDS = ("memory", "columnar")
+SNAPSHOT_COLLECTIONS = ('employees', 'performance', 'documents', 'onboarding', 'employment')
+# Module-level indexes saved as they are; saudization is saved as headcounts
+# so bands and establishment mappings always come from the configuration
+SNAPSHOT_INDEXES = (
+    'employee_number_index', 'national_id_index', 'email_index', 'filter_index',
+    'workforce_counters', 'creation_order', 'employee_search', 'reporting_lines',
+    'employment_intervals', 'performance_columns', 'onboarding_task_index',
+    'document_expiry_index'
+)
+last_snapshot: Optional[Dict[str, Any]] = None
+# Held by everything that changes the stores or indexes, so a snapshot can
+# pickle them in a thread without the event loop changing them meanwhile
+snapshot_gate = SnapshotGate()
+
+
+class DuplicateEmployeeError(Exception):
+    """Raised when a new employee collides with an existing active employee"""
+    pass
+
+
+class VersionConflictError(Exception):
+    """Raised when an update was made against an outdated version of an employee"""
+    
+    def __init__(self, employee: Employee, version: int):
+        super().__init__(f"Employee {employee.id} is at version {employee.version}, not {version}")
+        self.employee = employee
+
+
+def validation_messages(error: ValidationError) -> List[str]:
+    """Readable "field: message" strings for each validation error"""
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
 
 
 class EmployeeService:
     """Employee management service"""
     
+    @staticmethod
+    def _index_employee(employee: Employee) -> None:
+        """Point the secondary indexes at this employee record"""
+        employee_number_index[employee.employee_number] = employee.id
+        national_id_index[employee.national_id] = employee.id
+        email_index[employee.email.lower()] = employee.id
+        filter_index.add(employee.id, {field: getattr(employee, field) for field in FILTER_FIELDS})
+        workforce_counters.apply(employee.department_id, employee.status, employee.is_saudi, 1)
+        EmployeeService._count_saudization(employee, 1)
+        bisect.insort(creation_order, (employee.created_at, employee.id))
+        employee_search.add(employee.id, {field: getattr(employee, field) for field in SEARCH_FIELDS})
+        try:
+            reporting_lines.set(employee.id, employee.manager_id, EmployeeService._headcount_weight(employee))
+        except ReportingLineError as e:
+            logger.warning(f"{e}; indexing {employee.employee_number} without a manager")
+            reporting_lines.set(employee.id, None, EmployeeService._headcount_weight(employee))
+    
+    @staticmethod
+    def _employment_records(employee: Employee) -> List[EmploymentInterval]:
+        """Stored employment intervals, or one derived from the hire date (and
+        termination) for records that predate interval tracking"""
+        records = employment_db.get(employee.id)
+        if records:
+            return records
+        return [EmploymentInterval(
+            employee_id=employee.id,
+            department_id=employee.department_id,
+            start_date=employee.hire_date,
+            end_date=employee.updated_at.date() if employee.status == EmployeeStatus.TERMINATED else None
+        )]
+    
+    @staticmethod
+    def _start_employment(employee: Employee) -> None:
+        """Record a new hire's first employment interval"""
+        employment_db.extend_records(employee.id, [EmploymentInterval(
+            employee_id=employee.id, department_id=employee.department_id, start_date=employee.hire_date
+        )])
+        employment_intervals.hire(employee.id, employee.department_id, employee.hire_date)
+    
+    @staticmethod
+    def _track_employment(employee: Employee, department_id: str, employed: bool, day: date) -> None:
+        """Record a department move, termination or re-hire effective `day`.
+        
+        `department_id` and `employed` are the employee's values before the
+        change. A change cannot take effect before the current interval starts.
+        """
+        now_employed = bool(EmployeeService._headcount_weight(employee))
+        if employed == now_employed and (not employed or department_id == employee.department_id):
+            return
+        
+        records = EmployeeService._employment_records(employee)
+        if employed:
+            current = records[-1]
+            day = max(day, current.start_date)
+            if now_employed and day == current.start_date:
+                # Moved before starting: the old department never applied
+                records.pop()
+            else:
+                current.end_date = day
+        if now_employed:
+            records.append(EmploymentInterval(
+                employee_id=employee.id, department_id=employee.department_id, start_date=day
+            ))
+        employment_db[employee.id] = records
+        
+        if employed and now_employed:
+            employment_intervals.move(employee.id, employee.department_id, day)
+        elif employed:
+            employment_intervals.terminate(employee.id, day)
+        else:
+            employment_intervals.hire(employee.id, employee.department_id, day)
+    
+    @staticmethod
+    def _publish_change(op: str, employee: Employee, fields: Optional[List[str]] = None) -> int:
+        """Append a change for this employee to the change feed"""
+        return change_feed.append(op, employee.id, employee.model_dump(mode='json'), fields)
+    
+    @staticmethod
+    def _publish_onboarding(employee_id: str, tasks: List[OnboardingTask]) -> int:
+        """Append an employee's current onboarding task list to the change feed"""
+        return change_feed.append(
+            'onboarding_updated', employee_id, {'tasks': [task.model_dump(mode='json') for task in tasks]}
+        )
+    
+    @staticmethod
+    def _headcount_weight(employee: Employee) -> int:
+        """1 if the employee counts towards reporting-line headcount"""
+        return int(employee.status != EmployeeStatus.TERMINATED)
+    
+    @staticmethod
+    def _count_saudization(employee: Employee, delta: int) -> None:
+        """Add or remove the employee from the Nitaqat headcounts if counted"""
+        saudization.apply(
+            employee.department_id, employee.is_saudi, employee.contract_type,
+            delta * EmployeeService._headcount_weight(employee)
+        )
+    
+    @staticmethod
+    def _lookup(index: Dict[str, str], key: str) -> Optional[Employee]:
+        """Resolve an index entry to its employee record"""
+        employee_id = index.get(key)
+        if employee_id is None:
+            return None
+        return employees_db.get(employee_id)
+    
+    @staticmethod
+    def _registered_holder(national_id: str) -> Optional[Employee]:
+        """The active (non-terminated) employee holding this national ID"""
+        existing = EmployeeService._lookup(national_id_index, national_id)
+        if existing and existing.status != EmployeeStatus.TERMINATED:
+            return existing
+        return None
+    
+    @staticmethod
+    def _check_national_id(national_id: str) -> None:
+        """Raise DuplicateEmployeeError if an active employee holds this national ID"""
+        existing = EmployeeService._registered_holder(national_id)
+        if existing:
+            raise DuplicateEmployeeError(
+                f"National ID already registered to employee {existing.employee_number}"
+            )
+    
     @staticmethod
     async def create_employee(employee_data: EmployeeCreate, created_by: str) -> Employee:
         """Create a new employee"""
+        EmployeeService._check_national_id(employee_data.national_id)
+        
         employee_id = str(uuid.uuid4())
-        employee_number = f"EMP-{datetime.now().year}-{len(employees_db) + 1:04d}"
+        employee_number = (await EmployeeService._allocate_employee_numbers(1))[0]
+        # Allocating can yield to another create with the same national ID;
+        # nothing awaits between this check and indexing the new record
+        EmployeeService._check_national_id(employee_data.national_id)
         
         employee = Employee(
             id=employee_id,
@@ -157,17 +611,119 @@ class EmployeeService:
         )
         
         employees_db[employee_id] = employee
-        
-        # Initialize performance and documents lists
-        performance_db[employee_id] = []
-        documents_db[employee_id] = []
+        EmployeeService._index_employee(employee)
+        EmployeeService._start_employment(employee)
+        EmployeeService._publish_change('created', employee)
         
         # Create onboarding tasks
-        await EmployeeService.create_onboarding_tasks(employee_id)
+        await EmployeeService.create_onboarding_tasks(employee)
         
         logger.info(f"Created employee: {employee_number}")
         return employee
     
+    @staticmethod
+    async def _allocate_employee_numbers(count: int) -> List[str]:
+        """Reserve a contiguous block of employee numbers for this year"""
+        prefix = f"EMP-{datetime.now().year}"
+        values = await employee_number_allocator.allocate_async(prefix, count)
+        return [f"{prefix}-{seq:04d}" for seq in values]
+    
+    @staticmethod
+    async def bulk_create_employees(
+        rows: List[Any],
+        created_by: str
+    ) -> Tuple[List[Dict[str, Any]], List[Employee]]:
+        """Validate and create many employees in one pass.
+        
+        Rows are validated first; valid rows get a single block of employee
+        numbers and bulk onboarding tasks. Returns one result dict per input
+        row (in order) plus the list of created employees.
+        """
+        results: List[Dict[str, Any]] = []
+        accepted: List[Tuple[int, EmployeeCreate]] = []
+        batch_national_ids: Dict[str, int] = {}
+        
+        for row_number, row in enumerate(rows):
+            if isinstance(row, Exception):
+                results.append({'row': row_number, 'status': 'error', 'errors': [str(row)]})
+                continue
+            if not isinstance(row, dict):
+                results.append({'row': row_number, 'status': 'error', 'errors': ['Row must be a JSON object']})
+                continue
+            try:
+                employee_data = EmployeeCreate(**row)
+            except ValidationError as e:
+                results.append({
+                    'row': row_number,
+                    'status': 'error',
+                    'errors': validation_messages(e)
+                })
+                continue
+            
+            existing = EmployeeService._registered_holder(employee_data.national_id)
+            if existing:
+                results.append({
+                    'row': row_number,
+                    'status': 'error',
+                    'errors': [f"National ID already registered to employee {existing.employee_number}"]
+                })
+                continue
+            if employee_data.national_id in batch_national_ids:
+                results.append({
+                    'row': row_number,
+                    'status': 'error',
+                    'errors': [f"Duplicate national ID in batch (row {batch_national_ids[employee_data.national_id]})"]
+                })
+                continue
+            
+            batch_national_ids[employee_data.national_id] = row_number
+            results.append({'row': row_number, 'status': 'pending'})
+            accepted.append((row_number, employee_data))
+        
+        # Nothing to number: skip the allocator, which could lease a whole block
+        employee_numbers: List[str] = []
+        if accepted:
+            employee_numbers = await EmployeeService._allocate_employee_numbers(len(accepted))
+        created: List[Employee] = []
+        now = datetime.now()
+        
+        for (row_number, employee_data), employee_number in zip(accepted, employee_numbers):
+            # Allocating can yield to a create registering the same national ID
+            existing = EmployeeService._registered_holder(employee_data.national_id)
+            if existing:
+                results[row_number] = {
+                    'row': row_number,
+                    'status': 'error',
+                    'errors': [f"National ID already registered to employee {existing.employee_number}"]
+                }
+                continue
+            employee = Employee(
+                id=str(uuid.uuid4()),
+                employee_number=employee_number,
+                created_at=now,
+                updated_at=now,
+                created_by=created_by,
+                updated_by=created_by,
+                **employee_data.model_dump()
+            )
+            EmployeeService._index_employee(employee)
+            created.append(employee)
+            results[row_number] = {
+                'row': row_number,
+                'status': 'created',
+                'employee_id': employee.id,
+                'employee_number': employee_number
+            }
+        
+        storage.put_employees(created)
+        for employee in created:
+            EmployeeService._start_employment(employee)
+            EmployeeService._publish_change('created', employee)
+        await EmployeeService.create_onboarding_tasks_bulk(created)
+        
+        logger.info(f"Bulk created {len(created)} of {len(rows)} employees")
+        return results, created
+    
     @staticmethod
     async def get_employee(employee_id: str) -> Optional[Employee]:
         """Get employee by ID"""
@@ -176,182 +732,1244 @@ class EmployeeService:
     @staticmethod
     async def get_employee_by_number(employee_number: str) -> Optional[Employee]:
         """Get employee by employee number"""
-        for employee in employees_db.values():
-            if employee.employee_number == employee_number:
-                return employee
-        return None
+        return EmployeeService._lookup(employee_number_index, employee_number)
+    
+    @staticmethod
+    async def get_employee_by_national_id(national_id: str) -> Optional[Employee]:
+        """Get employee by national ID"""
+        return EmployeeService._lookup(national_id_index, national_id)
+    
+    @staticmethod
+    async def get_employee_by_email(email: str) -> Optional[Employee]:
+        """Get employee by email address (case-insensitive)"""
+        return EmployeeService._lookup(email_index, email.lower())
+    
+    @staticmethod
+    def _apply_update(
+        employee: Employee,
+        update_data: Dict[str, Any],
+        updated_by: str,
+        version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Apply the fields of `update_data` that differ from the employee.
+        
+        Everything is validated before anything changes, so an update either
+        applies completely or raises (VersionConflictError, ValidationError or
+        ReportingLineError) leaving the employee and the indexes untouched.
+        Returns the changed fields; the version and updated_at only move when
+        something changed. The caller persists the employee.
+        """
+        if version is not None and version != employee.version:
+            raise VersionConflictError(employee, version)
+        
+        # Validate against the full model on a shallow copy, field by field
+        draft = employee.model_copy()
+        for field, value in update_data.items():
+            Employee.__pydantic_validator__.validate_assignment(draft, field, value)
+        changes = {
+            field: getattr(draft, field)
+            for field in update_data
+            if getattr(draft, field) != getattr(employee, field)
+        }
+        if not changes:
+            return changes
+        if 'manager_id' in changes:
+            reporting_lines.check(employee.id, changes['manager_id'])
+        
+        EmployeeService._set_fields(employee, changes, date.today())
+        employee.version += 1
+        employee.updated_at = datetime.now()
+        employee.updated_by = updated_by
+        EmployeeService._publish_change('updated', employee, list(changes))
+        return changes
+    
+    @staticmethod
+    def _set_fields(employee: Employee, changes: Dict[str, Any], day: date) -> None:
+        """Set already-validated field values and move the employee in every
+        index; employment changes take effect on `day`"""
+        # Re-key the email index when the address changes
+        new_email = changes.get('email')
+        if new_email and new_email.lower() != employee.email.lower():
+            if email_index.get(employee.email.lower()) == employee.id:
+                del email_index[employee.email.lower()]
+            email_index[new_email.lower()] = employee.id
+        
+        department_id = employee.department_id
+        employed = bool(EmployeeService._headcount_weight(employee))
+        workforce_counters.apply(employee.department_id, employee.status, employee.is_saudi, -1)
+        EmployeeService._count_saudization(employee, -1)
+        for field, value in changes.items():
+            if field in FILTER_FIELDS:
+                filter_index.update(employee.id, field, getattr(employee, field), value)
+            setattr(employee, field, value)
+        workforce_counters.apply(employee.department_id, employee.status, employee.is_saudi, 1)
+        EmployeeService._count_saudization(employee, 1)
+        performance_columns.move_employee(employee.id, employee.department_id, employee.manager_id)
+        reporting_lines.set(employee.id, employee.manager_id, EmployeeService._headcount_weight(employee))
+        EmployeeService._track_employment(employee, department_id, employed, day)
+        if 'status' in changes and employee.status == EmployeeStatus.TERMINATED:
+            EmployeeService._cancel_onboarding(employee.id)
+        if any(field in SEARCH_FIELDS for field in changes):
+            employee_search.add(employee.id, {field: getattr(employee, field) for field in SEARCH_FIELDS})
     
     @staticmethod
     async def update_employee(
         employee_id: str,
         employee_data: EmployeeUpdate,
-        updated_by: str
+        updated_by: str,
+        version: Optional[int] = None
     ) -> Optional[Employee]:
-        """Update employee information"""
+        """Update employee information; `version` makes the update conditional"""
         if employee_id not in employees_db:
             return None
         
         employee = employees_db[employee_id]
-        update_data = employee_data.dict(exclude_unset=True)
-        
-        for field, value in update_data.items():
-            setattr(employee, field, value)
+        update_data = employee_data.model_dump(exclude_unset=True)
+        if EmployeeService._apply_update(employee, update_data, updated_by, version):
+            employees_db[employee_id] = employee
+            logger.info(f"Updated employee: {employee.employee_number}")
+        return employee
+    
+    @staticmethod
+    async def bulk_update_employees(
+        rows: List[Any],
+        updated_by: str
+    ) -> List[Dict[str, Any]]:
+        """Apply many conditional updates, each record atomically.
         
-        employee.updated_at = datetime.now()
-        employee.updated_by = updated_by
+        Every row names an employee id and the version its changes were made
+        against. Returns one result per row (in order): 'updated' with only
+        the changed fields and the new version, 'unchanged', 'conflict' with
+        the current version, 'not_found' or 'error'. Rows are independent; a
+        failing row does not affect the others.
+        """
+        results: List[Dict[str, Any]] = []
+        updated: Dict[str, Employee] = {}
         
-        employees_db[employee_id] = employee
+        for row_number, row in enumerate(rows):
+            if isinstance(row, Exception):
+                results.append({'row': row_number, 'status': 'error', 'errors': [str(row)]})
+                continue
+            if not isinstance(row, dict):
+                results.append({'row': row_number, 'status': 'error', 'errors': ['Row must be a JSON object']})
+                continue
+            try:
+                update = EmployeeBatchUpdate(**row)
+                # A repeated id sees the earlier row's changes (and version)
+                employee = updated.get(update.id) or employees_db.get(update.id)
+                if employee is None:
+                    results.append({'row': row_number, 'id': update.id, 'status': 'not_found'})
+                    continue
+                changes = EmployeeService._apply_update(
+                    employee,
+                    update.model_dump(exclude_unset=True, exclude={'id', 'version'}),
+                    updated_by,
+                    update.version
+                )
+            except ValidationError as e:
+                results.append({
+                    'row': row_number,
+                    'id': row.get('id'),
+                    'status': 'error',
+                    'errors': validation_messages(e)
+                })
+                continue
+            except VersionConflictError as e:
+                results.append({
+                    'row': row_number,
+                    'id': update.id,
+                    'status': 'conflict',
+                    'version': e.employee.version,
+                    'errors': [str(e)]
+                })
+                continue
+            except ReportingLineError as e:
+                results.append({'row': row_number, 'id': update.id, 'status': 'error', 'errors': [str(e)]})
+                continue
+            
+            if not changes:
+                results.append({'row': row_number, 'id': update.id, 'status': 'unchanged', 'version': employee.version})
+                continue
+            updated[employee.id] = employee
+            results.append({
+                'row': row_number,
+                'id': employee.id,
+                'status': 'updated',
+                'version': employee.version,
+                'changes': changes
+            })
         
-        logger.info(f"Updated employee: {employee.employee_number}")
-        return employee
+        storage.put_employees(list(updated.values()))
+        logger.info(f"Bulk updated {len(updated)} employees from {len(rows)} rows")
+        return results
     
     @staticmethod
-    async def delete_employee(employee_id: str) -> bool:
-        """Delete employee (soft delete by changing status)"""
+    async def delete_employee(employee_id: str, effective_date: Optional[date] = None) -> bool:
+        """Delete employee (soft delete by changing status).
+        
+        Employment ends on `effective_date` (default today), the first day
+        the employee is no longer counted in headcount.
+        """
         if employee_id not in employees_db:
             return False
         
         employee = employees_db[employee_id]
-        employee.status = EmployeeStatus.TERMINATED
+        EmployeeService._terminate(employee, effective_date or date.today())
+        employee.version += 1
         employee.updated_at = datetime.now()
+        employees_db[employee_id] = employee
+        EmployeeService._publish_change('terminated', employee, ['status'])
         
         logger.info(f"Terminated employee: {employee.employee_number}")
         return True
     
+    @staticmethod
+    def _terminate(employee: Employee, day: date) -> None:
+        """Mark the employee terminated in the record and every index"""
+        # The record stays in employees_db, so its index entries remain valid;
+        # a rehire with the same national ID re-points them at the new record.
+        employed = bool(EmployeeService._headcount_weight(employee))
+        filter_index.update(employee.id, 'status', employee.status, EmployeeStatus.TERMINATED)
+        workforce_counters.apply(employee.department_id, employee.status, employee.is_saudi, -1)
+        EmployeeService._count_saudization(employee, -1)
+        employee.status = EmployeeStatus.TERMINATED
+        workforce_counters.apply(employee.department_id, employee.status, employee.is_saudi, 1)
+        reporting_lines.set(employee.id, employee.manager_id, 0)
+        EmployeeService._track_employment(employee, employee.department_id, employed, day)
+        EmployeeService._cancel_onboarding(employee.id)
+    
+    @staticmethod
+    def _cancel_onboarding(employee_id: str) -> None:
+        """Cancel a leaver's open onboarding tasks and drop them from the queues"""
+        tasks = onboarding_db.get(employee_id)
+        open_tasks = [task for task in tasks or () if task.status not in CLOSED_TASK_STATUSES]
+        if not open_tasks:
+            return
+        for task in open_tasks:
+            task.status = 'CANCELLED'
+            onboarding_task_index.close(task.id)
+        # Write back so persistent backends store the change
+        onboarding_db[employee_id] = tasks
+        onboarding_json.invalidate(employee_id)
+    
+    @staticmethod
+    def _replay_change(change: Dict[str, Any]) -> None:
+        """Re-apply a change feed entry to the stores and indexes without
+        publishing it again. Moves and terminations take effect on the day
+        the change was recorded."""
+        if change['op'] in RECORD_CHANGE_OPS:
+            EmployeeService._replay_record_change(change)
+            return
+        record = Employee.model_validate(change['data'])
+        employee = employees_db.get(record.id)
+        if employee is None:
+            employees_db[record.id] = record
+            EmployeeService._index_employee(record)
+            EmployeeService._start_employment(record)
+            return
+        
+        day = datetime.fromisoformat(change['at']).date()
+        if change['op'] == 'terminated':
+            EmployeeService._terminate(employee, day)
+        else:
+            fields = change['fields'] or list(Employee.model_fields)
+            EmployeeService._set_fields(employee, {
+                field: getattr(record, field)
+                for field in fields
+                if getattr(record, field) != getattr(employee, field)
+            }, day)
+        employee.version = record.version
+        employee.updated_at = record.updated_at
+        employee.updated_by = record.updated_by
+        employees_db[record.id] = employee
+    
+    @staticmethod
+    def _replay_record_change(change: Dict[str, Any]) -> None:
+        """Re-apply a performance review, document or onboarding change.
+        Cancellations are not replayed here; replaying the termination
+        cancels the tasks again."""
+        op = change['op']
+        employee_id = change['employee_id']
+        data = change['data']
+        if op == 'performance_added':
+            review = EmployeePerformance.model_validate(data)
+            performance_db.extend_records(employee_id, [review])
+            employee = employees_db.get(employee_id)
+            if employee:
+                performance_columns.add_review(employee_id, review, employee.department_id, employee.manager_id)
+        elif op == 'document_added':
+            document = EmployeeDocument.model_validate(data)
+            documents_db.extend_records(employee_id, [document])
+            document_expiry_index.add(document)
+        elif op == 'document_removed':
+            documents_db[employee_id] = [
+                document for document in documents_db.get(employee_id, []) if document.id != data['id']
+            ]
+            document_expiry_index.remove(data['id'])
+        elif op == 'onboarding_updated':
+            for task in onboarding_db.get(employee_id) or ():
+                onboarding_task_index.close(task.id)
+            tasks = [OnboardingTask.model_validate(task) for task in data['tasks']]
+            onboarding_db[employee_id] = tasks
+            for task in tasks:
+                onboarding_task_index.add(task)
+            onboarding_json.invalidate(employee_id)
+    
     @staticmethod
     async def list_employees(
+        department_id: Optional[str] = None,
+        status: Optional[EmployeeStatus] = None,
+        is_saudi: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> List[Employee]:
+        """List employees with filters; with `fields`, the storage backend may
+        return partial records holding only those fields"""
+        criteria: Dict[str, Any] = {}
+        if department_id:
+            criteria['department_id'] = department_id
+        
+        if status:
+            criteria['status'] = status
+        
+        if is_saudi is not None:
+            criteria['is_saudi'] = is_saudi
+        
+        # Intersect the filter bitmaps, then materialize only the requested page
+        matches = filter_index.query(**criteria)
+        return employees_db.get_many(filter_index.page(matches, skip, limit), fields)
+    
+    @staticmethod
+    def _filter_matches(criteria: Dict[str, Any]) -> Optional[bytes]:
+        """Filter bitmap of the employees matching `criteria` as bytes (None
+        without criteria); bytes give O(1) per-slot tests where shifting a
+        big int is O(n) each"""
+        if not criteria:
+            return None
+        bits = filter_index.query(**criteria)
+        return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    
+    @staticmethod
+    def _matches(matches: bytes, employee_id: str) -> bool:
+        """Whether the employee's slot is set in a _filter_matches bitmap"""
+        slot = filter_index.slots.get(employee_id)
+        return slot is not None and slot >> 3 < len(matches) and bool(matches[slot >> 3] >> (slot & 7) & 1)
+    
+    @staticmethod
+    async def list_reports(
+        manager_id: str,
+        direct: bool = False,
         department_id: Optional[str] = None,
         status: Optional[EmployeeStatus] = None,
         is_saudi: Optional[bool] = None,
         skip: int = 0,
         limit: int = 100
     ) -> List[Employee]:
-        """List employees with filters"""
-        employees = list(employees_db.values())
+        """Employees under a manager (depth-first), filtered via the bitmap index.
         
-        # Apply filters
+        Walks the reporting tree only until skip + limit matches are found.
+        Terminated employees are left out unless `status` asks for them; the
+        walk then visits every node rather than only counted subtrees.
+        """
+        criteria: Dict[str, Any] = {}
         if department_id:
-            employees = [e for e in employees if e.department_id == department_id]
+            criteria['department_id'] = department_id
+        if status:
+            criteria['status'] = status
+        if is_saudi is not None:
+            criteria['is_saudi'] = is_saudi
+        matches = EmployeeService._filter_matches(criteria)
+        
+        employee_ids: List[str] = []
+        for employee_id, _ in reporting_lines.iter_subtree(
+            manager_id,
+            max_depth=1 if direct else None,
+            counted_only=status != EmployeeStatus.TERMINATED
+        ):
+            if matches is not None and not EmployeeService._matches(matches, employee_id):
+                continue
+            employee_ids.append(employee_id)
+            if len(employee_ids) >= skip + limit:
+                break
+        return employees_db.get_many(employee_ids[skip:])
+    
+    @staticmethod
+    def encode_cursor(employee: Employee) -> str:
+        """Opaque cursor pointing just after this employee in creation order"""
+        raw = f"{employee.created_at.isoformat()}|{employee.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """Decode a cursor back into its (created_at, id) key; raises ValueError"""
+        try:
+            created_at, employee_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+            return datetime.fromisoformat(created_at), employee_id
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+    
+    @staticmethod
+    async def list_employees_after(
+        cursor: Optional[str] = None,
+        department_id: Optional[str] = None,
+        status: Optional[EmployeeStatus] = None,
+        is_saudi: Optional[bool] = None,
+        limit: int = 100
+    ) -> Tuple[List[Employee], Optional[str]]:
+        """List employees ordered by (created_at, id) starting after a cursor.
+        
+        Returns the page and the cursor for the next page (None when the
+        listing is exhausted). Employees created while a client is paging
+        land after the keys already returned, so pages never shift. Filters
+        are tested against the bitmap index and only the page is loaded.
+        """
+        start = 0
+        if cursor:
+            start = bisect.bisect_right(creation_order, EmployeeService.decode_cursor(cursor))
         
+        criteria: Dict[str, Any] = {}
+        if department_id:
+            criteria['department_id'] = department_id
         if status:
-            employees = [e for e in employees if e.status == status]
+            criteria['status'] = status
+        if is_saudi is not None:
+            criteria['is_saudi'] = is_saudi
+        matches = EmployeeService._filter_matches(criteria)
         
+        employee_ids: List[str] = []
+        position = start
+        while position < len(creation_order) and len(employee_ids) < limit:
+            employee_id = creation_order[position][1]
+            position += 1
+            if matches is None or EmployeeService._matches(matches, employee_id):
+                employee_ids.append(employee_id)
+        page = employees_db.get_many(employee_ids)
+        
+        next_cursor = None
+        if page and position < len(creation_order):
+            next_cursor = EmployeeService.encode_cursor(page[-1])
+        return page, next_cursor
+    
+    @staticmethod
+    def iter_employees(
+        department_id: Optional[str] = None,
+        status: Optional[EmployeeStatus] = None,
+        is_saudi: Optional[bool] = None
+    ) -> Iterator[Employee]:
+        """Lazily yield every employee matching the list_employees filters"""
+        criteria: Dict[str, Any] = {}
+        if department_id:
+            criteria['department_id'] = department_id
+        if status:
+            criteria['status'] = status
         if is_saudi is not None:
-            employees = [e for e in employees if e.is_saudi == is_saudi]
+            criteria['is_saudi'] = is_saudi
         
-        # Apply pagination
-        return employees[skip:skip + limit]
+        for employee_id in filter_index.iter_rows(filter_index.query(**criteria)):
+            yield employees_db[employee_id]
     
     @staticmethod
-    async def get_employee_statistics() -> Dict[str, Any]:
-        """Get employee statistics"""
-        total_employees = len(employees_db)
-        active_employees = len([e for e in employees_db.values() if e.status == EmployeeStatus.ACTIVE])
-        saudi_employees = len([e for e in employees_db.values() if e.is_saudi])
+    def export_employees(
+        export_format: str = "ndjson",
+        fields: Optional[List[str]] = None,
+        department_id: Optional[str] = None,
+        status: Optional[EmployeeStatus] = None,
+        is_saudi: Optional[bool] = None,
+        chunk_size: int = 500
+    ) -> Iterator[str]:
+        """Stream the employee directory as NDJSON or CSV text chunks.
         
-        saudization_rate = (saudi_employees / total_employees * 100) if total_employees > 0 else 0
+        Rows are serialized `chunk_size` at a time, so memory stays flat
+        regardless of headcount.
+        """
+        columns = fields or list(Employee.model_fields)
+        include = set(columns)
+        employees = EmployeeService.iter_employees(department_id, status, is_saudi)
         
-        return {
+        buffer = io.StringIO()
+        writer = None
+        if export_format == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+        
+        pending = 0
+        for employee in employees:
+            row = employee.model_dump(mode='json', include=include)
+            if writer:
+                writer.writerow([
+                    json.dumps(row[column], ensure_ascii=False)
+                    if isinstance(row[column], (dict, list)) else row[column]
+                    for column in columns
+                ])
+            else:
+                buffer.write(json.dumps(row, ensure_ascii=False))
+                buffer.write("\n")
+            pending += 1
+            if pending >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    @staticmethod
+    async def run_payroll(period: str, created_by: str) -> PayrollRun:
+        """Compute and store the payroll run for a YYYY-MM period.
+        
+        Everyone employed on some day of the period is paid for the days
+        their employment intervals cover, in the department they were last
+        in during it; employees who left since are still paid for past
+        periods. Employee fields and intervals are gathered into columns in
+        one pass and the run is computed vectorized; raises ValueError for
+        a malformed period.
+        """
+        first_ordinal, stop_ordinal = period_bounds(period)
+        histories = dict(employment_db.items())
+        employee_ids: List[str] = []
+        employee_numbers: List[str] = []
+        department_ids: List[str] = []
+        salaries: List[float] = []
+        interval_rows: List[int] = []
+        interval_starts: List[int] = []
+        interval_ends: List[int] = []
+        for employee in employees_db.values():
+            row = len(employee_ids)
+            department_id = None
+            for record in histories.get(employee.id) or EmployeeService._employment_records(employee):
+                start = record.start_date.toordinal()
+                end = record.end_date.toordinal() if record.end_date else OPEN_ENDED
+                if start < stop_ordinal and end > first_ordinal:
+                    interval_rows.append(row)
+                    interval_starts.append(start)
+                    interval_ends.append(end)
+                    department_id = record.department_id
+            if department_id is None:
+                continue
+            employee_ids.append(employee.id)
+            employee_numbers.append(employee.employee_number)
+            department_ids.append(department_id)
+            salaries.append(employee.salary)
+        
+        run = compute_run(
+            period, employee_ids, employee_numbers, department_ids, salaries,
+            interval_rows, interval_starts, interval_ends, PAYROLL_ALLOWANCE_RATES, created_by
+        )
+        payroll_runs.add(run)
+        logger.info(f"Payroll run {run.id} for {period}: {len(run)} payslips, net {run.totals['net_pay']}")
+        return run
+    
+    @staticmethod
+    def _saudization_rate(saudi: int, total: int) -> float:
+        """Saudi share of headcount as a percentage"""
+        return round(saudi / total * 100, 2) if total > 0 else 0
+    
+    @staticmethod
+    async def get_employee_statistics(verify: bool = False, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get employee statistics from the running workforce counters.
+        
+        With verify=True the counters are also recomputed from employees_db
+        and any mismatch is reported under 'drift'. `fields` limits the
+        response to those STATISTICS_FIELDS; the per-department breakdown is
+        only built when requested.
+        """
+        counters = workforce_counters
+        total_employees = counters.total
+        saudi_employees = counters.saudi
+        
+        statistics = {
             'total_employees': total_employees,
-            'active_employees': active_employees,
+            'active_employees': counters.active,
             'saudi_employees': saudi_employees,
             'non_saudi_employees': total_employees - saudi_employees,
-            'saudization_rate': round(saudization_rate, 2),
+            'saudization_rate': EmployeeService._saudization_rate(saudi_employees, total_employees),
             'employees_by_status': {
-                status.value: len([e for e in employees_db.values() if e.status == status])
+                status.value: counters.by_status.get(status, 0)
                 for status in EmployeeStatus
             }
         }
+        if fields is None or 'employees_by_department' in fields:
+            statistics['employees_by_department'] = {
+                department_id: {
+                    'total_employees': counts['total'],
+                    'active_employees': counts['active'],
+                    'saudi_employees': counts['saudi'],
+                    'saudization_rate': EmployeeService._saudization_rate(
+                        counts['saudi'], counts['total']
+                    ),
+                    'employees_by_status': {
+                        status.value: counts['by_status'].get(status, 0)
+                        for status in EmployeeStatus
+                    }
+                }
+                for department_id, counts in counters.by_department.items()
+            }
+        if fields is not None:
+            statistics = {key: value for key, value in statistics.items() if key in fields}
+        
+        if verify:
+            recomputed = WorkforceCounters(EmployeeStatus.ACTIVE)
+            for employee in employees_db.values():
+                recomputed.apply(employee.department_id, employee.status, employee.is_saudi, 1)
+            drift = _counter_drift(recomputed.snapshot(), counters.snapshot())
+            if drift:
+                logger.warning(f"Workforce counter drift detected: {drift}")
+            statistics['consistency'] = {
+                'consistent': not drift,
+                'drift': drift
+            }
+        
+        return statistics
     
     @staticmethod
-    async def create_onboarding_tasks(employee_id: str) -> List[OnboardingTask]:
+    async def create_onboarding_tasks(employee: Employee) -> List[OnboardingTask]:
         """Create onboarding tasks for new employee"""
-        standard_tasks = [
-            {
-                'task_name': 'IT Setup',
-                'task_description': 'Setup computer, email, and system access',
-                'assigned_to': 'IT_DEPARTMENT',
-                'days_to_complete': 1
-            },
-            {
-                'task_name': 'HR Documentation',
-                'task_description': 'Complete employment contracts and policies',
-                'assigned_to': 'HR_DEPARTMENT',
-                'days_to_complete': 2
-            },
-            {
-                'task_name': 'Government Registration',
-                'task_description': 'Register with GOSI, HRSD, and other authorities',
-                'assigned_to': 'COMPLIANCE_TEAM',
-                'days_to_complete': 5
-            },
-            {
-                'task_name': 'Department Orientation',
-                'task_description': 'Introduction to team and role-specific training',
-                'assigned_to': 'DEPARTMENT_MANAGER',
-                'days_to_complete': 3
-            },
-            {
-                'task_name': 'Safety Training',
-                'task_description': 'Complete mandatory safety and security training',
-                'assigned_to': 'SAFETY_OFFICER',
-                'days_to_complete': 2
-            }
-        ]
+        tasks = EmployeeService._build_onboarding_tasks(employee, date.today())
+        onboarding_db.extend_records(employee.id, tasks)
+        onboarding_json.invalidate(employee.id)
+        EmployeeService._publish_onboarding(employee.id, tasks)
+        
+        logger.info(f"Created {len(tasks)} onboarding tasks for employee: {employee.id}")
+        return tasks
+    
+    @staticmethod
+    async def create_onboarding_tasks_bulk(employees: List[Employee]) -> int:
+        """Create onboarding tasks for a batch of new employees"""
+        today = date.today()
+        created = 0
+        for employee in employees:
+            tasks = EmployeeService._build_onboarding_tasks(employee, today)
+            onboarding_db.extend_records(employee.id, tasks)
+            onboarding_json.invalidate(employee.id)
+            EmployeeService._publish_onboarding(employee.id, tasks)
+            created += len(tasks)
         
-        tasks = []
-        for task_data in standard_tasks:
-            task = OnboardingTask(
+        logger.info(f"Created {created} onboarding tasks for {len(employees)} employees")
+        return created
+    
+    @staticmethod
+    def _build_onboarding_tasks(employee: Employee, start_date: date) -> List[OnboardingTask]:
+        """Instantiate the employee's onboarding checklist and queue its tasks"""
+        template = onboarding_templates.resolve(employee.department_id, employee.contract_type)
+        tasks = [
+            OnboardingTask(
                 id=str(uuid.uuid4()),
-                employee_id=employee_id,
-                task_name=task_data['task_name'],
-                task_description=task_data['task_description'],
-                assigned_to=task_data['assigned_to'],
-                due_date=date.today() + timedelta(days=task_data['days_to_complete']),
+                employee_id=employee.id,
+                task_name=task_name,
+                task_description=task_description,
+                assigned_to=assigned_to,
+                due_date=start_date + days_to_complete,
                 status='PENDING'
             )
-            tasks.append(task)
+            for task_name, task_description, assigned_to, days_to_complete in template
+        ]
+        for task in tasks:
+            onboarding_task_index.add(task)
+        return tasks
+    
+    @staticmethod
+    async def complete_onboarding_task(employee_id: str, task_id: str) -> Optional[OnboardingTask]:
+        """Mark an onboarding task completed and drop it from its assignee queue"""
+        tasks = onboarding_db.get(employee_id, [])
+        for task in tasks:
+            if task.id == task_id:
+                break
+        else:
+            return None
         
-        if employee_id not in onboarding_db:
-            onboarding_db[employee_id] = []
+        if task.status != 'COMPLETED':
+            task.status = 'COMPLETED'
+            task.completed_at = datetime.now()
+            # Write back so persistent backends store the change
+            onboarding_db[employee_id] = tasks
+            onboarding_json.invalidate(employee_id)
+            onboarding_task_index.close(task_id)
+            EmployeeService._publish_onboarding(employee_id, tasks)
+            logger.info(f"Completed onboarding task {task.task_name} for employee: {employee_id}")
+        return task
+    
+    @staticmethod
+    async def add_document(
+        employee_id: str,
+        document_data: EmployeeDocumentCreate,
+        uploaded_by: str
+    ) -> EmployeeDocument:
+        """Attach a document to an employee and index its expiry date"""
+        document = EmployeeDocument(
+            id=str(uuid.uuid4()),
+            employee_id=employee_id,
+            uploaded_by=uploaded_by,
+            uploaded_at=datetime.now(),
+            **document_data.model_dump()
+        )
+        documents_db.extend_records(employee_id, [document])
+        document_expiry_index.add(document)
+        change_feed.append('document_added', employee_id, document.model_dump(mode='json'))
         
-        onboarding_db[employee_id].extend(tasks)
+        # Already inside a swept window: announce it now rather than never
+        if (document.expiry_date and document_expiry_swept_through
+                and document.expiry_date < document_expiry_swept_through):
+            await asyncio.to_thread(
+                job_queue.enqueue, DOCUMENT_EXPIRY_JOB, {'documents': [document_expiry_event(document)]}
+            )
         
-        logger.info(f"Created {len(tasks)} onboarding tasks for employee: {employee_id}")
-        return tasks
+        logger.info(f"Added {document.document_type} document for employee: {employee_id}")
+        return document
+    
+    @staticmethod
+    async def remove_document(employee_id: str, document_id: str) -> bool:
+        """Remove a document from an employee and the expiry index"""
+        documents = documents_db.get(employee_id, [])
+        remaining = [document for document in documents if document.id != document_id]
+        if len(remaining) == len(documents):
+            return False
+        
+        documents_db[employee_id] = remaining
+        document_expiry_index.remove(document_id)
+        change_feed.append('document_removed', employee_id, {'id': document_id})
+        
+        logger.info(f"Removed document {document_id} for employee: {employee_id}")
+        return True
 
 
-# API Endpoints
+def rebuild_indexes() -> None:
+    """Rebuild every in-memory index from the records in employees_db"""
+    employee_number_index.clear()
+    national_id_index.clear()
+    email_index.clear()
+    filter_index.clear()
+    workforce_counters.clear()
+    saudization.clear()
+    creation_order.clear()
+    reporting_lines.clear()
+    employee_search.clear()
+    employment_intervals.clear()
+    employee_json.clear()
+    onboarding_json.clear()
+    for employee in employees_db.values():
+        EmployeeService._index_employee(employee)
+    employment_intervals.load_many(
+        (employee.id, [
+            (record.department_id, record.start_date, record.end_date)
+            for record in EmployeeService._employment_records(employee)
+        ])
+        for employee in employees_db.values()
+    )
+    
+    onboarding_task_index.clear()
+    for tasks in onboarding_db.values():
+        for task in tasks:
+            onboarding_task_index.add(task)
+    
+    document_expiry_index.clear()
+    for documents in documents_db.values():
+        for document in documents:
+            document_expiry_index.add(document)
+    
+    performance_columns.clear()
+    for employee_id, reviews in performance_db.items():
+        employee = employees_db.get(employee_id)
+        if employee is None:
+            continue
+        for review in reviews:
+            performance_columns.add_review(employee_id, review, employee.department_id, employee.manager_id)
+    
+    # Never hand out a number that persisted employees already hold
+    highest: Dict[str, int] = {}
+    for employee_number in employee_number_index:
+        prefix, _, seq = employee_number.rpartition('-')
+        if seq.isdigit():
+            highest[prefix] = max(highest.get(prefix, 0), int(seq))
+    for prefix, seq in highest.items():
+        employee_number_allocator.advance_to(prefix, seq + 1)
+    logger.info(f"Rebuilt employee indexes for {len(creation_order)} employees")
 
-@app.post("/employees", response_model=Employee)
-async def create_employee(
-    employee: EmployeeCreate,
-    background_tasks: BackgroundTasks,
-    created_by: str = "system"
+
+def _bind_storage(new_storage) -> None:
+    """Point the module-level collections at a storage backend's"""
+    global storage, employees_db, performance_db, documents_db, onboarding_db, employment_db
+    storage = new_storage
+    employees_db = storage.employees
+    performance_db = storage.performance
+    documents_db = storage.documents
+    onboarding_db = storage.onboarding
+    employment_db = storage.employment
+
+
+def use_storage(new_storage) -> None:
+    """Switch the service to another storage backend and reindex its data"""
+    _bind_storage(new_storage)
+    rebuild_indexes()
+
+
+def snapshots_enabled() -> bool:
+    """Whether SNAPSHOT_PATH is set and the backend keeps its state in memory"""
+    return bool(SNAPSHOT_PATH) and storage.backend in SNAPSHOT_BACKENDS
+
+
+def snapshot_state() -> Dict[str, Any]:
+    """The stores and indexes a snapshot holds"""
+    return {
+        'collections': {name: getattr(storage, name) for name in SNAPSHOT_COLLECTIONS},
+        'indexes': {name: globals()[name] for name in SNAPSHOT_INDEXES},
+        'saudization': saudization.headcounts()
+    }
+
+
+def snapshot_meta() -> Dict[str, Any]:
+    return {
+        'taken_at': datetime.now().isoformat(),
+        'backend': storage.backend,
+        'change_seq': change_feed.last_seq,
+        'employees': len(employees_db)
+    }
+
+
+def take_snapshot() -> Snapshot:
+    """Encode the stores and indexes as they are right now. Callers must keep
+    them from changing meanwhile (snapshot_gate)."""
+    return encode_snapshot(snapshot_state(), snapshot_meta())
+
+
+async def save_snapshot() -> Dict[str, Any]:
+    """Snapshot to SNAPSHOT_PATH.
+    
+    The state is pickled in a thread while snapshot_gate holds changes
+    back, so the event loop keeps serving reads; changes resume before the
+    file is written.
+    """
+    global last_snapshot
+    async with snapshot_gate.paused():
+        snapshot = await asyncio.to_thread(take_snapshot)
+    size = await asyncio.to_thread(write_snapshot, SNAPSHOT_PATH, snapshot)
+    last_snapshot = {**snapshot.meta, 'bytes': size}
+    return last_snapshot
+
+
+def replay_changes(since: int) -> int:
+    """Apply the change feed entries after sequence `since`; returns how many.
+    
+    Raises ChangeFeedGap when some of them are no longer retained. A feed
+    that is behind `since` (no CHANGE_FEED_DIR) continues numbering after it.
+    """
+    if change_feed.last_seq < since:
+        change_feed.advance_to(since)
+        return 0
+    replayed = 0
+    while since < change_feed.last_seq:
+        changes = change_feed.read(since, 1000)
+        if not changes:
+            break
+        for change in changes:
+            EmployeeService._replay_change(change)
+        since = changes[-1]['seq']
+        replayed += len(changes)
+    return replayed
+
+
+def _bind_indexes(indexes: Dict[str, Any]) -> None:
+    """Point the module-level indexes at those restored from a snapshot"""
+    global employee_number_index, national_id_index, email_index, filter_index
+    global workforce_counters, creation_order, employee_search, reporting_lines
+    global employment_intervals, performance_columns, onboarding_task_index, document_expiry_index
+    missing = [name for name in SNAPSHOT_INDEXES if name not in indexes]
+    if missing:
+        raise SnapshotError(f"Snapshot lacks indexes: {', '.join(missing)}")
+    employee_number_index = indexes['employee_number_index']
+    national_id_index = indexes['national_id_index']
+    email_index = indexes['email_index']
+    filter_index = indexes['filter_index']
+    workforce_counters = indexes['workforce_counters']
+    creation_order = indexes['creation_order']
+    employee_search = indexes['employee_search']
+    reporting_lines = indexes['reporting_lines']
+    employment_intervals = indexes['employment_intervals']
+    performance_columns = indexes['performance_columns']
+    onboarding_task_index = indexes['onboarding_task_index']
+    document_expiry_index = indexes['document_expiry_index']
+
+
+def restore_snapshot(path: str) -> Dict[str, Any]:
+    """Load the stores and indexes from a snapshot instead of rebuilding
+    them, then catch up on the changes recorded after it: employee records,
+    performance reviews, documents and onboarding tasks.
+    """
+    global last_snapshot
+    started = time.perf_counter()
+    meta, state = read_snapshot(path)
+    if meta['backend'] != storage.backend:
+        raise SnapshotError(f"{path} is a {meta['backend']} snapshot, the service uses {storage.backend}")
+    
+    _bind_indexes(state['indexes'])
+    for name in SNAPSHOT_COLLECTIONS:
+        setattr(storage, name, state['collections'][name])
+    _bind_storage(storage)
+    saudization.load_headcounts(state['saudization'])
+    employee_json.clear()
+    onboarding_json.clear()
+    
+    try:
+        replayed = replay_changes(meta['change_seq'])
+    except ChangeFeedGap as e:
+        replayed = 0
+        logger.warning(f"Restored {path} without the changes made after it: {e}")
+    last_snapshot = {**meta, 'replayed': replayed}
+    logger.info(
+        f"Restored {meta['employees']} employees from {path} (taken {meta['taken_at']}) "
+        f"and replayed {replayed} changes in {time.perf_counter() - started:.2f}s"
+    )
+    return last_snapshot
+
+
+def _counter_drift(expected: Dict[str, Any], actual: Dict[str, Any], path: str = "") -> Dict[str, Any]:
+    """Flatten the differences between two counter snapshots into path -> values"""
+    drift: Dict[str, Any] = {}
+    for key in set(expected) | set(actual):
+        name = getattr(key, 'value', key)
+        key_path = f"{path}.{name}" if path else str(name)
+        exp_value = expected.get(key, 0)
+        act_value = actual.get(key, 0)
+        if isinstance(exp_value, dict) or isinstance(act_value, dict):
+            drift.update(_counter_drift(exp_value or {}, act_value or {}, key_path))
+        elif exp_value != act_value:
+            drift[key_path] = {'expected': exp_value, 'actual': act_value}
+    return drift
+
+
+def open_storage(backend: str = EMPLOYEE_STORAGE_BACKEND, path: str = EMPLOYEE_DB_PATH):
+    """Open the storage backend and point the module-level collections at it
+    (`path` is only used by the sqlite backend)"""
+    if backend == "sqlite":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _bind_storage(create_storage(
+        Employee, STORAGE_RECORD_MODELS, backend, STORAGE_PACKED_FIELDS, path
+    ))
+    return storage
+
+
+def open_sequence_allocator(path: str = EMPLOYEE_SEQUENCE_PATH) -> BlockSequenceAllocator:
+    """Open the shared employee number sequence file"""
+    global employee_number_allocator
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    employee_number_allocator = BlockSequenceAllocator(
+        path, block_size=int(os.getenv("EMPLOYEE_NUMBER_BLOCK_SIZE", 1000))
+    )
+    return employee_number_allocator
+
+
+# API Endpoints
+
+@app.on_event("startup")
+async def open_sequences():
+    """Open the employee number sequences before anything reindexes"""
+    open_sequence_allocator()
+
+
+@app.on_event("startup")
+async def load_storage():
+    """Open storage, then restore the latest snapshot or rebuild the
+    in-memory indexes from persisted employees"""
+    open_storage()
+    if snapshots_enabled() and os.path.exists(SNAPSHOT_PATH):
+        restore_snapshot(SNAPSHOT_PATH)
+    elif storage.backend != "memory":
+        rebuild_indexes()
+
+
+@app.on_event("startup")
+async def start_workers():
+    """Start draining queued jobs, the periodic document expiry sweep,
+    periodic storage flushes and periodic snapshots"""
+    global document_expiry_sweeper, snapshotter, storage_flusher
+    open_job_queue()
+    await job_workers.start()
+    document_expiry_sweeper = asyncio.create_task(run_document_expiry_sweeper())
+    if storage.flush_interval:
+        storage_flusher = asyncio.create_task(run_storage_flusher())
+    if snapshots_enabled() and SNAPSHOT_INTERVAL > 0:
+        snapshotter = asyncio.create_task(run_snapshotter())
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    """Let in-flight jobs finish; unstarted jobs stay queued for next start"""
+    if document_expiry_sweeper:
+        document_expiry_sweeper.cancel()
+    if snapshotter:
+        snapshotter.cancel()
+    if storage_flusher:
+        storage_flusher.cancel()
+    await job_workers.stop()
+    job_queue.close()
+    employee_number_allocator.close()
+
+
+@app.on_event("shutdown")
+async def write_final_snapshot():
+    """Snapshot once nothing changes any more, so the next start has no
+    changes to replay"""
+    if not snapshots_enabled():
+        return
+    # A periodic write still in flight is older, so it cannot replace this one
+    await save_snapshot()
+
+
+@app.on_event("shutdown")
+async def close_storage():
+    """Flush batched writes and close the storage backend"""
+    storage.flush()
+    storage.close()
+    change_feed.close()
+
+
+@app.post("/employees", response_model=Employee)
+async def create_employee(
+    employee: EmployeeCreate,
+    created_by: str = "system"
 ):
     """Create a new employee"""
     try:
         new_employee = await EmployeeService.create_employee(employee, created_by)
         
-        # Add background task for government registration
-        background_tasks.add_task(
-            register_with_government_systems,
-            new_employee.id
-        )
+        # Queue government registration; the worker pool picks it up
+        await asyncio.to_thread(job_queue.enqueue, GOVERNMENT_REGISTRATION_JOB, {'employee_id': new_employee.id})
         
         return new_employee
+    except DuplicateEmployeeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating employee: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create employee")
 
 
+def employee_etag(employee: Employee) -> str:
+    """Strong ETag of an employee record (its version)"""
+    return f'"{employee.version}"'
+
+
+def etag_version(etag: str) -> Optional[int]:
+    """Version named by an If-Match value; None for '*'"""
+    etag = etag.strip()
+    if etag == "*":
+        return None
+    try:
+        return int(etag.removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid ETag: {etag}")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    return any(
+        candidate == "*" or candidate.removeprefix("W/") == etag
+        for candidate in (value.strip() for value in if_none_match.split(","))
+    )
+
+
+employee_list_adapter = TypeAdapter(List[Employee])
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str] = Employee.model_fields) -> Optional[List[str]]:
+    """Split a comma-separated `fields` projection; 400 on unknown names"""
+    if not fields:
+        return None
+    columns = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in columns if field not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return columns
+
+
+def projected_json(employees: List[Employee], fields: List[str], headers: Optional[Dict[str, str]] = None) -> Response:
+    """JSON array of only `fields` of each employee.
+    
+    Bypasses response_model validation: records in the store are already
+    valid, and the serializer never touches unrequested fields.
+    """
+    return json_response(employee_list_adapter.dump_json(employees, include={'__all__': set(fields)}), headers)
+
+
+def json_response(content: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Already-serialized JSON; skips response_model validation and encoding"""
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def employees_json(employees: List[Employee], headers: Optional[Dict[str, str]] = None) -> Response:
+    """JSON array of employees assembled from their cached serializations"""
+    return json_response(
+        employee_json.json_array((employee.id, employee, employee.version) for employee in employees),
+        headers
+    )
+
+
+async def read_bulk_rows(request: Request, what: str) -> List[Any]:
+    """Rows of a bulk request body: a JSON array, or NDJSON by content type.
+    
+    Unparseable NDJSON lines become ValueError entries so they can be
+    reported per row.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        rows: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(ValueError(f"Invalid JSON: {e}"))
+        return rows
+    
+    try:
+        rows = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail=f"Expected a JSON array of {what}")
+    return rows
+
+
+@app.post("/employees/bulk")
+async def bulk_create_employees(
+    request: Request,
+    created_by: str = "system"
+):
+    """Create many employees from a JSON array or NDJSON body.
+    
+    Responds with an NDJSON stream holding one result line per input row.
+    """
+    rows = await read_bulk_rows(request, "employees")
+    
+    results, created = await EmployeeService.bulk_create_employees(rows, created_by)
+    
+    if created:
+        await asyncio.to_thread(
+            job_queue.enqueue_many,
+            GOVERNMENT_REGISTRATION_JOB,
+            [{'employee_id': employee.id} for employee in created]
+        )
+    
+    return StreamingResponse(
+        (json.dumps(result) + "\n" for result in results),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.get("/employees/changes")
+async def get_employee_changes(
+    since: int = 0,
+    limit: int = 1000,
+    wait: float = 0,
+    stream: bool = False
+):
+    """Employee changes after sequence number `since`, oldest first.
+    
+    `wait` long-polls up to that many seconds when nothing is new yet;
+    `stream=true` keeps the response open as NDJSON, one change per line.
+    Responds 410 when `since` is outside the retained feed; the consumer
+    should then resync from a full listing and continue from `latest_seq`.
+    Changes with an op in RECORD_CHANGE_OPS carry a review, a document (or
+    its id) or the onboarding task list instead of the employee record.
+    """
+    try:
+        change_feed.check(since)
+    except ChangeFeedGap as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    
+    if stream:
+        async def stream_changes(since: int):
+            while True:
+                try:
+                    changes = change_feed.read(since, limit)
+                except ChangeFeedGap as e:
+                    yield json.dumps({'error': str(e)}) + "\n"
+                    return
+                for change in changes:
+                    yield json.dumps(change) + "\n"
+                if changes:
+                    since = changes[-1]['seq']
+                else:
+                    await change_feed.wait(since, CHANGE_FEED_MAX_WAIT)
+        
+        return StreamingResponse(stream_changes(since), media_type="application/x-ndjson")
+    
+    await change_feed.wait(since, min(wait, CHANGE_FEED_MAX_WAIT))
+    changes = change_feed.read(since, limit)
+    return {
+        'changes': changes,
+        'next_since': changes[-1]['seq'] if changes else since,
+        'latest_seq': change_feed.last_seq
+    }
+
+
+@app.get("/employees/search", response_model=List[Employee])
+async def search_employees(q: str, limit: int = 20):
+    """Search employees by Arabic or English name and job title, best match first"""
+    matches = employee_search.search(q, limit)
+    return employees_db.get_many([employee_id for employee_id, _ in matches])
+
+
+@app.get("/employees/export")
+async def export_employees(
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    department_id: Optional[str] = None,
+    status: Optional[EmployeeStatus] = None,
+    is_saudi: Optional[bool] = None
+):
+    """Stream the employee directory as NDJSON or CSV.
+    
+    `fields` is a comma-separated projection; filters match GET /employees.
+    """
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    
+    columns = parse_fields(fields)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        EmployeeService.export_employees(
+            export_format=format,
+            fields=columns,
+            department_id=department_id,
+            status=status,
+            is_saudi=is_saudi
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=employees.{format}"}
+    )
+
+
 @app.get("/employees/{employee_id}", response_model=Employee)
-async def get_employee(employee_id: str):
-    """Get employee by ID"""
-    employee = await EmployeeService.get_employee(employee_id)
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    return employee
+async def get_employee(
+    employee_id: str,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get employee by ID.
+    
+    The ETag header carries the record version; sending it back in
+    If-None-Match gets a body-less 304 while the record is unchanged.
+    `fields` is a comma-separated projection of the response.
+    """
+    columns = parse_fields(fields)
+    if columns:
+        if employee_id not in employees_db:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        employee = employees_db.get_many([employee_id], [*columns, 'version'])[0]
+    else:
+        employee = await EmployeeService.get_employee(employee_id)
+        if not employee:
+            raise HTTPException(status_code=404, detail="Employee not found")
+    etag = employee_etag(employee)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if columns:
+        return json_response(employee.model_dump_json(include=set(columns)).encode(), {"ETag": etag})
+    return json_response(employee_json.get(employee.id, employee, employee.version), {"ETag": etag})
 
 
 @app.get("/employees/number/{employee_number}", response_model=Employee)
@@ -360,26 +1978,61 @@ async def get_employee_by_number(employee_number: str):
     employee = await EmployeeService.get_employee_by_number(employee_number)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return employee
+    return json_response(employee_json.get(employee.id, employee, employee.version))
 
 
 @app.put("/employees/{employee_id}", response_model=Employee)
 async def update_employee(
     employee_id: str,
     employee_update: EmployeeUpdate,
-    updated_by: str = "system"
+    response: Response,
+    updated_by: str = "system",
+    if_match: Optional[str] = Header(None)
 ):
-    """Update employee information"""
-    employee = await EmployeeService.update_employee(employee_id, employee_update, updated_by)
+    """Update employee information.
+    
+    With If-Match the update only applies to that version (412 otherwise).
+    Fields equal to their current value are ignored; an update that changes
+    nothing leaves the version and updated_at as they were.
+    """
+    version = etag_version(if_match) if if_match else None
+    try:
+        employee = await EmployeeService.update_employee(employee_id, employee_update, updated_by, version)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=412, detail=str(e), headers={"ETag": employee_etag(e.employee)})
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=validation_messages(e))
+    except ReportingLineError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
+    response.headers["ETag"] = employee_etag(employee)
     return employee
 
 
+@app.patch("/employees/bulk")
+async def bulk_update_employees(
+    request: Request,
+    updated_by: str = "system"
+):
+    """Update many employees from a JSON array or NDJSON body.
+    
+    Each row holds an employee `id`, the `version` (ETag) it was read at and
+    the fields to change. Responds with an NDJSON stream holding one result
+    line per input row; see EmployeeService.bulk_update_employees.
+    """
+    rows = await read_bulk_rows(request, "employee updates")
+    results = await EmployeeService.bulk_update_employees(rows, updated_by)
+    return StreamingResponse(
+        (json.dumps(result) + "\n" for result in results),
+        media_type="application/x-ndjson"
+    )
+
+
 @app.delete("/employees/{employee_id}")
-async def delete_employee(employee_id: str):
-    """Delete (terminate) employee"""
-    success = await EmployeeService.delete_employee(employee_id)
+async def delete_employee(employee_id: str, effective_date: Optional[date] = None):
+    """Delete (terminate) employee, optionally from a given date"""
+    success = await EmployeeService.delete_employee(employee_id, effective_date)
     if not success:
         raise HTTPException(status_code=404, detail="Employee not found")
     return {"message": "Employee terminated successfully"}
@@ -390,11 +2043,65 @@ async def list_employees(
     department_id: Optional[str] = None,
     status: Optional[EmployeeStatus] = None,
     is_saudi: Optional[bool] = None,
-    skip: int = 0,
-    limit: int = 100
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """List employees with optional filters.
+    
+    Passing `cursor` (empty to start) switches to keyset pagination ordered
+    by creation time; the next page's cursor is returned in the
+    X-Next-Cursor header, which is omitted on the last page. `fields` is a
+    comma-separated projection, e.g. fields=id,first_name,last_name.
+    """
+    columns = parse_fields(fields)
+    if cursor is not None:
+        try:
+            employees, next_cursor = await EmployeeService.list_employees_after(
+                cursor=cursor,
+                department_id=department_id,
+                status=status,
+                is_saudi=is_saudi,
+                limit=limit
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        if columns:
+            return projected_json(employees, columns, headers=headers)
+        return employees_json(employees, headers)
+    
+    employees = await EmployeeService.list_employees(
+        department_id=department_id,
+        status=status,
+        is_saudi=is_saudi,
+        skip=skip,
+        limit=limit,
+        fields=columns
+    )
+    if columns:
+        return projected_json(employees, columns)
+    return employees_json(employees)
+
+
+@app.get("/employees/{employee_id}/reports", response_model=List[Employee])
+async def list_reports(
+    employee_id: str,
+    direct: bool = False,
+    department_id: Optional[str] = None,
+    status: Optional[EmployeeStatus] = None,
+    is_saudi: Optional[bool] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1)
 ):
-    """List employees with optional filters"""
-    return await EmployeeService.list_employees(
+    """Employees reporting to a manager, directly or anywhere below them"""
+    if employee_id not in employees_db:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    return await EmployeeService.list_reports(
+        employee_id,
+        direct=direct,
         department_id=department_id,
         status=status,
         is_saudi=is_saudi,
@@ -403,10 +2110,162 @@ async def list_employees(
     )
 
 
+@app.get("/employees/{employee_id}/reports/headcount")
+async def get_reports_headcount(employee_id: str):
+    """Direct and total headcount under a manager"""
+    if employee_id not in employees_db:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    return {
+        'employee_id': employee_id,
+        'direct_reports': reporting_lines.direct_headcount(employee_id),
+        'headcount': reporting_lines.headcount(employee_id)
+    }
+
+
+@app.get("/employees/{employee_id}/reports/span-of-control")
+async def get_span_of_control(employee_id: str):
+    """Span-of-control statistics across a manager's subtree"""
+    if employee_id not in employees_db:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    return reporting_lines.span_of_control(employee_id)
+
+
 @app.get("/employees/statistics/summary")
-async def get_employee_statistics():
-    """Get employee statistics summary"""
-    return await EmployeeService.get_employee_statistics()
+async def get_employee_statistics(verify: bool = False, fields: Optional[str] = None):
+    """Get employee statistics summary (verify=true recomputes and reports drift;
+    `fields` selects top-level keys, e.g. fields=total_employees,saudization_rate)"""
+    return await EmployeeService.get_employee_statistics(
+        verify=verify, fields=parse_fields(fields, STATISTICS_FIELDS)
+    )
+
+
+@app.get("/headcount")
+async def get_headcount(as_of: date, department_id: Optional[str] = None):
+    """Headcount on a past, present or future date, overall and by department"""
+    if department_id is not None:
+        return {
+            'as_of': as_of,
+            'department_id': department_id,
+            'headcount': employment_intervals.headcount(as_of, department_id)
+        }
+    return {
+        'as_of': as_of,
+        'headcount': employment_intervals.headcount(as_of),
+        'by_department': employment_intervals.headcount_by_department(as_of)
+    }
+
+
+@app.get("/headcount/movement")
+async def get_headcount_movement(start: date, end: date, department_id: Optional[str] = None):
+    """Opening and closing headcount, joiners and leavers over [start, end].
+    
+    Department figures count transfers as joiners and leavers; company-wide
+    figures only count hires and terminations.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    return {
+        'start': start,
+        'end': end,
+        'department_id': department_id,
+        **employment_intervals.movement(start, end, department_id)
+    }
+
+
+@app.get("/headcount/monthly")
+async def get_monthly_headcount(
+    start: date,
+    end: date,
+    department_id: Optional[str] = None,
+    by_department: bool = False
+):
+    """Month-end headcount with joiners and leavers for each month in range"""
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if by_department:
+        return {
+            department: employment_intervals.monthly_series(start, end, department)
+            for department in employment_intervals.departments()
+        }
+    return employment_intervals.monthly_series(start, end, department_id)
+
+
+@app.post("/payroll/runs")
+async def create_payroll_run(period: str, created_by: str = "system"):
+    """Run payroll for a YYYY-MM period; returns the run id and totals"""
+    try:
+        run = await EmployeeService.run_payroll(period, created_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return run.summary()
+
+
+@app.get("/payroll/runs")
+async def list_payroll_runs(period: Optional[str] = None):
+    """Payroll runs, newest first"""
+    return [run.summary() for run in payroll_runs.list(period)]
+
+
+@app.get("/payroll/runs/{run_id}")
+async def get_payroll_run(run_id: str):
+    """Payroll run totals, overall and per department"""
+    run = payroll_runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    return run.summary()
+
+
+@app.get("/payroll/runs/{run_id}/payslips")
+async def export_payslips(run_id: str, format: str = "ndjson"):
+    """Stream every payslip of a run as NDJSON or CSV"""
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    run = payroll_runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        run.export(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=payslips-{run.period}.{format}"}
+    )
+
+
+@app.get("/payroll/runs/{run_id}/payslips/{employee_id}")
+async def get_payslip(run_id: str, employee_id: str):
+    """One employee's payslip from a run"""
+    run = payroll_runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    payslip = run.payslip(employee_id)
+    if payslip is None:
+        raise HTTPException(status_code=404, detail="Employee not paid in this run")
+    return {'run_id': run.id, 'period': run.period, **payslip}
+
+
+@app.get("/nitaqat")
+async def get_nitaqat_summary():
+    """Saudization rate and Nitaqat band per establishment and department"""
+    return saudization.summary()
+
+
+@app.post("/nitaqat/scenarios")
+async def evaluate_nitaqat_scenarios(scenarios: List[NitaqatScenario]):
+    """Evaluate what-if scenarios against the live workforce, all at once.
+    
+    Returns one result per scenario (in order) with the rate, band and rate
+    change of every establishment and department it touches, and whether it
+    is feasible (it never removes more employees than a department holds).
+    """
+    try:
+        results = saudization.evaluate([scenario.actions for scenario in scenarios])
+    except ScenarioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for scenario, result in zip(scenarios, results):
+        result['name'] = scenario.name
+    return results
 
 
 @app.get("/employees/{employee_id}/onboarding", response_model=List[OnboardingTask])
@@ -415,19 +2274,53 @@ async def get_onboarding_tasks(employee_id: str):
     if employee_id not in employees_db:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    return onboarding_db.get(employee_id, [])
+    return json_response(onboarding_json.get_or_load(employee_id, lambda: onboarding_db.get(employee_id, [])))
+
+
+@app.post("/employees/{employee_id}/onboarding/{task_id}/complete", response_model=OnboardingTask)
+async def complete_onboarding_task(employee_id: str, task_id: str):
+    """Mark an onboarding task as completed"""
+    task = await EmployeeService.complete_onboarding_task(employee_id, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Onboarding task not found")
+    
+    return task
+
+
+@app.get("/onboarding/overdue")
+async def get_overdue_summary(as_of: Optional[date] = None):
+    """Open and overdue onboarding task counts per assignee"""
+    return onboarding_task_index.overdue_summary(as_of or date.today())
+
+
+@app.get("/onboarding/queues/{assigned_to}", response_model=List[OnboardingTask])
+async def get_onboarding_queue(assigned_to: str, limit: int = 100):
+    """Open onboarding tasks for an assignee, earliest due first"""
+    return json_response(onboarding_json.serialize(onboarding_task_index.queue(assigned_to, limit)))
+
+
+@app.get("/onboarding/queues/{assigned_to}/overdue", response_model=List[OnboardingTask])
+async def get_overdue_onboarding_tasks(
+    assigned_to: str,
+    as_of: Optional[date] = None,
+    limit: int = 100
+):
+    """Open onboarding tasks for an assignee that are past due"""
+    return json_response(onboarding_json.serialize(
+        onboarding_task_index.overdue(assigned_to, as_of or date.today(), limit)
+    ))
 
 
 @app.post("/employees/{employee_id}/performance", response_model=EmployeePerformance)
 async def add_performance_review(employee_id: str, performance: EmployeePerformance):
     """Add performance review for employee"""
-    if employee_id not in employees_db:
+    employee = employees_db.get(employee_id)
+    if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    if employee_id not in performance_db:
-        performance_db[employee_id] = []
-    
-    performance_db[employee_id].append(performance)
+    performance_db.extend_records(employee_id, [performance])
+    performance_columns.add_review(employee_id, performance, employee.department_id, employee.manager_id)
+    change_feed.append('performance_added', employee_id, performance.model_dump(mode='json'))
     
     logger.info(f"Added performance review for employee: {employee_id}")
     return performance
@@ -442,25 +2335,301 @@ async def get_performance_reviews(employee_id: str):
     return performance_db.get(employee_id, [])
 
 
+@app.get("/performance/analytics")
+async def get_performance_analytics(
+    group_by: PerformanceGroupBy = PerformanceGroupBy.DEPARTMENT,
+    department_id: Optional[str] = None,
+    manager_id: Optional[str] = None,
+    review_period: Optional[str] = None
+):
+    """Distributions of ratings, goal achievement and competency scores per group"""
+    return performance_columns.summary(
+        group_by,
+        department_id=department_id,
+        manager_id=manager_id,
+        review_period=review_period
+    )
+
+
+@app.post("/employees/{employee_id}/documents", response_model=EmployeeDocument)
+async def add_document(
+    employee_id: str,
+    document: EmployeeDocumentCreate,
+    uploaded_by: str = "system"
+):
+    """Attach a document to an employee"""
+    if employee_id not in employees_db:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    return await EmployeeService.add_document(employee_id, document, uploaded_by)
+
+
+@app.get("/employees/{employee_id}/documents", response_model=List[EmployeeDocument])
+async def get_documents(employee_id: str):
+    """Get documents for employee"""
+    if employee_id not in employees_db:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    return documents_db.get(employee_id, [])
+
+
+@app.delete("/employees/{employee_id}/documents/{document_id}")
+async def remove_document(employee_id: str, document_id: str):
+    """Remove a document from an employee"""
+    success = await EmployeeService.remove_document(employee_id, document_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"message": "Document removed successfully"}
+
+
+@app.get("/documents/expiring", response_model=List[EmployeeDocument])
+async def get_expiring_documents(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    document_type: Optional[str] = None,
+    limit: int = 100
+):
+    """Documents expiring in [start, end), earliest first (default: the next 30 days)"""
+    start = start or date.today()
+    end = end or start + timedelta(days=DOCUMENT_EXPIRY_HORIZON_DAYS)
+    return document_expiry_index.expiring(start, end, document_type, limit)
+
+
+@app.post("/documents/expiry-sweep")
+async def run_document_expiry_sweep(as_of: Optional[date] = None):
+    """Run the document expiry sweep now"""
+    return await sweep_document_expiries(as_of)
+
+
+@app.get("/jobs/stats")
+async def get_job_stats():
+    """Job queue depth per status"""
+    return await asyncio.to_thread(job_queue.stats)
+
+
+@app.get("/jobs")
+async def list_jobs(status: Optional[JobStatus] = None, limit: int = 100):
+    """List recent jobs, e.g. status=dead for the dead-letter queue"""
+    return [job.to_dict() for job in await asyncio.to_thread(job_queue.list, status, limit)]
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get a job's status, attempts and last error"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.post("/jobs/{job_id}/retry")
+async def retry_job(job_id: str):
+    """Requeue a dead-lettered job"""
+    if not await asyncio.to_thread(job_queue.retry, job_id):
+        raise HTTPException(status_code=404, detail="Dead-lettered job not found")
+    return {"message": "Job requeued"}
+
+
 # Background tasks
 
-async def register_with_government_systems(employee_id: str):
-    """Background task to register employee with government systems"""
+async def register_with_government_systems(
+    employee_id: str,
+    only: Optional[List[str]] = None
+) -> Dict[str, GovernmentRegistrationResult]:
+    """Register employee with government systems.
+    
+    GOSI, HRSD and QIWA (or just the systems named in `only`) are called
+    concurrently, each under its own timeout, and the per-system outcomes
+    are recorded on the employee record.
+    """
     logger.info(f"Starting government registration for employee: {employee_id}")
     
-    # Simulate government system registration
-    await asyncio.sleep(2)  # Simulate API calls
+    systems = [
+        (system, register)
+        for system, register in (
+            ('GOSI', register_with_gosi),
+            ('HRSD', register_with_hrsd),
+            ('QIWA', register_with_qiwa)
+        )
+        if only is None or system in only
+    ]
+    results = await asyncio.gather(*(
+        _register_with_system(system, register, employee_id)
+        for system, register in systems
+    ))
+    registrations = {result.system: result for result in results}
+    
+    async with snapshot_gate.changing():
+        employee = employees_db.get(employee_id)
+        if employee:
+            employee.government_registrations = {**employee.government_registrations, **registrations}
+            employee.version += 1
+            employees_db[employee_id] = employee
+            EmployeeService._publish_change('updated', employee, ['government_registrations'])
     
-    # Register with GOSI
-    await register_with_gosi(employee_id)
+    failed = [result.system for result in results if result.status != 'success']
+    if failed:
+        logger.warning(f"Government registration incomplete for employee {employee_id}: {', '.join(failed)}")
+    else:
+        logger.info(f"Completed government registration for employee: {employee_id}")
+    return registrations
+
+
+async def _register_with_system(system: str, register, employee_id: str) -> GovernmentRegistrationResult:
+    """Run one system's registration under the global limit and a timeout"""
+    async with government_registration_slots:
+        start = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(register(employee_id), GOVERNMENT_REGISTRATION_TIMEOUT)
+            status = 'success'
+        except asyncio.TimeoutError:
+            status = 'timeout'
+            error = f"No response within {GOVERNMENT_REGISTRATION_TIMEOUT}s"
+        except Exception as e:
+            status = 'failed'
+            error = str(e)
+        latency_ms = (time.perf_counter() - start) * 1000
+    
+    return GovernmentRegistrationResult(
+        system=system,
+        status=status,
+        latency_ms=round(latency_ms, 2),
+        completed_at=datetime.now(),
+        error=error
+    )
+
+
+async def run_government_registration_job(payload: Dict[str, Any]):
+    """Job handler: register an employee, retrying only the systems that failed"""
+    employee_id = payload['employee_id']
+    if employee_id not in employees_db:
+        # Possibly not (yet) in this process's store: retry, then dead-letter
+        raise RetryJob(f"Unknown employee: {employee_id}")
+    
+    registrations = await register_with_government_systems(employee_id, payload.get('systems'))
+    failed = [system for system, result in registrations.items() if result.status != 'success']
+    if failed:
+        raise RetryJob(
+            f"Registration failed for {', '.join(failed)}",
+            payload={'employee_id': employee_id, 'systems': failed}
+        )
+
+
+def document_expiry_event(document: EmployeeDocument) -> Dict[str, Any]:
+    """Payload entry announcing one expiring document"""
+    return {
+        'document_id': document.id,
+        'employee_id': document.employee_id,
+        'document_type': document.document_type,
+        'expiry_date': document.expiry_date.isoformat()
+    }
+
+
+async def sweep_document_expiries(as_of: Optional[date] = None) -> Dict[str, Any]:
+    """Queue expiry events for documents newly inside the expiry horizon.
     
-    # Register with HRSD
-    await register_with_hrsd(employee_id)
+    Covers expiry dates from the previous sweep's horizon (or the earliest
+    indexed date on the first sweep) up to as_of + DOCUMENT_EXPIRY_HORIZON_DAYS,
+    one job per DOCUMENT_EXPIRY_BATCH_SIZE documents. The watermark moves
+    before the jobs are queued, so documents added meanwhile are announced
+    by add_document; it moves back if queueing fails.
+    """
+    global document_expiry_swept_through
+    through = (as_of or date.today()) + timedelta(days=DOCUMENT_EXPIRY_HORIZON_DAYS)
+    if document_expiry_swept_through and through <= document_expiry_swept_through:
+        return {'documents': 0, 'batches': 0, 'through': document_expiry_swept_through}
     
-    # Register with QIWA
-    await register_with_qiwa(employee_id)
+    events = [
+        document_expiry_event(document)
+        for document in document_expiry_index.iter_range(document_expiry_swept_through, through)
+    ]
+    batches = [
+        {'documents': events[start:start + DOCUMENT_EXPIRY_BATCH_SIZE]}
+        for start in range(0, len(events), DOCUMENT_EXPIRY_BATCH_SIZE)
+    ]
+    previous, document_expiry_swept_through = document_expiry_swept_through, through
+    if batches:
+        try:
+            await asyncio.to_thread(job_queue.enqueue_many, DOCUMENT_EXPIRY_JOB, batches)
+        except Exception:
+            if document_expiry_swept_through == through:
+                document_expiry_swept_through = previous
+            raise
     
-    logger.info(f"Completed government registration for employee: {employee_id}")
+    logger.info(f"Document expiry sweep through {through}: {len(events)} documents in {len(batches)} batches")
+    return {'documents': len(events), 'batches': len(batches), 'through': through}
+
+
+async def run_document_expiry_sweeper():
+    """Sweep document expiries every DOCUMENT_EXPIRY_SWEEP_INTERVAL seconds"""
+    while True:
+        try:
+            await sweep_document_expiries()
+        except Exception as e:
+            logger.error(f"Document expiry sweep failed: {str(e)}")
+        await asyncio.sleep(DOCUMENT_EXPIRY_SWEEP_INTERVAL)
+
+
+async def run_document_expiry_job(payload: Dict[str, Any]):
+    """Job handler: announce a batch of expiring documents"""
+    for event in payload['documents']:
+        logger.info(
+            f"Document {event['document_id']} ({event['document_type']}) of employee "
+            f"{event['employee_id']} expires on {event['expiry_date']}"
+        )
+
+
+document_expiry_sweeper: Optional[asyncio.Task] = None
+
+
+async def run_snapshotter():
+    """Snapshot the in-memory state every SNAPSHOT_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+        try:
+            await save_snapshot()
+        except Exception as e:
+            logger.error(f"Snapshot failed: {str(e)}")
+
+
+snapshotter: Optional[asyncio.Task] = None
+
+
+async def run_storage_flusher():
+    """Commit batched storage writes every storage.flush_interval seconds"""
+    while True:
+        await asyncio.sleep(storage.flush_interval)
+        try:
+            await asyncio.to_thread(storage.flush)
+        except Exception as e:
+            logger.error(f"Storage flush failed: {str(e)}")
+
+
+storage_flusher: Optional[asyncio.Task] = None
+
+job_workers: Optional[WorkerPool] = None
+
+
+def open_job_queue(path: str = JOB_QUEUE_PATH) -> JobQueue:
+    """Open the job queue file and build the worker pool that drains it"""
+    global job_queue, job_workers
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    job_queue = JobQueue(
+        path,
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", 5)),
+        base_backoff=float(os.getenv("JOB_RETRY_BACKOFF", 2.0))
+    )
+    job_workers = WorkerPool(
+        job_queue,
+        {
+            GOVERNMENT_REGISTRATION_JOB: run_government_registration_job,
+            DOCUMENT_EXPIRY_JOB: run_document_expiry_job
+        },
+        workers=int(os.getenv("JOB_WORKERS", 4)),
+        rate_limit=float(os.getenv("JOB_RATE_LIMIT", 0))
+    )
+    return job_queue
 
 
 async def register_with_gosi(employee_id: str):
@@ -495,7 +2664,9 @@ async def health_check():
         "status": "healthy",
         "service": "employee-management",
         "timestamp": datetime.now().isoformat(),
-        "total_employees": len(employees_db)
+        "total_employees": len(employees_db),
+        "json_cache": employee_json.stats(),
+        "snapshot": last_snapshot
     }
 
 
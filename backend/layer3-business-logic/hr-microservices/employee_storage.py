@@ -0,0 +1,626 @@
+"""
+AQLHR Employee Storage Backends
+===============================
+
+Storage backends for the employee microservice. Each backend exposes the
+same five collections the service works with:
+
+- employees:   employee id -> Employee
+- performance: employee id -> list of EmployeePerformance
+- documents:   employee id -> list of EmployeeDocument
+- onboarding:  employee id -> list of OnboardingTask
+- employment:  employee id -> list of EmploymentInterval
+
+The in-memory backend keeps plain dicts (the default, and what tests use);
+the columnar backend packs employees into typed column arrays to cut memory;
+the SQLite backend persists everything to a single WAL-mode database file.
+"""
+
+from array import array
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, Optional, Tuple, Type, Union, get_args, get_origin
+from pydantic import BaseModel
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EmployeeDict(dict):
+    """Dict of employee id -> Employee with a batched read API"""
+
+    def get_many(self, employee_ids: List[str], fields: Optional[Iterable[str]] = None) -> List[BaseModel]:
+        """Employees for the given ids, in the same order.
+
+        `fields` lets backends build partial models; here the models already
+        exist, so whole records are returned.
+        """
+        return [self[employee_id] for employee_id in employee_ids]
+
+
+class RecordListDict(dict):
+    """Dict of employee id -> record list with an append-style write API"""
+
+    def extend_records(self, key: str, records: List[BaseModel]) -> None:
+        """Append records to the list stored under `key`"""
+        self.setdefault(key, []).extend(records)
+
+
+class InMemoryStorage:
+    """Plain dict storage; nothing survives a restart"""
+
+    backend = "memory"
+    # Seconds between periodic flush() calls; None when writes need none
+    flush_interval: Optional[float] = None
+
+    def __init__(self):
+        self.employees = EmployeeDict()
+        self.performance = RecordListDict()
+        self.documents = RecordListDict()
+        self.onboarding = RecordListDict()
+        self.employment = RecordListDict()
+
+    def put_employees(self, employees: List[BaseModel]) -> None:
+        """Store many employees at once"""
+        for employee in employees:
+            self.employees[employee.id] = employee
+
+    def flush(self) -> None:
+        """No-op: writes are applied immediately"""
+        pass
+
+    def close(self) -> None:
+        """No-op: nothing to release"""
+        pass
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NONE_LENGTH = 0xFFFFFFFF
+
+
+class _InternedColumn:
+    """Low-cardinality values stored once, with a small-int code per row"""
+
+    def __init__(self, typecode: str = 'I'):
+        self.values: List[Any] = []
+        self.lookup: Dict[Any, int] = {}
+        self.codes = array(typecode)
+
+    def _code(self, value: Any) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: Any) -> None:
+        self.codes.append(self._code(value))
+
+    def set(self, row: int, value: Any) -> None:
+        self.codes[row] = self._code(value)
+
+    def get(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+
+class _ObjectColumn:
+    """Arbitrary Python values (e.g. nested models) kept by reference"""
+
+    def __init__(self):
+        self.values: List[Any] = []
+
+    def append(self, value: Any) -> None:
+        self.values.append(value)
+
+    def set(self, row: int, value: Any) -> None:
+        self.values[row] = value
+
+    def get(self, row: int) -> Any:
+        return self.values[row]
+
+
+class _PackedStringColumn:
+    """Mostly-unique strings packed as UTF-8 into one buffer with offsets.
+
+    Overwrites append the new value and repoint the row; the old bytes are
+    left behind, which is fine for rarely-updated fields.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = array('Q')
+        self.lengths = array('I')
+
+    def _pack(self, value: Optional[str]) -> tuple:
+        if value is None:
+            return 0, _NONE_LENGTH
+        encoded = value.encode('utf-8')
+        offset = len(self.buffer)
+        self.buffer += encoded
+        return offset, len(encoded)
+
+    def append(self, value: Optional[str]) -> None:
+        offset, length = self._pack(value)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def set(self, row: int, value: Optional[str]) -> None:
+        self.offsets[row], self.lengths[row] = self._pack(value)
+
+    def get(self, row: int) -> Optional[str]:
+        length = self.lengths[row]
+        if length == _NONE_LENGTH:
+            return None
+        offset = self.offsets[row]
+        return self.buffer[offset:offset + length].decode('utf-8')
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class _NumericColumn:
+    """Fixed-width numbers in an array, with optional encode/decode"""
+
+    def __init__(self, typecode: str, encode=None, decode=None):
+        self.data = array(typecode)
+        # Module-level functions only, so tables stay picklable for snapshots
+        self.encode = encode or _identity
+        self.decode = decode or _identity
+
+    def append(self, value: Any) -> None:
+        self.data.append(self.encode(value))
+
+    def set(self, row: int, value: Any) -> None:
+        self.data[row] = self.encode(value)
+
+    def get(self, row: int) -> Any:
+        return self.decode(self.data[row])
+
+
+def _datetime_to_micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _micros_to_datetime(value: int) -> datetime:
+    return _EPOCH + value * _MICROSECOND
+
+
+def _partial_model(model: Type[BaseModel], values: Dict[str, Any]) -> BaseModel:
+    """A model instance holding only `values`, without validation.
+
+    model_construct() also fills in every default, which costs more than
+    reading a few columns; only serialize the fields that were set.
+    """
+    instance = model.__new__(model)
+    object.__setattr__(instance, '__dict__', values)
+    object.__setattr__(instance, '__pydantic_fields_set__', set(values))
+    object.__setattr__(instance, '__pydantic_extra__', None)
+    object.__setattr__(instance, '__pydantic_private__', None)
+    return instance
+
+
+def _column_for(annotation: Any, packed: bool):
+    """Pick a column type from a model field annotation"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1 and args[0] is str:
+            return _PackedStringColumn() if packed else _InternedColumn()
+        return _ObjectColumn()
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return _InternedColumn('B')
+        if annotation is bool:
+            return _NumericColumn('b', int, bool)
+        if annotation is int:
+            return _NumericColumn('q')
+        if annotation is float:
+            return _NumericColumn('d')
+        if annotation is datetime:
+            return _NumericColumn('q', _datetime_to_micros, _micros_to_datetime)
+        if annotation is date:
+            return _NumericColumn('i', date.toordinal, date.fromordinal)
+        if annotation is str:
+            return _PackedStringColumn() if packed else _InternedColumn()
+    return _ObjectColumn()
+
+
+class ColumnarEmployeeTable(MutableMapping[str, BaseModel]):
+    """employee id -> Employee mapping stored column by column.
+
+    Low-cardinality strings and enums are interned to small ints, numbers
+    and dates live in typed arrays, and mostly-unique strings are packed
+    into one UTF-8 buffer. Employee models are only built when a record is
+    read, i.e. at the API boundary.
+    """
+
+    def __init__(self, model: Type[BaseModel], packed_fields: Iterable[str] = ()):
+        self.model = model
+        packed = set(packed_fields)
+        self.field_names = [name for name in model.model_fields if name != 'id']
+        self.columns = {
+            name: _column_for(model.model_fields[name].annotation, name in packed)
+            for name in self.field_names
+        }
+        self.ids: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+
+    def __getitem__(self, employee_id: str) -> BaseModel:
+        row = self.rows[employee_id]
+        values = {name: column.get(row) for name, column in self.columns.items()}
+        return self.model.model_construct(id=employee_id, **values)
+
+    def __setitem__(self, employee_id: str, employee: BaseModel) -> None:
+        row = self.rows.get(employee_id)
+        if row is None:
+            self.rows[employee_id] = len(self.ids)
+            self.ids.append(employee_id)
+            for name, column in self.columns.items():
+                column.append(getattr(employee, name))
+        else:
+            for name, column in self.columns.items():
+                column.set(row, getattr(employee, name))
+
+    def __delitem__(self, employee_id: str) -> None:
+        # Column slots are left in place; only the id mapping is dropped
+        row = self.rows.pop(employee_id)
+        self.ids[row] = None
+
+    def __contains__(self, employee_id: object) -> bool:
+        return employee_id in self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get_many(self, employee_ids: List[str], fields: Optional[Iterable[str]] = None) -> List[BaseModel]:
+        """Employees for the given ids, in the same order.
+
+        With `fields`, partial models are built from those columns only
+        (plus id), so only serialize the requested fields.
+        """
+        if fields is None:
+            return [self[employee_id] for employee_id in employee_ids]
+        columns = [(name, self.columns[name]) for name in fields if name != 'id']
+        rows = self.rows
+        return [
+            _partial_model(self.model, {
+                'id': employee_id,
+                **{name: column.get(rows[employee_id]) for name, column in columns}
+            })
+            for employee_id in employee_ids
+        ]
+
+    def clear(self) -> None:
+        self.__init__(self.model, [
+            name for name, column in self.columns.items()
+            if isinstance(column, _PackedStringColumn)
+        ])
+
+
+class ColumnarStorage:
+    """Compact in-memory storage: columnar employees, plain record lists"""
+
+    backend = "columnar"
+    flush_interval: Optional[float] = None
+
+    def __init__(self, employee_model: Type[BaseModel], packed_fields: Iterable[str] = ()):
+        self.employees = ColumnarEmployeeTable(employee_model, packed_fields)
+        self.performance = RecordListDict()
+        self.documents = RecordListDict()
+        self.onboarding = RecordListDict()
+        self.employment = RecordListDict()
+
+    def put_employees(self, employees: List[BaseModel]) -> None:
+        """Store many employees at once"""
+        for employee in employees:
+            self.employees[employee.id] = employee
+
+    def flush(self) -> None:
+        """No-op: writes are applied immediately"""
+        pass
+
+    def close(self) -> None:
+        """No-op: nothing to release"""
+        pass
+
+
+class _SQLiteConnection:
+    """Shared connection with a lock and size/time-based batched commits"""
+
+    def __init__(self, path: str, commit_batch: int, commit_interval: float):
+        self.path = path
+        self.commit_batch = commit_batch
+        self.commit_interval = commit_interval
+        self.lock = threading.RLock()
+        self.pending = 0
+        self.last_commit = time.monotonic()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level="DEFERRED")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+
+    def write(self, sql: str, params: Any = (), many: bool = False) -> None:
+        """Execute a write, committing once the batch or interval is reached"""
+        with self.lock:
+            if many:
+                cursor = self.conn.executemany(sql, params)
+            else:
+                cursor = self.conn.execute(sql, params)
+            self.pending += max(cursor.rowcount, 1)
+            if (
+                self.pending >= self.commit_batch
+                or time.monotonic() - self.last_commit >= self.commit_interval
+            ):
+                self.commit()
+
+    def read(self, sql: str, params: Any = ()) -> List[tuple]:
+        """Execute a query and fetch every row"""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def iterate(self, sql: str, params: Any = (), chunk_size: int = 1000) -> Iterator[tuple]:
+        """Stream query rows in chunks instead of fetching them all at once"""
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield from rows
+
+    def commit(self) -> None:
+        """Commit any pending writes"""
+        with self.lock:
+            if self.pending:
+                self.conn.commit()
+                self.pending = 0
+            self.last_commit = time.monotonic()
+
+    def close(self) -> None:
+        """Commit and close the connection"""
+        with self.lock:
+            self.commit()
+            self.conn.close()
+
+
+class SQLiteEmployeeTable(MutableMapping[str, BaseModel]):
+    """employee id -> Employee mapping stored in the `employees` table.
+
+    Identifying and filter fields are kept as real columns next to the JSON
+    document so the table can be inspected and queried directly.
+    """
+
+    COLUMNS = (
+        'id', 'employee_number', 'national_id', 'email', 'department_id',
+        'status', 'is_saudi', 'created_at', 'data'
+    )
+
+    def __init__(self, db: _SQLiteConnection, model: Type[BaseModel]):
+        self.db = db
+        self.model = model
+        self.db.write(
+            "CREATE TABLE IF NOT EXISTS employees ("
+            " id TEXT PRIMARY KEY,"
+            " employee_number TEXT NOT NULL,"
+            " national_id TEXT NOT NULL,"
+            " email TEXT NOT NULL,"
+            " department_id TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " is_saudi INTEGER NOT NULL,"
+            " created_at TEXT NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        # Full scans (index rebuilds, values()) walk creation order
+        self.db.write("CREATE INDEX IF NOT EXISTS idx_employees_created ON employees (created_at, id)")
+        self.db.commit()
+
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        self._upsert_sql = f"INSERT OR REPLACE INTO employees ({', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+
+    def _row(self, employee: BaseModel) -> tuple:
+        return (
+            employee.id,
+            employee.employee_number,
+            employee.national_id,
+            employee.email,
+            employee.department_id,
+            getattr(employee.status, 'value', employee.status),
+            int(employee.is_saudi),
+            employee.created_at.isoformat(),
+            employee.model_dump_json(),
+        )
+
+    def __getitem__(self, employee_id: str) -> BaseModel:
+        rows = self.db.read("SELECT data FROM employees WHERE id = ?", (employee_id,))
+        if not rows:
+            raise KeyError(employee_id)
+        return self.model.model_validate_json(rows[0][0])
+
+    def __setitem__(self, employee_id: str, employee: BaseModel) -> None:
+        self.db.write(self._upsert_sql, self._row(employee))
+
+    def __delitem__(self, employee_id: str) -> None:
+        if employee_id not in self:
+            raise KeyError(employee_id)
+        self.db.write("DELETE FROM employees WHERE id = ?", (employee_id,))
+
+    def __contains__(self, employee_id: object) -> bool:
+        return bool(self.db.read("SELECT 1 FROM employees WHERE id = ?", (employee_id,)))
+
+    def __iter__(self) -> Iterator[str]:
+        for (employee_id,) in self.db.iterate("SELECT id FROM employees ORDER BY created_at, id"):
+            yield employee_id
+
+    def __len__(self) -> int:
+        return self.db.read("SELECT COUNT(*) FROM employees")[0][0]
+
+    def values(self) -> Iterator[BaseModel]:  # type: ignore[override]
+        """Every employee in creation order"""
+        for (data,) in self.db.iterate("SELECT data FROM employees ORDER BY created_at, id"):
+            yield self.model.model_validate_json(data)
+
+    def get_many(self, employee_ids: List[str], fields: Optional[Iterable[str]] = None) -> List[BaseModel]:
+        """Employees for the given ids, in the same order, with one query
+        (records are stored as JSON documents, so `fields` is not used)"""
+        if not employee_ids:
+            return []
+        placeholders = ", ".join("?" for _ in employee_ids)
+        rows = dict(self.db.read(
+            f"SELECT id, data FROM employees WHERE id IN ({placeholders})", tuple(employee_ids)
+        ))
+        return [self.model.model_validate_json(rows[employee_id]) for employee_id in employee_ids]
+
+    def put_many(self, employees: List[BaseModel]) -> None:
+        """Upsert many employees with a single executemany"""
+        self.db.write(self._upsert_sql, [self._row(employee) for employee in employees], many=True)
+
+    def clear(self) -> None:
+        self.db.write("DELETE FROM employees")
+
+
+class SQLiteRecordTable(MutableMapping[str, List[BaseModel]]):
+    """employee id -> list of records, one row per record in insertion order"""
+
+    def __init__(self, db: _SQLiteConnection, table: str, model: Type[BaseModel]):
+        self.db = db
+        self.table = table
+        self.model = model
+        self.db.write(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " employee_id TEXT NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        self.db.write(f"CREATE INDEX IF NOT EXISTS idx_{table}_employee ON {table} (employee_id, seq)")
+        self.db.commit()
+
+    def __getitem__(self, employee_id: str) -> List[BaseModel]:
+        rows = self.db.read(
+            f"SELECT data FROM {self.table} WHERE employee_id = ? ORDER BY seq", (employee_id,)
+        )
+        if not rows:
+            raise KeyError(employee_id)
+        return [self.model.model_validate_json(data) for (data,) in rows]
+
+    def get(self, employee_id: str, default: Any = None) -> Any:
+        try:
+            return self[employee_id]
+        except KeyError:
+            return default
+
+    def __setitem__(self, employee_id: str, records: List[BaseModel]) -> None:
+        self.db.write(f"DELETE FROM {self.table} WHERE employee_id = ?", (employee_id,))
+        self.extend_records(employee_id, records)
+
+    def __delitem__(self, employee_id: str) -> None:
+        self.db.write(f"DELETE FROM {self.table} WHERE employee_id = ?", (employee_id,))
+
+    def __contains__(self, employee_id: object) -> bool:
+        return bool(self.db.read(
+            f"SELECT 1 FROM {self.table} WHERE employee_id = ? LIMIT 1", (employee_id,)
+        ))
+
+    def __iter__(self) -> Iterator[str]:
+        for (employee_id,) in self.db.read(f"SELECT DISTINCT employee_id FROM {self.table}"):
+            yield employee_id
+
+    def __len__(self) -> int:
+        return self.db.read(f"SELECT COUNT(DISTINCT employee_id) FROM {self.table}")[0][0]
+
+    def items(self) -> Iterator[Tuple[str, List[BaseModel]]]:  # type: ignore[override]
+        """(employee id, records) for every employee, streamed in one query"""
+        employee_id, records = None, []
+        for row_employee_id, data in self.db.iterate(
+            f"SELECT employee_id, data FROM {self.table} ORDER BY employee_id, seq"
+        ):
+            if row_employee_id != employee_id:
+                if records:
+                    yield employee_id, records
+                employee_id, records = row_employee_id, []
+            records.append(self.model.model_validate_json(data))
+        if records:
+            yield employee_id, records
+
+    def extend_records(self, employee_id: str, records: List[BaseModel]) -> None:
+        """Append records for an employee"""
+        if records:
+            self.db.write(
+                f"INSERT INTO {self.table} (employee_id, data) VALUES (?, ?)",
+                [(employee_id, record.model_dump_json()) for record in records],
+                many=True
+            )
+
+    def clear(self) -> None:
+        self.db.write(f"DELETE FROM {self.table}")
+
+
+class SQLiteStorage:
+    """Durable storage in one SQLite database (WAL mode, batched commits)"""
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        employee_model: Type[BaseModel],
+        record_models: Dict[str, Type[BaseModel]],
+        commit_batch: int = 500,
+        commit_interval: float = 1.0
+    ):
+        self.db = _SQLiteConnection(path, commit_batch, commit_interval)
+        # A write only commits its batch when a later write arrives, so the
+        # service flushes this often to bound how long writes stay uncommitted
+        self.flush_interval = commit_interval
+        self.employees = SQLiteEmployeeTable(self.db, employee_model)
+        self.performance = SQLiteRecordTable(self.db, 'performance_reviews', record_models['performance'])
+        self.documents = SQLiteRecordTable(self.db, 'employee_documents', record_models['documents'])
+        self.onboarding = SQLiteRecordTable(self.db, 'onboarding_tasks', record_models['onboarding'])
+        self.employment = SQLiteRecordTable(self.db, 'employment_intervals', record_models['employment'])
+        logger.info(f"SQLite employee storage opened at {path}")
+
+    def put_employees(self, employees: List[BaseModel]) -> None:
+        """Store many employees in one statement batch"""
+        self.employees.put_many(employees)
+
+    def flush(self) -> None:
+        """Commit any batched writes"""
+        self.db.commit()
+
+    def close(self) -> None:
+        """Commit and close the database"""
+        self.db.close()
+
+
+def create_storage(
+    employee_model: Type[BaseModel],
+    record_models: Dict[str, Type[BaseModel]],
+    backend: Optional[str] = None,
+    packed_fields: Iterable[str] = (),
+    path: Optional[str] = None
+):
+    """Build the storage backend selected by EMPLOYEE_STORAGE_BACKEND; the
+    sqlite backend opens `path` (default EMPLOYEE_DB_PATH)"""
+    backend = backend or os.getenv("EMPLOYEE_STORAGE_BACKEND", "memory")
+    if backend == "memory":
+        return InMemoryStorage()
+    if backend == "columnar":
+        return ColumnarStorage(employee_model, packed_fields)
+    if backend == "sqlite":
+        return SQLiteStorage(
+            path or os.getenv("EMPLOYEE_DB_PATH", "employees.db"),
+            employee_model,
+            record_models,
+            commit_batch=int(os.getenv("EMPLOYEE_DB_COMMIT_BATCH", 500)),
+            commit_interval=float(os.getenv("EMPLOYEE_DB_COMMIT_INTERVAL", 1.0))
+        )
+    raise ValueError(f"Unknown employee storage backend: {backend}")
@@ -0,0 +1,187 @@
+"""
+AQLHR Employment Interval Index
+===============================
+
+Employment intervals -- hire or department move until termination or the
+next move -- kept as sorted start and end days per department and for the
+whole company. Headcount on any day is two binary searches (intervals
+started on or before the day minus those already ended), so point-in-time,
+range and monthly-series queries never replay employee history.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _month_end(year: int, month: int) -> date:
+    if month == 12:
+        return date(year, 12, 31)
+    return date.fromordinal(date(year, month + 1, 1).toordinal() - 1)
+
+
+class EmploymentIntervalIndex:
+    """Half-open [start, end) employment intervals as sorted day ordinals.
+
+    Department lists count every interval, so a move is a leaver in the old
+    department and a joiner in the new one; the company list (key None) only
+    counts hires and terminations.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.starts: Dict[Optional[str], List[int]] = {}
+        self.ends: Dict[Optional[str], List[int]] = {}
+        # employee id -> (department_id, interval start, employed since)
+        self.open: Dict[str, Tuple[str, int, int]] = {}
+        # While bulk loading, days are appended unsorted and sorted once at the end
+        self._bulk = False
+
+    def __contains__(self, employee_id: object) -> bool:
+        return employee_id in self.open
+
+    def _insert(self, table: Dict[Optional[str], List[int]], key: Optional[str], day: int) -> None:
+        if self._bulk:
+            table.setdefault(key, []).append(day)
+        else:
+            bisect.insort(table.setdefault(key, []), day)
+
+    def _remove(self, table: Dict[Optional[str], List[int]], key: Optional[str], day: int) -> None:
+        days = table[key]
+        if not self._bulk:
+            del days[bisect.bisect_left(days, day)]
+            return
+        # Unsorted: the day being removed was appended recently
+        for position in range(len(days) - 1, -1, -1):
+            if days[position] == day:
+                del days[position]
+                return
+
+    def hire(self, employee_id: str, department_id: str, day: date) -> None:
+        """Open an employment interval; no-op if the employee is already employed"""
+        if employee_id in self.open:
+            return
+        start = day.toordinal()
+        self._insert(self.starts, department_id, start)
+        self._insert(self.starts, None, start)
+        self.open[employee_id] = (department_id, start, start)
+
+    def _close_department(self, employee_id: str, end: int) -> Tuple[str, int, int]:
+        department_id, start, since = self.open.pop(employee_id)
+        if end <= start:
+            # Never started in this department (e.g. moved before a future start)
+            self._remove(self.starts, department_id, start)
+        else:
+            self._insert(self.ends, department_id, end)
+        return department_id, start, since
+
+    def move(self, employee_id: str, department_id: str, day: date, force: bool = False) -> None:
+        """Move an employed employee to another department from `day`; `force`
+        starts a new interval even within the same department"""
+        current = self.open.get(employee_id)
+        if current is None or (current[0] == department_id and not force):
+            return
+        # A move cannot take effect before the current interval starts
+        day_ordinal = max(day.toordinal(), current[1])
+        _, _, since = self._close_department(employee_id, day_ordinal)
+        self._insert(self.starts, department_id, day_ordinal)
+        self.open[employee_id] = (department_id, day_ordinal, since)
+
+    def terminate(self, employee_id: str, day: date) -> None:
+        """End employment on `day` (not counted from that day on)"""
+        current = self.open.get(employee_id)
+        if current is None:
+            return
+        # Like a move, a termination cannot precede the current interval
+        end = max(day.toordinal(), current[1])
+        _, _, since = self._close_department(employee_id, end)
+        if end <= since:
+            self._remove(self.starts, None, since)
+        else:
+            self._insert(self.ends, None, end)
+
+    def load(self, employee_id: str, intervals: List[Tuple[str, date, Optional[date]]]) -> None:
+        """Replay an employee's stored (department_id, start, end) intervals, oldest first"""
+        # Back-to-back intervals are continuous employment; a gap is a
+        # termination followed by a re-hire
+        for position, (department_id, start, end) in enumerate(intervals):
+            if employee_id not in self.open:
+                self.hire(employee_id, department_id, start)
+            following = intervals[position + 1] if position + 1 < len(intervals) else None
+            if following is not None and following[1] == end:
+                self.move(employee_id, following[0], end, force=True)
+            elif end is not None:
+                self.terminate(employee_id, end)
+
+    def load_many(self, histories: Iterable[Tuple[str, List[Tuple[str, date, Optional[date]]]]]) -> None:
+        """load() every (employee_id, intervals) pair, sorting once at the end
+        instead of inserting each day in order"""
+        self._bulk = True
+        try:
+            for employee_id, intervals in histories:
+                self.load(employee_id, intervals)
+        finally:
+            self._bulk = False
+            for table in (self.starts, self.ends):
+                for days in table.values():
+                    days.sort()
+
+    def _count(self, key: Optional[str], day: int) -> int:
+        return bisect.bisect_right(self.starts.get(key, ()), day) - bisect.bisect_right(self.ends.get(key, ()), day)
+
+    def _between(self, table: Dict[Optional[str], List[int]], key: Optional[str], after: int, until: int) -> int:
+        """Entries with after < day <= until"""
+        days = table.get(key, ())
+        return bisect.bisect_right(days, until) - bisect.bisect_right(days, after)
+
+    def departments(self) -> List[str]:
+        return sorted(key for key in self.starts if key is not None)
+
+    def headcount(self, day: date, department_id: Optional[str] = None) -> int:
+        """Employees employed on `day`, company-wide or in one department"""
+        return self._count(department_id, day.toordinal())
+
+    def headcount_by_department(self, day: date) -> Dict[str, int]:
+        """Non-zero headcounts per department on `day`"""
+        ordinal = day.toordinal()
+        counts = {department_id: self._count(department_id, ordinal) for department_id in self.departments()}
+        return {department_id: count for department_id, count in counts.items() if count}
+
+    def movement(self, start: date, end: date, department_id: Optional[str] = None) -> Dict[str, int]:
+        """Headcount at both ends of [start, end] plus joiners, leavers and
+        everyone employed at any point in between"""
+        first, last = start.toordinal(), end.toordinal()
+        return {
+            'headcount_start': self._count(department_id, first),
+            'headcount_end': self._count(department_id, last),
+            'joined': self._between(self.starts, department_id, first, last),
+            'left': self._between(self.ends, department_id, first, last),
+            # start <= last and end > first
+            'employed_during': (
+                bisect.bisect_right(self.starts.get(department_id, ()), last)
+                - bisect.bisect_right(self.ends.get(department_id, ()), first)
+            )
+        }
+
+    def monthly_series(self, start: date, end: date, department_id: Optional[str] = None) -> List[Dict[str, object]]:
+        """Month-end headcount with the month's joiners and leavers, for every
+        month from `start`'s through `end`'s"""
+        series: List[Dict[str, object]] = []
+        year, month = start.year, start.month
+        previous = date(year, month, 1).toordinal() - 1
+        while (year, month) <= (end.year, end.month):
+            month_end = _month_end(year, month).toordinal()
+            series.append({
+                'month': f"{year:04d}-{month:02d}",
+                'headcount': self._count(department_id, month_end),
+                'joined': self._between(self.starts, department_id, previous, month_end),
+                'left': self._between(self.ends, department_id, previous, month_end)
+            })
+            previous = month_end
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return series
@@ -0,0 +1,329 @@
+"""
+AQLHR Durable Job Queue
+=======================
+
+A small SQLite-backed job queue with an asyncio worker pool. Jobs survive
+restarts, are retried with exponential backoff, and move to a dead-letter
+state once they run out of attempts.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    DEAD = "dead"
+
+
+class RetryJob(Exception):
+    """Raised by a handler to retry a job, optionally with a narrowed payload"""
+
+    def __init__(self, message: str, payload: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.payload = payload
+
+
+@dataclass
+class Job:
+    """A queued unit of work"""
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: float
+    last_error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'payload': self.payload,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': datetime.fromtimestamp(self.run_at).isoformat(),
+            'last_error': self.last_error,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'updated_at': datetime.fromtimestamp(self.updated_at).isoformat()
+        }
+
+
+class JobQueue:
+    """Durable FIFO job queue stored in SQLite (WAL mode).
+
+    Claiming runs inside BEGIN IMMEDIATE, so several processes can share one
+    queue file. A claimed job holds a lease; if its worker dies the lease
+    expires and the job becomes claimable again.
+    """
+
+    COLUMNS = (
+        'id', 'kind', 'payload', 'status', 'attempts', 'max_attempts',
+        'run_at', 'last_error', 'created_at', 'updated_at'
+    )
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 5,
+        base_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        lease_seconds: float = 120.0
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.lock = threading.RLock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " run_at REAL NOT NULL,"
+            " locked_until REAL,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_run_at ON jobs (status, run_at)")
+
+    def _row_to_job(self, row: tuple) -> Job:
+        values = dict(zip(self.COLUMNS, row))
+        values['payload'] = json.loads(values['payload'])
+        return Job(**values)
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Add one job and return its id"""
+        return self.enqueue_many(kind, [payload])[0]
+
+    def enqueue_many(self, kind: str, payloads: List[Dict[str, Any]]) -> List[str]:
+        """Add many jobs in a single transaction"""
+        now = time.time()
+        rows = [
+            (str(uuid.uuid4()), kind, json.dumps(payload), JobStatus.PENDING,
+             self.max_attempts, now, now, now)
+            for payload in payloads
+        ]
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "INSERT INTO jobs (id, kind, payload, status, max_attempts, run_at, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return [row[0] for row in rows]
+
+    def claim(self, limit: int = 1) -> List[Job]:
+        """Lease up to `limit` due jobs (including ones whose lease expired)"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Two index-friendly queries rather than one OR that forces a scan
+                rows = self.conn.execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM jobs"
+                    " WHERE status = ? AND locked_until <= ? LIMIT ?",
+                    (JobStatus.RUNNING, now, limit)
+                ).fetchall()
+                if len(rows) < limit:
+                    rows += self.conn.execute(
+                        f"SELECT {', '.join(self.COLUMNS)} FROM jobs"
+                        " WHERE status = ? AND run_at <= ? ORDER BY run_at LIMIT ?",
+                        (JobStatus.PENDING, now, limit - len(rows))
+                    ).fetchall()
+                jobs = [self._row_to_job(row) for row in rows]
+                self.conn.executemany(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_until = ?, updated_at = ?"
+                    " WHERE id = ?",
+                    [(JobStatus.RUNNING, now + self.lease_seconds, now, job.id) for job in jobs]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        for job in jobs:
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+        return jobs
+
+    def complete(self, job_id: str) -> None:
+        """Mark a job as done"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, locked_until = NULL, last_error = NULL, updated_at = ? WHERE id = ?",
+                (JobStatus.COMPLETED, time.time(), job_id)
+            )
+
+    def fail(self, job: Job, error: str, payload: Optional[Dict[str, Any]] = None) -> JobStatus:
+        """Schedule a retry with backoff, or dead-letter the job; returns the new status"""
+        now = time.time()
+        if job.attempts >= job.max_attempts:
+            status, run_at = JobStatus.DEAD, now
+        else:
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (job.attempts - 1))
+            status, run_at = JobStatus.PENDING, now + backoff * random.uniform(0.8, 1.2)
+
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, locked_until = NULL, last_error = ?,"
+                " payload = ?, updated_at = ? WHERE id = ?",
+                (status, run_at, error, json.dumps(payload if payload is not None else job.payload), now, job.id)
+            )
+        return status
+
+    def retry(self, job_id: str) -> bool:
+        """Give a dead-lettered job a fresh set of attempts"""
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, run_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JobStatus.PENDING, now, now, job_id, JobStatus.DEAD)
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id"""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Job]:
+        """Most recently updated jobs, optionally filtered by status"""
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM jobs"
+        params: tuple = ()
+        if status:
+            sql += " WHERE status = ?"
+            params = (status,)
+        sql += " ORDER BY updated_at DESC LIMIT ?"
+        with self.lock:
+            rows = self.conn.execute(sql, params + (limit,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counts per status plus the age of the oldest due job"""
+        now = time.time()
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest = self.conn.execute(
+                "SELECT MIN(run_at) FROM jobs WHERE status = ? AND run_at <= ?", (JobStatus.PENDING, now)
+            ).fetchone()[0]
+        return {
+            'by_status': {status.value: counts.get(status.value, 0) for status in JobStatus},
+            'oldest_due_seconds': round(now - oldest, 2) if oldest else 0
+        }
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class WorkerPool:
+    """Async workers that drain a JobQueue at a bounded rate"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]],
+        workers: int = 4,
+        poll_interval: float = 0.5,
+        rate_limit: float = 0.0
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.rate_limit = rate_limit
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self._rate_lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def start(self) -> None:
+        """Spawn the worker coroutines"""
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"Started {self.workers} job workers")
+
+    async def stop(self) -> None:
+        """Stop claiming new jobs and wait for running ones to finish"""
+        self._stopping.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Stopped job workers")
+
+    async def _throttle(self) -> None:
+        """Space job starts so the pool never exceeds rate_limit jobs/second"""
+        if self.rate_limit <= 0:
+            return
+        async with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + 1 / self.rate_limit
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _worker(self, number: int) -> None:
+        while not self._stopping.is_set():
+            # SQLite calls run in a thread so they never block the event loop
+            jobs = await asyncio.to_thread(self.queue.claim, 1)
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job = jobs[0]
+            await self._throttle()
+            await self.run_job(job)
+
+    async def run_job(self, job: Job) -> None:
+        """Run one claimed job and record its outcome"""
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            await asyncio.to_thread(self.queue.fail, job, f"No handler for job kind: {job.kind}")
+            return
+        try:
+            await handler(job.payload)
+        except RetryJob as e:
+            status = await asyncio.to_thread(self.queue.fail, job, str(e), e.payload)
+            logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {e} -> {status.value}")
+        except Exception as e:
+            status = await asyncio.to_thread(self.queue.fail, job, str(e))
+            logger.error(f"Job {job.id} ({job.kind}) attempt {job.attempts} errored: {e} -> {status.value}")
+        else:
+            await asyncio.to_thread(self.queue.complete, job.id)
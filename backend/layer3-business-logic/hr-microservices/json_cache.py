@@ -0,0 +1,87 @@
+"""
+AQLHR Serialized Response Cache
+===============================
+
+JSON bytes for individual records, cached by record key and version. List
+and detail responses are assembled from these bytes instead of running
+FastAPI's response_model validation and jsonable_encoder on every request;
+a record is re-serialized (by pydantic-core) only after it changes.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+import logging
+
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class SerializedCache:
+    """LRU of key -> (version, JSON bytes).
+
+    An entry is served only while the record's version matches, so records
+    that bump a version on every change never need explicit invalidation;
+    versionless records (version None) must be invalidated by the caller.
+    """
+
+    def __init__(self, model: Any, capacity: int = 100_000):
+        self.capacity = capacity
+        self.serialize: Callable[[Any], bytes] = TypeAdapter(model).dump_json
+        self.entries: "OrderedDict[Hashable, Tuple[Any, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _cached(self, key: Hashable, version: Any) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def get(self, key: Hashable, record: Any, version: Any = None) -> bytes:
+        """JSON bytes of `record`, serializing it unless cached at `version`"""
+        data = self._cached(key, version)
+        if data is None:
+            data = self._store(key, record, version)
+        return data
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any], version: Any = None) -> bytes:
+        """Like get, but the record is only fetched (`load()`) on a miss"""
+        data = self._cached(key, version)
+        if data is None:
+            data = self._store(key, load(), version)
+        return data
+
+    def _store(self, key: Hashable, record: Any, version: Any) -> bytes:
+        data = self.serialize(record)
+        self.entries[key] = (version, data)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return data
+
+    def json_array(self, items: Iterable[Tuple[Hashable, Any, Any]]) -> bytes:
+        """A JSON array of (key, record, version) items' cached bytes"""
+        return b"[" + b",".join(self.get(key, record, version) for key, record, version in items) + b"]"
+
+    def invalidate(self, key: Hashable) -> None:
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None
+        }
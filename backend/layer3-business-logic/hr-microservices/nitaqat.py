@@ -0,0 +1,369 @@
+"""
+AQLHR Nitaqat Engine
+====================
+
+Saudization rates and Nitaqat bands per establishment and department, read
+from a running (department, Saudi, contract type) headcount array, plus batch
+what-if scenarios -- hires, terminations and contract conversions -- that are
+evaluated for thousands of scenarios at once with NumPy.
+"""
+
+from enum import Enum
+from typing import Any, Dict, List, Sequence, Tuple
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (band, minimum Saudization %) from the highest band down
+DEFAULT_BANDS: Tuple[Tuple[str, float], ...] = (
+    ('platinum', 40.0),
+    ('green', 25.0),
+    ('yellow', 10.0),
+    ('red', 0.0)
+)
+
+
+def parse_bands(spec: str) -> Tuple[Tuple[str, float], ...]:
+    """Parse "platinum:40,green:25,..." into (band, threshold) pairs, highest first"""
+    bands = []
+    for item in spec.split(','):
+        name, _, threshold = item.partition(':')
+        bands.append((name.strip(), float(threshold)))
+    return tuple(sorted(bands, key=lambda band: -band[1]))
+
+
+class ScenarioAction(str, Enum):
+    HIRE = "hire"
+    TERMINATE = "terminate"
+    CONVERT = "convert"
+
+
+class ScenarioError(ValueError):
+    """Raised when a scenario action names an unknown contract type or is incomplete"""
+
+
+class SaudizationEngine:
+    """Running headcounts shaped (department, is_saudi, contract type).
+
+    Contract types carry a weight in the Saudization rate (e.g. 0 for
+    interns); departments roll up into establishments, unmapped departments
+    belong to `default_establishment`.
+    """
+
+    def __init__(
+        self,
+        contract_weights: Dict[str, float],
+        bands: Sequence[Tuple[str, float]] = DEFAULT_BANDS,
+        default_establishment: str = "default"
+    ):
+        self.contracts = {contract: code for code, contract in enumerate(contract_weights)}
+        self.weights = np.array(list(contract_weights.values()), dtype=np.float64)
+        # Ascending thresholds for searchsorted
+        self.band_names = [name for name, _ in sorted(bands, key=lambda band: band[1])]
+        self.thresholds = np.array(sorted(threshold for _, threshold in bands), dtype=np.float64)
+        self.default_establishment = default_establishment
+        self.establishment_map: Dict[str, str] = {}
+        self.clear()
+
+    def clear(self) -> None:
+        self.departments: Dict[str, int] = {}
+        self.department_ids: List[str] = []
+        self.establishments: Dict[str, int] = {}
+        self.establishment_ids: List[str] = []
+        self.counts = np.zeros((16, 2, len(self.contracts)), dtype=np.int64)
+        self.department_establishment = np.zeros(16, dtype=np.int64)
+
+    def load_file(self, path: str) -> None:
+        """Load a {department_id: establishment_id} JSON mapping"""
+        with open(path, encoding='utf-8') as f:
+            self.set_establishments(json.load(f))
+        logger.info(f"Loaded {len(self.establishment_map)} department establishments from {path}")
+
+    def set_establishments(self, mapping: Dict[str, str]) -> None:
+        self.establishment_map = dict(mapping)
+        for department_id, code in self.departments.items():
+            self.department_establishment[code] = self._establishment(department_id)
+
+    def headcounts(self) -> Dict[str, Any]:
+        """The running headcounts, independent of bands and establishments"""
+        return {
+            'contracts': list(self.contracts),
+            'department_ids': list(self.department_ids),
+            'counts': self.counts[:len(self.department_ids)].copy()
+        }
+
+    def load_headcounts(self, state: Dict[str, Any]) -> None:
+        """Replace the headcounts with headcounts() output, keeping the
+        current bands and establishment mapping"""
+        if state['contracts'] != list(self.contracts):
+            raise ValueError(f"Headcounts are for contract types {state['contracts']}, not {list(self.contracts)}")
+        self.clear()
+        for department_id in state['department_ids']:
+            self._department(department_id)
+        self.counts[:len(self.department_ids)] = state['counts']
+
+    def _establishment(self, department_id: str) -> int:
+        establishment_id = self.establishment_map.get(department_id, self.default_establishment)
+        code = self.establishments.get(establishment_id)
+        if code is None:
+            code = self.establishments[establishment_id] = len(self.establishment_ids)
+            self.establishment_ids.append(establishment_id)
+        return code
+
+    def _department(self, department_id: str) -> int:
+        code = self.departments.get(department_id)
+        if code is None:
+            code = self.departments[department_id] = len(self.department_ids)
+            self.department_ids.append(department_id)
+            if code == len(self.counts):
+                self.counts = np.concatenate((self.counts, np.zeros_like(self.counts)))
+                self.department_establishment = np.concatenate(
+                    (self.department_establishment, np.zeros_like(self.department_establishment))
+                )
+            self.department_establishment[code] = self._establishment(department_id)
+        return code
+
+    def _contract(self, contract_type: Any) -> int:
+        code = self.contracts.get(getattr(contract_type, 'value', contract_type))
+        if code is None:
+            raise ScenarioError(f"Unknown contract type: {contract_type}")
+        return code
+
+    def apply(self, department_id: str, is_saudi: bool, contract_type: Any, delta: int) -> None:
+        """Add (delta=1) or remove (delta=-1) one counted employee"""
+        if delta:
+            # Resolve the department first: registering it may grow self.counts
+            department = self._department(department_id)
+            self.counts[department, int(is_saudi), self._contract(contract_type)] += delta
+
+    def _rates(self, saudi: np.ndarray, total: np.ndarray) -> np.ndarray:
+        """Saudization % of weighted headcounts; 0 where nobody is counted"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, saudi / total * 100, 0.0)
+
+    def _bands(self, rates: np.ndarray) -> np.ndarray:
+        """Band index (into self.band_names) of each rate"""
+        return np.maximum(np.searchsorted(self.thresholds, rates, side='right') - 1, 0)
+
+    def _saudis_needed(self, saudi: np.ndarray, total: np.ndarray, bands: np.ndarray) -> np.ndarray:
+        """Fully weighted Saudi hires needed to reach the next band; 0 at the top band.
+
+        (saudi + x) / (total + x) >= p  <=>  x >= (p * total - saudi) / (1 - p)
+        """
+        top = len(self.thresholds) - 1
+        target = self.thresholds[np.minimum(bands + 1, top)] / 100
+        with np.errstate(invalid='ignore', divide='ignore'):
+            needed = np.ceil(np.round((target * total - saudi) / (1 - target), 9))
+        needed = np.where(bands >= top, 0, np.where(target >= 1, np.nan, np.maximum(needed, 0)))
+        return needed
+
+    def _describe(self, key: str, ids: Sequence[str], heads: np.ndarray, saudi_heads: np.ndarray,
+                  saudi: np.ndarray, total: np.ndarray) -> List[Dict[str, Any]]:
+        rates = self._rates(saudi, total)
+        bands = self._bands(rates)
+        needed = self._saudis_needed(saudi, total, bands)
+        return [
+            {
+                key: ids[i],
+                'headcount': int(heads[i]),
+                'saudi_headcount': int(saudi_heads[i]),
+                'weighted_headcount': round(float(total[i]), 2),
+                'weighted_saudi': round(float(saudi[i]), 2),
+                'saudization_rate': round(float(rates[i]), 2),
+                'band': self.band_names[bands[i]],
+                'saudis_needed_for_next_band': None if np.isnan(needed[i]) else int(needed[i])
+            }
+            for i in np.flatnonzero(heads)
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Current rate and band of every establishment and department"""
+        n = len(self.department_ids)
+        counts = self.counts[:n]
+        weighted = counts * self.weights
+        heads = counts.sum(axis=(1, 2))
+        saudi_heads = counts[:, 1].sum(axis=1)
+        saudi = weighted[:, 1].sum(axis=1)
+        total = weighted.sum(axis=(1, 2))
+
+        establishments = self.department_establishment[:n]
+        n_establishments = len(self.establishment_ids)
+
+        def roll_up(values: np.ndarray) -> np.ndarray:
+            return np.bincount(establishments, weights=values, minlength=n_establishments)
+
+        return {
+            'bands': {name: float(threshold) for name, threshold in zip(self.band_names, self.thresholds)},
+            'establishments': self._describe(
+                'establishment_id', self.establishment_ids,
+                roll_up(heads), roll_up(saudi_heads), roll_up(saudi), roll_up(total)
+            ),
+            'departments': self._describe('department_id', self.department_ids, heads, saudi_heads, saudi, total)
+        }
+
+    def evaluate(self, scenarios: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Evaluate what-if scenarios against the current headcounts.
+
+        Each scenario is a list of actions with `action` (ScenarioAction),
+        `department_id`, `is_saudi`, `contract_type`, `to_contract_type`
+        (conversions only) and `count`. All scenarios are evaluated together:
+        actions are flattened into (scenario, cell) deltas, netted with one
+        np.unique and rolled up per establishment with bincount. A scenario
+        that removes more employees than a cell holds is reported infeasible
+        without figures; otherwise only the establishments and departments it
+        touches are returned for it.
+        """
+        n_scenarios = len(scenarios)
+        n_departments = len(self.department_ids)
+        n_contracts = len(self.contracts)
+
+        # Departments only named in scenarios get temporary codes past the live ones
+        extra: Dict[str, int] = {}
+        rows: List[Tuple[int, int, int, int, int]] = []
+        for scenario, actions in enumerate(scenarios):
+            for action in actions:
+                department = self.departments.get(action.department_id)
+                if department is None:
+                    department = extra.setdefault(action.department_id, n_departments + len(extra))
+                saudi = int(action.is_saudi)
+                contract = self._contract(action.contract_type)
+                if action.action == ScenarioAction.HIRE:
+                    rows.append((scenario, department, saudi, contract, action.count))
+                elif action.action == ScenarioAction.TERMINATE:
+                    rows.append((scenario, department, saudi, contract, -action.count))
+                else:
+                    if action.to_contract_type is None:
+                        raise ScenarioError("A conversion needs to_contract_type")
+                    rows.append((scenario, department, saudi, contract, -action.count))
+                    rows.append((scenario, department, saudi, self._contract(action.to_contract_type), action.count))
+
+        department_ids = self.department_ids + list(extra)
+        n_all = len(department_ids)
+        base = np.concatenate((self.counts[:n_departments], np.zeros((len(extra), 2, n_contracts), dtype=np.int64)))
+        establishment_ids = list(self.establishment_ids)
+        establishment_codes = dict(self.establishments)
+        extra_establishments = []
+        for department_id in extra:
+            establishment_id = self.establishment_map.get(department_id, self.default_establishment)
+            if establishment_id not in establishment_codes:
+                establishment_codes[establishment_id] = len(establishment_ids)
+                establishment_ids.append(establishment_id)
+            extra_establishments.append(establishment_codes[establishment_id])
+        establishment_of = np.concatenate((
+            self.department_establishment[:n_departments],
+            np.array(extra_establishments, dtype=np.int64)
+        ))
+        n_establishments = len(establishment_ids)
+
+        results = [
+            {'scenario': scenario, 'feasible': True, 'establishments': [], 'departments': []}
+            for scenario in range(n_scenarios)
+        ]
+        if not rows:
+            return results
+
+        table = np.array(rows, dtype=np.int64)
+        cells_per_scenario = n_all * 2 * n_contracts
+        cell = (table[:, 1] * 2 + table[:, 2]) * n_contracts + table[:, 3]
+        keys, inverse = np.unique(table[:, 0] * cells_per_scenario + cell, return_inverse=True)
+        net = np.bincount(inverse, weights=table[:, 4]).astype(np.int64)
+        scenario_of = keys // cells_per_scenario
+        cell = keys % cells_per_scenario
+        department_of = cell // (2 * n_contracts)
+        saudi_of = (cell // n_contracts) % 2
+        contract_of = cell % n_contracts
+
+        # Removing more employees than a cell holds
+        for scenario in np.unique(scenario_of[base.reshape(-1)[cell] + net < 0]).tolist():
+            results[scenario]['feasible'] = False
+
+        heads = net
+        weighted = net * self.weights[contract_of]
+        saudi_heads = heads * saudi_of
+        saudi = weighted * saudi_of
+
+        # Per touched (scenario, department): base figures plus netted deltas
+        base_weighted = base * self.weights
+        base_heads = base.sum(axis=(1, 2))
+        base_saudi_heads = base[:, 1].sum(axis=1)
+        base_saudi = base_weighted[:, 1].sum(axis=1)
+        base_total = base_weighted.sum(axis=(1, 2))
+
+        pairs, pair_inverse = np.unique(scenario_of * n_all + department_of, return_inverse=True)
+        pair_scenario = pairs // n_all
+        pair_department = pairs % n_all
+
+        def per_pair(values: np.ndarray) -> np.ndarray:
+            return np.bincount(pair_inverse, weights=values, minlength=len(pairs))
+
+        department_figures = self._scenario_figures(
+            base_heads[pair_department] + per_pair(heads),
+            base_saudi_heads[pair_department] + per_pair(saudi_heads),
+            base_saudi[pair_department] + per_pair(saudi),
+            base_total[pair_department] + per_pair(weighted),
+            base_saudi[pair_department],
+            base_total[pair_department]
+        )
+        for scenario, department, figures in zip(pair_scenario.tolist(), pair_department.tolist(), department_figures):
+            if results[scenario]['feasible']:
+                results[scenario]['departments'].append({'department_id': department_ids[department], **figures})
+
+        # Per touched (scenario, establishment)
+        establishment_base = [
+            np.bincount(establishment_of, weights=values, minlength=n_establishments)
+            for values in (base_heads, base_saudi_heads, base_saudi, base_total)
+        ]
+        pair_establishment = establishment_of[pair_department]
+        groups, group_inverse = np.unique(pair_scenario * n_establishments + pair_establishment, return_inverse=True)
+        group_scenario = groups // n_establishments
+        group_establishment = groups % n_establishments
+
+        def per_group(values: np.ndarray) -> np.ndarray:
+            return np.bincount(group_inverse, weights=per_pair(values), minlength=len(groups))
+
+        establishment_figures = self._scenario_figures(
+            establishment_base[0][group_establishment] + per_group(heads),
+            establishment_base[1][group_establishment] + per_group(saudi_heads),
+            establishment_base[2][group_establishment] + per_group(saudi),
+            establishment_base[3][group_establishment] + per_group(weighted),
+            establishment_base[2][group_establishment],
+            establishment_base[3][group_establishment]
+        )
+        for scenario, establishment, figures in zip(
+            group_scenario.tolist(), group_establishment.tolist(), establishment_figures
+        ):
+            if results[scenario]['feasible']:
+                results[scenario]['establishments'].append({'establishment_id': establishment_ids[establishment], **figures})
+        return results
+
+    def _scenario_figures(self, heads, saudi_heads, saudi, total, base_saudi, base_total) -> List[Dict[str, Any]]:
+        """After/before figures per row, computed column-wise"""
+        rates = self._rates(saudi, total)
+        bands = self._bands(rates)
+        needed = self._saudis_needed(saudi, total, bands)
+        base_rates = self._rates(base_saudi, base_total)
+        names = self.band_names
+        columns = zip(
+            heads.astype(np.int64).tolist(),
+            saudi_heads.astype(np.int64).tolist(),
+            np.round(rates, 2).tolist(),
+            np.round(rates - base_rates, 2).tolist(),
+            bands.tolist(),
+            self._bands(base_rates).tolist(),
+            np.where(np.isnan(needed), -1, needed).astype(np.int64).tolist()
+        )
+        return [
+            {
+                'headcount': head,
+                'saudi_headcount': saudi_head,
+                'saudization_rate': rate,
+                'rate_change': change,
+                'band': names[band],
+                'previous_band': names[previous],
+                'saudis_needed_for_next_band': None if need < 0 else need
+            }
+            for head, saudi_head, rate, change, band, previous, need in columns
+        ]
@@ -0,0 +1,190 @@
+"""
+AQLHR Onboarding Templates and Task Queues
+==========================================
+
+Onboarding checklists per department / contract type, precompiled once,
+and an index of open onboarding tasks keyed by assignee with a due-date
+heap so per-assignee queues and overdue lists never scan every employee.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import bisect
+import heapq
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Statuses that take a task out of the assignee queues
+CLOSED_TASK_STATUSES = ('COMPLETED', 'CANCELLED')
+
+
+class OnboardingTemplateRegistry:
+    """Onboarding checklists resolved by (department_id, contract_type).
+
+    Resolution prefers the most specific template: department and contract
+    type, then department only, then contract type only, then the default.
+    Each template is compiled to tuples with precomputed timedeltas when it
+    is registered, so instantiating tasks for a hire is just date arithmetic.
+    """
+
+    def __init__(self, default_tasks: List[Dict[str, Any]]):
+        self.templates: Dict[Tuple[Optional[str], Optional[str]], Tuple[tuple, ...]] = {}
+        self.register(default_tasks)
+
+    @staticmethod
+    def _compile(tasks: List[Dict[str, Any]]) -> Tuple[tuple, ...]:
+        return tuple(
+            (
+                task['task_name'],
+                task['task_description'],
+                task['assigned_to'],
+                timedelta(days=task['days_to_complete'])
+            )
+            for task in tasks
+        )
+
+    def register(
+        self,
+        tasks: List[Dict[str, Any]],
+        department_id: Optional[str] = None,
+        contract_type: Optional[str] = None
+    ) -> None:
+        """Register (or replace) the checklist for a department / contract type"""
+        self.templates[(department_id, contract_type)] = self._compile(tasks)
+
+    def load_file(self, path: str) -> None:
+        """Register templates from a JSON file: {"templates": [{department_id, contract_type, tasks}]}"""
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        for template in config.get('templates', []):
+            self.register(
+                template['tasks'],
+                template.get('department_id'),
+                template.get('contract_type')
+            )
+        logger.info(f"Loaded {len(config.get('templates', []))} onboarding templates from {path}")
+
+    def resolve(self, department_id: Optional[str], contract_type: Optional[str]) -> Tuple[tuple, ...]:
+        """Compiled checklist for a hire"""
+        for key in (
+            (department_id, contract_type),
+            (department_id, None),
+            (None, contract_type),
+            (None, None)
+        ):
+            template = self.templates.get(key)
+            if template is not None:
+                return template
+        return ()
+
+
+class OnboardingTaskIndex:
+    """Open onboarding tasks grouped by assignee, each group a due-date heap.
+
+    Closing a task only drops it from `tasks`; its heap entry is skipped
+    lazily and the heap is compacted once stale entries dominate. Open task
+    counts per assignee and due date back the overdue summary, which then
+    costs one step per distinct due date rather than per task.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, Any] = {}
+        self.heaps: Dict[str, List[Tuple[date, str]]] = {}
+        self.open_counts: Dict[str, int] = {}
+        # assignee -> due date -> open tasks, plus those dates in order
+        self.due_counts: Dict[str, Dict[date, int]] = {}
+        self.due_dates: Dict[str, List[date]] = {}
+
+    def clear(self) -> None:
+        self.tasks.clear()
+        self.heaps.clear()
+        self.open_counts.clear()
+        self.due_counts.clear()
+        self.due_dates.clear()
+
+    def add(self, task: Any) -> None:
+        """Track a task if it is still open"""
+        if task.status in CLOSED_TASK_STATUSES or task.id in self.tasks:
+            return
+        self.tasks[task.id] = task
+        heapq.heappush(self.heaps.setdefault(task.assigned_to, []), (task.due_date, task.id))
+        self.open_counts[task.assigned_to] = self.open_counts.get(task.assigned_to, 0) + 1
+        counts = self.due_counts.setdefault(task.assigned_to, {})
+        if task.due_date not in counts:
+            counts[task.due_date] = 0
+            bisect.insort(self.due_dates.setdefault(task.assigned_to, []), task.due_date)
+        counts[task.due_date] += 1
+
+    def close(self, task_id: str) -> None:
+        """Remove a task from the open queues"""
+        task = self.tasks.pop(task_id, None)
+        if task is None:
+            return
+        assigned_to = task.assigned_to
+        self.open_counts[assigned_to] -= 1
+        counts = self.due_counts[assigned_to]
+        counts[task.due_date] -= 1
+        if not counts[task.due_date]:
+            del counts[task.due_date]
+            dates = self.due_dates[assigned_to]
+            del dates[bisect.bisect_left(dates, task.due_date)]
+
+        heap = self.heaps[assigned_to]
+        if len(heap) > 64 and len(heap) > 2 * self.open_counts[assigned_to]:
+            heap[:] = [entry for entry in heap if entry[1] in self.tasks]
+            heapq.heapify(heap)
+
+    def _iter_due(self, assigned_to: str) -> Iterator[Any]:
+        """Open tasks for an assignee in due-date order.
+
+        Walks the heap array best-first with a small frontier heap, so the
+        first k tasks cost O(k log k) without popping or copying the heap.
+        """
+        heap = self.heaps.get(assigned_to)
+        if not heap:
+            return
+        frontier = [(heap[0], 0)]
+        while frontier:
+            (due_date, task_id), position = heapq.heappop(frontier)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+            task = self.tasks.get(task_id)
+            if task is not None:
+                yield task
+
+    def queue(self, assigned_to: str, limit: int = 100) -> List[Any]:
+        """The next `limit` open tasks for an assignee, earliest due first"""
+        tasks = []
+        for task in self._iter_due(assigned_to):
+            if len(tasks) >= limit:
+                break
+            tasks.append(task)
+        return tasks
+
+    def overdue(self, assigned_to: str, as_of: date, limit: int = 100) -> List[Any]:
+        """Open tasks for an assignee due before `as_of`, earliest first"""
+        tasks = []
+        for task in self._iter_due(assigned_to):
+            if task.due_date >= as_of or len(tasks) >= limit:
+                break
+            tasks.append(task)
+        return tasks
+
+    def overdue_summary(self, as_of: date) -> Dict[str, Dict[str, Any]]:
+        """Per assignee: open task count, overdue count and oldest due date"""
+        summary = {}
+        for assigned_to, open_tasks in self.open_counts.items():
+            if not open_tasks:
+                continue
+            dates = self.due_dates[assigned_to]
+            counts = self.due_counts[assigned_to]
+            overdue_dates = dates[:bisect.bisect_left(dates, as_of)]
+            summary[assigned_to] = {
+                'open_tasks': open_tasks,
+                'overdue_tasks': sum(counts[due_date] for due_date in overdue_dates),
+                'oldest_due_date': overdue_dates[0].isoformat() if overdue_dates else None
+            }
+        return summary
@@ -0,0 +1,174 @@
+"""
+AQLHR Reporting-Line Hierarchy
+==============================
+
+Manager -> direct reports adjacency with subtree headcounts maintained along
+the ancestor path, so headcount under any manager is O(1), moves cost
+O(depth), and subtree walks touch only the nodes they return. Direct
+reports are kept sorted by id, so walks visit the tree in the same order
+in every process.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ReportingLineError(ValueError):
+    """Raised when a manager change would make an employee report to themselves"""
+
+
+class ReportingHierarchy:
+    """Reporting lines keyed by employee id.
+
+    Each node carries a weight (1 for employees counted in headcount, 0 for
+    terminated employees or managers not yet loaded) and the total weight of
+    its subtree including itself.
+    """
+
+    def __init__(self):
+        self.parent: Dict[str, Optional[str]] = {}
+        # Direct reports of each node, sorted by id
+        self.children: Dict[str, List[str]] = {}
+        self.weight: Dict[str, int] = {}
+        self.subtree_weight: Dict[str, int] = {}
+        # Total weight of each node's direct reports
+        self.direct_weight: Dict[str, int] = {}
+
+    def clear(self) -> None:
+        self.parent.clear()
+        self.children.clear()
+        self.weight.clear()
+        self.subtree_weight.clear()
+        self.direct_weight.clear()
+
+    def __contains__(self, employee_id: object) -> bool:
+        return employee_id in self.parent
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Snapshots taken before children were sorted lists hold sets
+        state['children'] = {node: sorted(children) for node, children in state['children'].items()}
+        self.__dict__.update(state)
+
+    def _ensure(self, employee_id: str) -> None:
+        if employee_id not in self.parent:
+            self.parent[employee_id] = None
+            self.children[employee_id] = []
+            self.weight[employee_id] = 0
+            self.subtree_weight[employee_id] = 0
+            self.direct_weight[employee_id] = 0
+
+    def ancestors(self, employee_id: str) -> Iterator[str]:
+        """Managers above an employee, nearest first"""
+        seen = set()
+        manager_id = self.parent.get(employee_id)
+        while manager_id is not None and manager_id not in seen:
+            seen.add(manager_id)
+            yield manager_id
+            manager_id = self.parent.get(manager_id)
+
+    def _add_to_path(self, employee_id: Optional[str], delta: int) -> None:
+        """Add `delta` to the subtree weight of a node and all its ancestors"""
+        if employee_id is None or not delta:
+            return
+        self.subtree_weight[employee_id] += delta
+        for manager_id in self.ancestors(employee_id):
+            self.subtree_weight[manager_id] += delta
+
+    def check(self, employee_id: str, manager_id: Optional[str]) -> None:
+        """Raise ReportingLineError if `employee_id` may not report to `manager_id`"""
+        if manager_id is not None and (
+            manager_id == employee_id or employee_id in self.ancestors(manager_id)
+        ):
+            raise ReportingLineError(f"Employee {employee_id} cannot report to {manager_id}")
+
+    def set(self, employee_id: str, manager_id: Optional[str], weight: int = 1) -> None:
+        """Insert an employee, or move it / change its weight. O(depth)."""
+        self.check(employee_id, manager_id)
+        self._ensure(employee_id)
+        if manager_id is not None:
+            self._ensure(manager_id)
+
+        old_manager_id = self.parent[employee_id]
+        old_weight = self.weight[employee_id]
+        old_subtree = self.subtree_weight[employee_id]
+        new_subtree = old_subtree - old_weight + weight
+
+        if old_manager_id != manager_id:
+            self._add_to_path(old_manager_id, -old_subtree)
+            if old_manager_id is not None:
+                siblings = self.children[old_manager_id]
+                del siblings[bisect.bisect_left(siblings, employee_id)]
+                self.direct_weight[old_manager_id] -= old_weight
+            self.parent[employee_id] = manager_id
+            if manager_id is not None:
+                bisect.insort(self.children[manager_id], employee_id)
+                self.direct_weight[manager_id] += weight
+            self._add_to_path(manager_id, new_subtree)
+        else:
+            if manager_id is not None:
+                self.direct_weight[manager_id] += weight - old_weight
+            self._add_to_path(manager_id, new_subtree - old_subtree)
+
+        self.weight[employee_id] = weight
+        self.subtree_weight[employee_id] = new_subtree
+
+    def headcount(self, employee_id: str) -> int:
+        """Counted employees anywhere below `employee_id`"""
+        if employee_id not in self.parent:
+            return 0
+        return self.subtree_weight[employee_id] - self.weight[employee_id]
+
+    def direct_headcount(self, employee_id: str) -> int:
+        """Counted direct reports of `employee_id`"""
+        return self.direct_weight.get(employee_id, 0)
+
+    def iter_subtree(
+        self,
+        employee_id: str,
+        max_depth: Optional[int] = None,
+        counted_only: bool = True
+    ) -> Iterator[Tuple[str, int]]:
+        """(employee_id, depth) for every node below `employee_id`, depth-first
+        with direct reports in id order.
+
+        With counted_only, uncounted nodes are left out and subtrees with no
+        counted employees are skipped entirely; otherwise every node is
+        visited, including those of weight 0.
+        """
+        stack = [(child, 1) for child in reversed(self.children.get(employee_id, ()))]
+        while stack:
+            node, depth = stack.pop()
+            if counted_only and not self.subtree_weight[node]:
+                continue
+            if self.weight[node] or not counted_only:
+                yield node, depth
+            if max_depth is None or depth < max_depth:
+                stack.extend((child, depth + 1) for child in reversed(self.children[node]))
+
+    def span_of_control(self, employee_id: str) -> Dict[str, Any]:
+        """Direct-report distribution and layer sizes across a manager's subtree"""
+        spans: List[int] = []
+        layers: Dict[int, int] = {}
+        root_span = self.direct_headcount(employee_id)
+        if root_span:
+            spans.append(root_span)
+        for node, depth in self.iter_subtree(employee_id):
+            layers[depth] = layers.get(depth, 0) + 1
+            span = self.direct_headcount(node)
+            if span:
+                spans.append(span)
+
+        return {
+            'employee_id': employee_id,
+            'headcount': self.headcount(employee_id),
+            'direct_reports': root_span,
+            'managers': len(spans),
+            'average_span': round(sum(spans) / len(spans), 2) if spans else 0,
+            'max_span': max(spans, default=0),
+            'min_span': min(spans, default=0),
+            'depth': max(layers, default=0),
+            'headcount_by_layer': {str(depth): layers[depth] for depth in sorted(layers)}
+        }
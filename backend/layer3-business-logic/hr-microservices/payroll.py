@@ -0,0 +1,278 @@
+"""
+AQLHR Payroll Runs
+==================
+
+Monthly payroll for the whole workforce in one vectorized pass: gross pay
+(basic salary plus allowances, prorated for joiners and leavers), GOSI
+contributions and net pay are computed as NumPy columns. Runs keep those
+columns, are persisted as .npz files when a directory is configured, and
+payslips are streamed straight from the arrays.
+"""
+
+from calendar import monthrange
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import csv
+import io
+import json
+import logging
+import os
+import uuid
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Same rates and contributory-salary limits as GOSIConnector.calculate_contributions
+# (layer4 gosi_connector.py); keep the two in sync
+GOSI_CONTRIBUTION_RATES = {
+    'employee_rate': 0.10,
+    'employer_rate': 0.12,
+    'unemployment_rate': 0.02,
+    'occupational_hazards_rate': 0.01
+}
+MIN_CONTRIBUTORY_SALARY = 400  # SAR
+MAX_CONTRIBUTORY_SALARY = 45000  # SAR
+
+# Allowances paid as a share of basic salary
+ALLOWANCES = ('housing', 'transport')
+
+# Payslip columns, in export order
+PAYSLIP_FIELDS = (
+    'employee_id', 'employee_number', 'department_id', 'days_paid', 'basic_salary',
+    *(f"{name}_allowance" for name in ALLOWANCES), 'gross_pay', 'contributory_salary',
+    'gosi_employee', 'gosi_employer', 'gosi_unemployment', 'gosi_occupational_hazards',
+    'net_pay', 'employer_cost'
+)
+# Columns summed into run and department totals
+_TOTAL_FIELDS = PAYSLIP_FIELDS[4:]
+
+# End ordinal of an employment interval that has not ended
+OPEN_ENDED = date.max.toordinal() + 1
+
+
+def parse_period(period: str) -> date:
+    """First day of a "YYYY-MM" payroll period; raises ValueError"""
+    try:
+        return datetime.strptime(period, "%Y-%m").date()
+    except ValueError:
+        raise ValueError(f"Invalid payroll period {period!r}; expected YYYY-MM")
+
+
+def period_bounds(period: str) -> Tuple[int, int]:
+    """Ordinals of the first day of a period and of the day after its last"""
+    first = parse_period(period)
+    return first.toordinal(), first.toordinal() + monthrange(first.year, first.month)[1]
+
+
+def gosi_contributions(total_salary: np.ndarray) -> Dict[str, np.ndarray]:
+    """Vectorized GOSIConnector.calculate_contributions: limits, then rates"""
+    contributory = np.clip(total_salary, MIN_CONTRIBUTORY_SALARY, MAX_CONTRIBUTORY_SALARY)
+    return {
+        'contributory_salary': contributory,
+        'gosi_employee': contributory * GOSI_CONTRIBUTION_RATES['employee_rate'],
+        'gosi_employer': contributory * GOSI_CONTRIBUTION_RATES['employer_rate'],
+        'gosi_unemployment': contributory * GOSI_CONTRIBUTION_RATES['unemployment_rate'],
+        'gosi_occupational_hazards': contributory * GOSI_CONTRIBUTION_RATES['occupational_hazards_rate']
+    }
+
+
+class PayrollRun:
+    """One computed payroll: metadata plus a column array per payslip field"""
+
+    def __init__(self, run_id: str, period: str, created_at: datetime, created_by: str,
+                 columns: Optional[Dict[str, np.ndarray]] = None, totals: Optional[Dict[str, Any]] = None):
+        self.id = run_id
+        self.period = period
+        self.created_at = created_at
+        self.created_by = created_by
+        self.columns = columns
+        self.totals = totals if totals is not None else self._totals()
+        self._rows: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.totals['employees']
+
+    def _totals(self) -> Dict[str, Any]:
+        columns = self.columns
+        departments, groups = np.unique(columns['department_id'], return_inverse=True)
+        by_department = {
+            field: np.bincount(groups, weights=columns[field], minlength=len(departments))
+            for field in _TOTAL_FIELDS
+        }
+        counts = np.bincount(groups, minlength=len(departments))
+        return {
+            'employees': int(len(columns['employee_id'])),
+            **{field: round(float(columns[field].sum()), 2) for field in _TOTAL_FIELDS},
+            'departments': {
+                department: {
+                    'employees': int(counts[i]),
+                    **{field: round(float(by_department[field][i]), 2) for field in _TOTAL_FIELDS}
+                }
+                for i, department in enumerate(departments.tolist())
+            }
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'period': self.period,
+            'created_at': self.created_at.isoformat(),
+            'created_by': self.created_by,
+            'totals': self.totals
+        }
+
+    def payslip(self, employee_id: str) -> Optional[Dict[str, Any]]:
+        """One employee's payslip, or None if they were not paid in this run"""
+        if self._rows is None:
+            self._rows = {employee_id: row for row, employee_id in enumerate(self.columns['employee_id'].tolist())}
+        row = self._rows.get(employee_id)
+        if row is None:
+            return None
+        return next(self.iter_payslips(row, row + 1))
+
+    def iter_payslips(self, start: int = 0, stop: Optional[int] = None, chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Payslip dicts for rows [start, stop), converted a chunk of columns at a time"""
+        stop = len(self) if stop is None else stop
+        for chunk in range(start, stop, chunk_size):
+            end = min(chunk + chunk_size, stop)
+            values = [self.columns[field][chunk:end].tolist() for field in PAYSLIP_FIELDS]
+            for row in zip(*values):
+                yield dict(zip(PAYSLIP_FIELDS, row))
+
+    def export(self, export_format: str = "ndjson", chunk_size: int = 1000) -> Iterator[str]:
+        """Stream payslips as NDJSON or CSV text chunks"""
+        buffer = io.StringIO()
+        writer = None
+        if export_format == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(('period',) + PAYSLIP_FIELDS)
+
+        pending = 0
+        for payslip in self.iter_payslips(chunk_size=chunk_size):
+            if writer:
+                writer.writerow([self.period, *payslip.values()])
+            else:
+                buffer.write(json.dumps({'period': self.period, **payslip}))
+                buffer.write("\n")
+            pending += 1
+            if pending >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+
+def compute_run(
+    period: str,
+    employee_ids: Sequence[str],
+    employee_numbers: Sequence[str],
+    department_ids: Sequence[str],
+    basic_salaries: Sequence[float],
+    interval_rows: Sequence[int],
+    interval_starts: Sequence[int],
+    interval_ends: Sequence[int],
+    allowance_rates: Dict[str, float],
+    created_by: str
+) -> PayrollRun:
+    """Compute a payroll run for the given employee columns.
+
+    Employment is given as [start, end) day-ordinal intervals, each naming
+    the employee row it belongs to (OPEN_ENDED when it has not ended).
+    Employees are paid for the days of the period their intervals cover,
+    so joiners are paid from their hire date and leavers up to their last
+    day; employees with no such day are left out. `allowance_rates` gives
+    each of ALLOWANCES as a share of basic salary (e.g. housing 0.25); GOSI
+    applies to basic plus allowances as in the GOSI connector. Every amount
+    is rounded to the halala.
+    """
+    first_ordinal, stop_ordinal = period_bounds(period)
+    days_in_month = stop_ordinal - first_ordinal
+
+    starts = np.maximum(np.asarray(interval_starts, dtype=np.int64), first_ordinal)
+    ends = np.minimum(np.asarray(interval_ends, dtype=np.int64), stop_ordinal)
+    days_paid = np.bincount(
+        np.asarray(interval_rows, dtype=np.int64),
+        weights=np.clip(ends - starts, 0, None),
+        minlength=len(employee_ids)
+    ).astype(np.int64)
+    days_paid = np.minimum(days_paid, days_in_month)
+    paid = np.flatnonzero(days_paid > 0)
+    days_paid = days_paid[paid]
+    share = days_paid / days_in_month
+
+    basic = np.round(np.asarray(basic_salaries, dtype=np.float64)[paid] * share, 2)
+    columns: Dict[str, np.ndarray] = {
+        'employee_id': np.asarray(employee_ids, dtype=object)[paid].astype(str),
+        'employee_number': np.asarray(employee_numbers, dtype=object)[paid].astype(str),
+        'department_id': np.asarray(department_ids, dtype=object)[paid].astype(str),
+        'days_paid': days_paid.astype(np.int64),
+        'basic_salary': basic
+    }
+    for name in ALLOWANCES:
+        columns[f"{name}_allowance"] = np.round(basic * allowance_rates.get(name, 0.0), 2)
+    gross = basic + sum(columns[f"{name}_allowance"] for name in ALLOWANCES)
+    columns['gross_pay'] = np.round(gross, 2)
+
+    for field, values in gosi_contributions(columns['gross_pay']).items():
+        columns[field] = np.round(values, 2)
+    columns['net_pay'] = np.round(columns['gross_pay'] - columns['gosi_employee'], 2)
+    columns['employer_cost'] = np.round(
+        columns['gross_pay'] + columns['gosi_employer']
+        + columns['gosi_unemployment'] + columns['gosi_occupational_hazards'], 2
+    )
+    return PayrollRun(str(uuid.uuid4()), period, datetime.now(), created_by, columns)
+
+
+class PayrollStore:
+    """Payroll runs by id, optionally persisted to `directory`.
+
+    Each run is a small JSON metadata file plus an .npz of its columns; on
+    startup only the metadata is read and columns load on first use.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.runs: Dict[str, PayrollRun] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _path(self, run_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"payroll-{run_id}{suffix}")
+
+    def _load(self) -> None:
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith("payroll-") and name.endswith(".json")):
+                continue
+            with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                meta = json.load(f)
+            self.runs[meta['id']] = PayrollRun(
+                meta['id'], meta['period'], datetime.fromisoformat(meta['created_at']),
+                meta['created_by'], totals=meta['totals']
+            )
+        logger.info(f"Loaded {len(self.runs)} payroll runs from {self.directory}")
+
+    def add(self, run: PayrollRun) -> None:
+        self.runs[run.id] = run
+        if self.directory:
+            # Columns first: a run is only listed once its metadata exists
+            with open(self._path(run.id, ".npz"), 'wb') as f:
+                np.savez(f, **run.columns)
+            with open(self._path(run.id, ".json"), 'w', encoding='utf-8') as f:
+                json.dump(run.summary(), f)
+
+    def get(self, run_id: str) -> Optional[PayrollRun]:
+        run = self.runs.get(run_id)
+        if run is not None and run.columns is None:
+            with np.load(self._path(run_id, ".npz")) as data:
+                run.columns = {field: data[field] for field in data.files}
+        return run
+
+    def list(self, period: Optional[str] = None) -> List[PayrollRun]:
+        """Runs, newest first, optionally for one period"""
+        runs = [run for run in self.runs.values() if period is None or run.period == period]
+        return sorted(runs, key=lambda run: run.created_at, reverse=True)
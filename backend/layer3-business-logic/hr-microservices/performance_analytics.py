@@ -0,0 +1,246 @@
+"""
+AQLHR Performance Review Analytics
+==================================
+
+Column arrays of every performance review, appended as reviews arrive, and
+NumPy group-by summaries over them for calibration sessions. Reviews are
+grouped by the reviewed employee's current department and manager, or by
+review period.
+"""
+
+from enum import Enum
+from typing import Any, Dict, List, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Quantiles reported for every metric, alongside count, mean and std
+SUMMARY_QUANTILES = (('min', 0.0), ('p25', 0.25), ('median', 0.5), ('p75', 0.75), ('max', 1.0))
+
+
+class PerformanceGroupBy(str, Enum):
+    DEPARTMENT = "department"
+    MANAGER = "manager"
+    PERIOD = "period"
+
+
+class _Codes:
+    """Interns labels to dense integer codes"""
+
+    def __init__(self):
+        self.codes: Dict[Any, int] = {}
+        self.labels: List[Any] = []
+
+    def code(self, label: Any) -> int:
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class _GrowableArray:
+    """A NumPy array with amortised O(1) append"""
+
+    def __init__(self, dtype, fill=0):
+        self.dtype = dtype
+        self.fill = fill
+        self.data = np.full(64, fill, dtype=dtype)
+        self.size = 0
+
+    def _reserve(self, size: int) -> None:
+        if size > len(self.data):
+            grown = np.full(max(size, len(self.data) * 2), self.fill, dtype=self.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+
+    def append(self, value) -> None:
+        self._reserve(self.size + 1)
+        self.data[self.size] = value
+        self.size += 1
+
+    def pad_to(self, size: int) -> None:
+        """Extend with fill values until the array holds `size` items"""
+        if size > self.size:
+            self._reserve(size)
+            self.size = size
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+def _grouped_summary(groups: np.ndarray, values: np.ndarray, n_groups: int) -> Dict[str, np.ndarray]:
+    """Count, mean, std and quantiles of `values` per group code, all vectorized.
+
+    Values are sorted by (group, value) once; each group's quantiles are then
+    read off its contiguous slice with linear interpolation.
+    """
+    counts = np.bincount(groups, minlength=n_groups)
+    sums = np.bincount(groups, weights=values, minlength=n_groups)
+    squares = np.bincount(groups, weights=values * values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        stds = np.sqrt(np.maximum(squares / counts - means * means, 0.0))
+
+    summary = {'count': counts, 'mean': means, 'std': stds}
+    ordered = values[np.lexsort((values, groups))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    last = np.maximum(counts - 1, 0)
+    present = counts > 0
+    for name, q in SUMMARY_QUANTILES:
+        position = last * q
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, last)
+        fraction = position - lower
+        result = np.full(n_groups, np.nan)
+        low_values = ordered[(starts + lower)[present]]
+        high_values = ordered[(starts + upper)[present]]
+        result[present] = low_values + (high_values - low_values) * fraction[present]
+        summary[name] = result
+    return summary
+
+
+def _round(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 3)
+
+
+class PerformanceColumns:
+    """Performance reviews as column arrays, built incrementally.
+
+    Each review stores the reviewed employee's code; the employee's current
+    department and manager codes live in per-employee arrays, so a transfer
+    re-attributes past reviews by updating a single slot.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.employees = _Codes()
+        self.departments = _Codes()
+        self.managers = _Codes()
+        self.periods = _Codes()
+        self.employee_department = _GrowableArray(np.int32)
+        self.employee_manager = _GrowableArray(np.int32)
+
+        self.employee = _GrowableArray(np.int32)
+        self.period = _GrowableArray(np.int32)
+        self.overall_rating = _GrowableArray(np.float64)
+        self.goals_achievement = _GrowableArray(np.float64)
+        # Competency name -> scores, NaN where a review did not score it
+        self.competencies: Dict[str, _GrowableArray] = {}
+
+    def __len__(self) -> int:
+        return self.employee.size
+
+    def set_employee(self, employee_id: str, department_id: str, manager_id: Optional[str]) -> None:
+        """Record (or move) an employee's department and manager"""
+        department = self.departments.code(department_id)
+        manager = self.managers.code(manager_id)
+        code = self.employees.code(employee_id)
+        if code == self.employee_department.size:
+            self.employee_department.append(department)
+            self.employee_manager.append(manager)
+        else:
+            self.employee_department.data[code] = department
+            self.employee_manager.data[code] = manager
+
+    def move_employee(self, employee_id: str, department_id: str, manager_id: Optional[str]) -> None:
+        """Re-attribute an employee's reviews; no-op if they have none"""
+        if employee_id in self.employees.codes:
+            self.set_employee(employee_id, department_id, manager_id)
+
+    def add_review(self, employee_id: str, review: Any, department_id: str, manager_id: Optional[str]) -> None:
+        """Append one review's columns"""
+        self.set_employee(employee_id, department_id, manager_id)
+        self.employee.append(self.employees.codes[employee_id])
+        self.period.append(self.periods.code(review.review_period))
+        self.overall_rating.append(review.overall_rating)
+        self.goals_achievement.append(review.goals_achievement)
+
+        row = self.employee.size
+        for name, score in review.competency_scores.items():
+            column = self.competencies.get(name)
+            if column is None:
+                column = self.competencies[name] = _GrowableArray(np.float64, np.nan)
+            column.pad_to(row - 1)
+            column.append(score)
+
+    def summary(
+        self,
+        group_by: PerformanceGroupBy,
+        department_id: Optional[str] = None,
+        manager_id: Optional[str] = None,
+        review_period: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Rating, goal and competency distributions per group"""
+        if not len(self):
+            return {'group_by': group_by.value, 'reviews': 0, 'groups': []}
+
+        employees = self.employee.view()
+        departments = self.employee_department.view()[employees]
+        managers = self.employee_manager.view()[employees]
+        periods = self.period.view()
+
+        mask = np.ones(len(employees), dtype=bool)
+        for codes, column, value in (
+            (self.departments, departments, department_id),
+            (self.managers, managers, manager_id),
+            (self.periods, periods, review_period)
+        ):
+            if value is not None:
+                mask &= column == codes.codes.get(value, -1)
+
+        if group_by == PerformanceGroupBy.DEPARTMENT:
+            groups, labels, key = departments, self.departments.labels, 'department_id'
+        elif group_by == PerformanceGroupBy.MANAGER:
+            groups, labels, key = managers, self.managers.labels, 'manager_id'
+        else:
+            groups, labels, key = periods, self.periods.labels, 'review_period'
+        groups = groups[mask]
+        n_groups = len(labels)
+
+        metrics = {
+            'overall_rating': _grouped_summary(groups, self.overall_rating.view()[mask], n_groups),
+            'goals_achievement': _grouped_summary(groups, self.goals_achievement.view()[mask], n_groups)
+        }
+        competencies = {}
+        for name, column in self.competencies.items():
+            column.pad_to(len(self))
+            scores = column.view()[mask]
+            scored = ~np.isnan(scores)
+            competencies[name] = _grouped_summary(groups[scored], scores[scored], n_groups)
+
+        # Ratings bucketed by whole point: [1, 2), [2, 3), ... [5, 5]
+        buckets = np.clip(np.floor(self.overall_rating.view()[mask]).astype(np.int64), 1, 5) - 1
+        histogram = np.bincount(groups * 5 + buckets, minlength=n_groups * 5).reshape(n_groups, 5)
+
+        def describe(summary: Dict[str, np.ndarray], group: int) -> Dict[str, Any]:
+            return {
+                name: int(values[group]) if name == 'count' else _round(values[group])
+                for name, values in summary.items()
+            }
+
+        results = []
+        for group in np.flatnonzero(metrics['overall_rating']['count']):
+            overall = describe(metrics['overall_rating'], group)
+            overall['histogram'] = {str(point + 1): int(n) for point, n in enumerate(histogram[group])}
+            results.append({
+                key: labels[group],
+                'reviews': overall.pop('count'),
+                'overall_rating': overall,
+                'goals_achievement': describe(metrics['goals_achievement'], group),
+                'competency_scores': {
+                    name: describe(summary, group)
+                    for name, summary in competencies.items()
+                    if summary['count'][group]
+                }
+            })
+
+        return {
+            'group_by': group_by.value,
+            'reviews': int(mask.sum()),
+            'groups': results
+        }
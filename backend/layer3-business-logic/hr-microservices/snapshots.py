@@ -0,0 +1,177 @@
+"""
+AQLHR State Snapshots
+=====================
+
+Binary snapshots of the employee service's in-memory state (stores and
+derived indexes), so an in-memory instance restarts by loading one file
+instead of re-creating records and rebuilding every index.
+
+A snapshot file is a fixed-size preamble, a JSON metadata header and a
+pickle (protocol 5) payload. Files are written to a temporary name and
+renamed into place, so a crash mid-write leaves the previous snapshot
+intact. Reads memory-map the file and unpickle straight from the mapping,
+without copying the payload into a bytes object first.
+
+The cyclic garbage collector is paused while pickling and unpickling:
+restoring creates millions of long-lived objects, and the collections they
+would trigger otherwise take most of the restore time.
+
+Pickling a large state takes seconds, so it runs in a thread while
+SnapshotGate holds state changes back; the event loop keeps serving reads
+meanwhile.
+"""
+
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, NamedTuple, Tuple
+import asyncio
+import gc
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"AQLHRSNP"
+SNAPSHOT_FORMAT = 1
+# magic, format, header length, payload length
+_PREAMBLE = struct.Struct("<8sIIQ")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, truncated or of another format"""
+
+
+class Snapshot(NamedTuple):
+    """An encoded snapshot: metadata plus the pickled state"""
+    meta: Dict[str, Any]
+    payload: bytes
+    encoded_at: float
+
+
+# Writers are serialized, and a snapshot never replaces a newer one written
+# by this process (e.g. a slow periodic write finishing after shutdown's)
+_write_lock = threading.Lock()
+_written: Dict[str, float] = {}
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class SnapshotGate:
+    """Keeps the state still while a snapshot of it is pickled.
+
+    Code that changes the state runs inside `changing()`; `paused()` waits
+    for the changes in flight, then holds new ones back until it exits.
+    Neither nests: a change must not wait on a pause, nor a pause on a
+    change.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._changing = 0
+        self._paused = False
+
+    @asynccontextmanager
+    async def changing(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._paused)
+            self._changing += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._changing -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def paused(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._paused)
+            self._paused = True
+            try:
+                await self._condition.wait_for(lambda: not self._changing)
+            except BaseException:
+                self._paused = False
+                self._condition.notify_all()
+                raise
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._paused = False
+                self._condition.notify_all()
+
+
+def encode_snapshot(state: Any, meta: Dict[str, Any]) -> Snapshot:
+    """Pickle `state`. Nothing may change it meanwhile (see SnapshotGate);
+    writing the result needs no such care."""
+    started = time.perf_counter()
+    with _gc_paused():
+        payload = pickle.dumps(state, protocol=5)
+    return Snapshot(
+        {**meta, 'encode_seconds': round(time.perf_counter() - started, 3)}, payload, time.monotonic()
+    )
+
+
+def write_snapshot(path: str, snapshot: Snapshot) -> int:
+    """Atomically replace the snapshot at `path`; returns the file size, or
+    0 when a newer snapshot has been written there meanwhile"""
+    header = json.dumps(snapshot.meta, default=str).encode('utf-8')
+    with _write_lock:
+        if snapshot.encoded_at < _written.get(path, 0.0):
+            return 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(header), len(snapshot.payload)))
+            f.write(header)
+            f.write(snapshot.payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+        _written[path] = snapshot.encoded_at
+    size = _PREAMBLE.size + len(header) + len(snapshot.payload)
+    logger.info(f"Wrote {size} byte snapshot to {path}")
+    return size
+
+
+def _read_preamble(view: Any, path: str) -> Tuple[int, int]:
+    if len(view) < _PREAMBLE.size:
+        raise SnapshotError(f"{path} is not a snapshot file")
+    magic, version, header_length, payload_length = _PREAMBLE.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError(f"{path} is not a snapshot file")
+    if version != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"{path} has snapshot format {version}, expected {SNAPSHOT_FORMAT}")
+    if len(view) < _PREAMBLE.size + header_length + payload_length:
+        raise SnapshotError(f"{path} is truncated")
+    return header_length, payload_length
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, Any], Any]:
+    """(metadata, state) of the snapshot at `path`"""
+    if not os.path.exists(path):
+        raise SnapshotError(f"No snapshot at {path}")
+    if not os.path.getsize(path):
+        raise SnapshotError(f"{path} is empty")
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        header_length, payload_length = _read_preamble(mapped, path)
+        start = _PREAMBLE.size + header_length
+        meta = json.loads(mapped[_PREAMBLE.size:start])
+        with memoryview(mapped) as view, view[start:start + payload_length] as payload:
+            with _gc_paused():
+                state = pickle.loads(payload)
+    return meta, state
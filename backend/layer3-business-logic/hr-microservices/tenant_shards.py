@@ -0,0 +1,277 @@
+"""
+AQLHR Tenant Shards
+===================
+
+Runs the employee service as one worker process per tenant (establishment),
+behind a stateless router that forwards every request to its tenant's
+shard. A shard holds exactly one tenant, so every listing, statistic,
+export, payroll run and Nitaqat figure it serves is that tenant's alone,
+and it refuses requests naming any other tenant. Shards keep their own
+storage, job queue, change feed, payroll runs and snapshot under
+SHARD_DATA_DIR/shard-N; only the employee number sequence file is shared,
+so numbers stay unique across shards.
+
+The router holds no state, so it can itself run with several uvicorn
+workers. Requests name their tenant in the X-Establishment-ID header (or an
+establishment_id query parameter); requests without one, or for a tenant
+with no shard, are rejected. Tenants come from EMPLOYEE_TENANTS (shard N
+is the Nth) or TENANT_SHARDS_PATH ({tenant: shard}).
+
+Usage:
+    python tenant_shards.py
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+TENANT_HEADER = "X-Establishment-ID"
+TENANT_PARAM = "establishment_id"
+
+# Connection-level headers that must not be forwarded by a proxy
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade', 'host'
+}
+
+
+class ShardMap:
+    """tenant -> shard number, one tenant per shard numbered 0 to N-1"""
+
+    def __init__(self, tenants: Dict[str, int]):
+        if sorted(tenants.values()) != list(range(len(tenants))):
+            raise ValueError(f"Tenants must hold one shard each, numbered 0-{len(tenants) - 1}: {tenants}")
+        self.tenants = dict(tenants)
+        self.shards = len(tenants)
+        self.tenant_of = {shard: tenant for tenant, shard in tenants.items()}
+
+    @classmethod
+    def from_tenants(cls, tenants: Iterable[str]) -> "ShardMap":
+        """Shard N for the Nth tenant"""
+        return cls({tenant: shard for shard, tenant in enumerate(tenants)})
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, tenants: Optional[str] = None) -> "ShardMap":
+        """Shard map from a JSON file {tenant: shard}, else from a
+        comma-separated tenant list; empty when neither is given"""
+        if path:
+            with open(path, encoding='utf-8') as f:
+                return cls({str(tenant): int(shard) for tenant, shard in json.load(f).items()})
+        return cls.from_tenants(tenant.strip() for tenant in (tenants or "").split(",") if tenant.strip())
+
+    def owner(self, tenant: str) -> Optional[int]:
+        """The tenant's shard, or None if it has none"""
+        return self.tenants.get(tenant)
+
+
+def shard_urls(shards: int, base_port: int, host: str = "127.0.0.1") -> List[str]:
+    return [f"http://{host}:{base_port + shard}" for shard in range(shards)]
+
+
+def shard_environment(
+    shard: int,
+    tenant: str,
+    data_dir: str,
+    base: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    """Environment of one shard worker: its tenant, its own data files and
+    the shared sequences"""
+    directory = os.path.join(data_dir, f"shard-{shard}")
+    os.makedirs(directory, exist_ok=True)
+    environment = dict(os.environ if base is None else base)
+    environment.update({
+        'SHARD_ID': str(shard),
+        'SHARD_TENANT': tenant,
+        # The shard's Nitaqat figures are its tenant's establishment
+        'ESTABLISHMENT_ID': tenant,
+        'EMPLOYEE_DB_PATH': os.path.join(directory, "employees.db"),
+        'JOB_QUEUE_PATH': os.path.join(directory, "employee_jobs.db"),
+        'CHANGE_FEED_DIR': os.path.join(directory, "employee_changes"),
+        'PAYROLL_RUNS_DIR': os.path.join(directory, "payroll_runs"),
+        'SNAPSHOT_PATH': os.path.join(directory, "employee_state.snapshot"),
+        'EMPLOYEE_SEQUENCE_PATH': os.path.join(data_dir, "employee_sequences.db"),
+    })
+    return environment
+
+
+class ShardSupervisor:
+    """Starts one uvicorn process per shard, waits for them to be healthy
+    and stops them again"""
+
+    def __init__(self, shard_map: ShardMap, base_port: int, data_dir: str, host: str = "127.0.0.1"):
+        self.shard_map = shard_map
+        self.shards = shard_map.shards
+        self.base_port = base_port
+        self.data_dir = data_dir
+        self.host = host
+        self.processes: List[subprocess.Popen] = []
+
+    @property
+    def urls(self) -> List[str]:
+        return shard_urls(self.shards, self.base_port, self.host)
+
+    def start(self, timeout: float = 60.0) -> None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for shard in range(self.shards):
+            self.processes.append(subprocess.Popen(
+                [
+                    sys.executable, "-m", "uvicorn", "employee_service:app",
+                    "--host", self.host, "--port", str(self.base_port + shard),
+                    "--log-level", "warning"
+                ],
+                cwd=directory,
+                env=shard_environment(shard, self.shard_map.tenant_of[shard], self.data_dir)
+            ))
+
+        deadline = time.monotonic() + timeout
+        for shard, url in enumerate(self.urls):
+            while True:
+                if self.processes[shard].poll() is not None:
+                    self.stop()
+                    raise RuntimeError(f"Shard {shard} exited during startup")
+                try:
+                    if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError(f"Shard {shard} did not become healthy within {timeout}s")
+                time.sleep(0.1)
+        logger.info(f"Started {self.shards} employee service shards from port {self.base_port}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+
+def _forward_headers(headers) -> Dict[str, str]:
+    return {name: value for name, value in headers.items() if name.lower() not in HOP_BY_HOP_HEADERS}
+
+
+def create_router(shard_map: ShardMap, clients: List[httpx.AsyncClient]) -> FastAPI:
+    """Router app forwarding each request to its tenant's shard client"""
+    if len(clients) != shard_map.shards:
+        raise ValueError(f"Expected {shard_map.shards} shard clients, got {len(clients)}")
+    router = FastAPI(title="AQLHR Employee Shard Router")
+
+    @router.on_event("shutdown")
+    async def close_clients():
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+    @router.get("/health")
+    async def health_check():
+        """Health of every shard, plus the total employee count"""
+        async def shard_health(shard: int) -> Dict[str, Any]:
+            try:
+                response = await clients[shard].get("/health")
+                return {'shard': shard, **response.json()}
+            except httpx.HTTPError as e:
+                return {'shard': shard, 'status': 'unreachable', 'error': str(e)}
+
+        shards = await asyncio.gather(*(shard_health(shard) for shard in range(shard_map.shards)))
+        return {
+            'status': "healthy" if all(shard.get('status') == "healthy" for shard in shards) else "degraded",
+            'service': "employee-shard-router",
+            'total_employees': sum(shard.get('total_employees', 0) for shard in shards),
+            'shards': shards
+        }
+
+    @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE"])
+    async def forward(path: str, request: Request):
+        """Stream the request to the tenant's shard and its response back"""
+        tenant = request.headers.get(TENANT_HEADER) or request.query_params.get(TENANT_PARAM)
+        if not tenant:
+            raise HTTPException(status_code=400, detail=f"{TENANT_HEADER} header is required")
+        shard = shard_map.owner(tenant)
+        if shard is None:
+            raise HTTPException(status_code=404, detail=f"Unknown establishment: {tenant}")
+        client = clients[shard]
+        # The shard checks the header, so name the tenant there even when
+        # it came as a query parameter
+        headers = _forward_headers(request.headers)
+        headers = {name: value for name, value in headers.items() if name.lower() != TENANT_HEADER.lower()}
+        headers[TENANT_HEADER] = tenant
+        upstream = client.build_request(
+            request.method,
+            f"/{path}",
+            params=[(key, value) for key, value in request.query_params.multi_items() if key != TENANT_PARAM],
+            headers=headers,
+            content=request.stream()
+        )
+        try:
+            response = await client.send(upstream, stream=True)
+        except httpx.TransportError as e:
+            raise HTTPException(status_code=502, detail=f"Shard unavailable: {e}")
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers=_forward_headers(response.headers),
+            background=BackgroundTask(response.aclose)
+        )
+
+    return router
+
+
+TENANT_SHARDS = ShardMap.load(os.getenv("TENANT_SHARDS_PATH") or None, os.getenv("EMPLOYEE_TENANTS"))
+SHARD_BASE_PORT = int(os.getenv("SHARD_BASE_PORT", 8101))
+
+# Router app for `uvicorn tenant_shards:app`; SHARD_URLS (comma-separated,
+# in shard order) points it at shards started elsewhere instead of the
+# local ports
+SHARD_URLS = (
+    os.environ["SHARD_URLS"].split(",") if os.getenv("SHARD_URLS")
+    else shard_urls(TENANT_SHARDS.shards, SHARD_BASE_PORT)
+)
+app = create_router(
+    TENANT_SHARDS,
+    [
+        httpx.AsyncClient(base_url=url, timeout=float(os.getenv("SHARD_TIMEOUT", 30)))
+        for url in SHARD_URLS
+    ]
+)
+
+
+def main() -> None:
+    """Start the shard workers, then serve the router until interrupted"""
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    if not TENANT_SHARDS.shards:
+        raise SystemExit("No tenants: set EMPLOYEE_TENANTS or TENANT_SHARDS_PATH")
+    supervisor = ShardSupervisor(
+        TENANT_SHARDS, SHARD_BASE_PORT, os.getenv("SHARD_DATA_DIR", "shard_data")
+    )
+    supervisor.start()
+    try:
+        uvicorn.run(
+            "tenant_shards:app",
+            host="0.0.0.0",
+            port=int(os.getenv("SHARD_ROUTER_PORT", 8001)),
+            workers=int(os.getenv("SHARD_ROUTER_WORKERS", 1))
+        )
+    finally:
+        supervisor.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Tests for the employee change feed and GET /employees/changes"""
+
+import pytest
+
+from change_feed import ChangeFeed, ChangeFeedGap
+from conftest import employee_row
+
+
+def test_ring_drops_the_oldest_changes():
+    feed = ChangeFeed(capacity=4)
+    for i in range(10):
+        feed.append('created', f"e{i}")
+
+    assert [change['employee_id'] for change in feed.read(6)] == ["e6", "e7", "e8", "e9"]
+    assert [change['seq'] for change in feed.read(6, limit=2)] == [7, 8]
+    with pytest.raises(ChangeFeedGap):
+        feed.read(5)
+    with pytest.raises(ChangeFeedGap):
+        feed.read(11)
+
+
+def test_segments_reach_past_the_ring_and_survive_restarts(tmp_path):
+    feed = ChangeFeed(capacity=4, segment_dir=str(tmp_path), segment_size=3)
+    for i in range(10):
+        feed.append('created', f"e{i}")
+    feed.close()
+
+    assert [change['seq'] for change in feed.read(0, limit=5)] == [1, 2, 3, 4, 5]
+    restarted = ChangeFeed(capacity=4, segment_dir=str(tmp_path), segment_size=3)
+    assert restarted.append('updated', "e0") == 11
+    assert [change['employee_id'] for change in restarted.read(8)] == ["e8", "e9", "e0"]
+    restarted.close()
+
+
+def test_advance_to_leaves_a_gap_behind():
+    feed = ChangeFeed()
+    feed.advance_to(40)
+
+    assert feed.append('created', "e1") == 41
+    with pytest.raises(ChangeFeedGap):
+        feed.read(39)
+
+
+def test_changes_endpoint_pages_through_employee_changes(client):
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(1, 4)]).raise_for_status()
+    employee = client.get("/employees").json()[0]
+    client.put(f"/employees/{employee['id']}", json={'position_title': "Lead"}).raise_for_status()
+
+    first = client.get("/employees/changes", params={'limit': 3}).json()
+    rest = client.get("/employees/changes", params={'since': first['next_since']}).json()
+    changes = first['changes'] + rest['changes']
+
+    assert [change['seq'] for change in changes] == list(range(1, rest['latest_seq'] + 1))
+    assert [change['op'] for change in changes if change['op'] in ('created', 'updated')] == [
+        'created', 'created', 'created', 'updated'
+    ]
+    assert changes[-1]['employee_id'] == employee['id']
+    assert 'position_title' in changes[-1]['fields']
+
+
+def test_changes_endpoint_answers_410_for_a_gap(client, service, monkeypatch):
+    monkeypatch.setattr(service, "change_feed", ChangeFeed(capacity=4))
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(1, 4)]).raise_for_status()
+    latest = service.change_feed.last_seq
+
+    assert client.get("/employees/changes", params={'since': 0}).status_code == 410
+    assert client.get("/employees/changes", params={'since': latest + 5}).status_code == 410
+    assert client.get("/employees/changes", params={'since': latest - 1}).json()['latest_seq'] == latest
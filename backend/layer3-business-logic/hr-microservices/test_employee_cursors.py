@@ -0,0 +1,51 @@
+"""Tests for keyset (cursor) pagination of GET /employees"""
+
+from conftest import employee_row
+
+
+def read_all(client, **params):
+    """Emails of every page from an empty cursor on, and the page sizes"""
+    emails, sizes, cursor = [], [], ""
+    while cursor is not None:
+        response = client.get("/employees", params={**params, 'cursor': cursor})
+        response.raise_for_status()
+        page = response.json()
+        emails += [employee['email'] for employee in page]
+        sizes.append(len(page))
+        cursor = response.headers.get("X-Next-Cursor")
+    return emails, sizes
+
+
+def test_cursor_pages_cover_every_employee_once(client):
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(1, 11)]).raise_for_status()
+
+    emails, sizes = read_all(client, limit=4)
+    # A batch shares one created_at, so its rows come in id order
+    assert sorted(emails) == sorted(f"employee{seq}@example.sa" for seq in range(1, 11))
+    assert sizes == [4, 4, 2]
+
+
+def test_cursor_pages_apply_filters(client):
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(1, 21)]).raise_for_status()
+
+    emails, _ = read_all(client, limit=2, department_id="IT", is_saudi=True)
+    # IT holds rows 1, 5, 9, 13 and 17; rows 9 and 15 are not Saudi
+    assert sorted(emails) == sorted(f"employee{seq}@example.sa" for seq in (1, 5, 13, 17))
+
+
+def test_pages_do_not_shift_when_employees_are_added(client):
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(1, 5)]).raise_for_status()
+
+    first = client.get("/employees", params={'cursor': "", 'limit': 2})
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(5, 7)]).raise_for_status()
+    rest = client.get("/employees", params={'cursor': first.headers["X-Next-Cursor"], 'limit': 10})
+
+    seen = [employee['email'] for employee in first.json() + rest.json()]
+    assert sorted(seen) == sorted(f"employee{seq}@example.sa" for seq in range(1, 7))
+    # The later batch comes after everything listed before it
+    assert {employee['email'] for employee in rest.json()[-2:]} == {"employee5@example.sa", "employee6@example.sa"}
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/employees", params={'cursor': "not-a-cursor"}).status_code == 400
@@ -0,0 +1,53 @@
+"""Tests for the bitmap filter index and the listings it serves"""
+
+import pytest
+
+from conftest import employee_row
+from employee_indexes import BitmapIndex, _nth_set_bit
+
+
+@pytest.fixture
+def index():
+    index = BitmapIndex(['department_id', 'status'])
+    for i in range(10):
+        index.add(f"e{i}", {'department_id': "IT" if i % 2 else "HR", 'status': "active"})
+    return index
+
+
+def test_query_intersects_field_bitmaps(index):
+    index.update("e3", 'status', "active", "terminated")
+
+    assert index.page(index.query(department_id="IT")) == ["e1", "e3", "e5", "e7", "e9"]
+    assert index.page(index.query(department_id="IT", status="active")) == ["e1", "e5", "e7", "e9"]
+    assert index.page(index.query(department_id="Finance")) == []
+
+
+def test_page_skips_and_limits(index):
+    bits = index.query(department_id="HR")
+
+    assert index.page(bits, skip=1, limit=2) == ["e2", "e4"]
+    assert index.page(bits, skip=5) == []
+    assert list(index.iter_rows(bits)) == ["e0", "e2", "e4", "e6", "e8"]
+
+
+def test_negative_skip_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.page(index.query(), skip=-1)
+    with pytest.raises(ValueError):
+        _nth_set_bit(0b1011, -1)
+    assert _nth_set_bit(0b1011, 2) == 3
+
+
+def test_list_employees_filters(client):
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(1, 13)]).raise_for_status()
+
+    employees = client.get("/employees", params={'department_id': "IT", 'is_saudi': True}).json()
+    # IT holds rows 1, 5 and 9, and row 9 is not Saudi
+    assert [employee['email'] for employee in employees] == ["employee1@example.sa", "employee5@example.sa"]
+    page = client.get("/employees", params={'skip': 10, 'limit': 5}).json()
+    assert [employee['email'] for employee in page] == ["employee11@example.sa", "employee12@example.sa"]
+
+
+def test_list_employees_validates_skip_and_limit(client):
+    assert client.get("/employees", params={'skip': -1}).status_code == 422
+    assert client.get("/employees", params={'limit': 0}).status_code == 422
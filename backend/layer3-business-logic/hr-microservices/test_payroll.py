@@ -0,0 +1,90 @@
+"""Tests for payroll runs"""
+
+from datetime import date
+
+import pytest
+
+from conftest import employee_row
+from payroll import MAX_CONTRIBUTORY_SALARY, OPEN_ENDED, compute_run, period_bounds
+
+RATES = {'housing': 0.25, 'transport': 0.10}
+
+
+def run_for(period, intervals, salaries=(9000.0, 6000.0)):
+    """compute_run for employees e0, e1, ... with (row, start, end) intervals"""
+    rows, starts, ends = zip(*intervals) if intervals else ((), (), ())
+    ids = [f"e{i}" for i in range(len(salaries))]
+    return compute_run(
+        period, ids, [f"EMP-{i}" for i in range(len(salaries))], ["IT"] * len(salaries), salaries,
+        rows, starts, ends, RATES, "test"
+    )
+
+
+def ordinal(year, month, day):
+    return date(year, month, day).toordinal()
+
+
+def test_period_bounds():
+    assert period_bounds("2024-02") == (ordinal(2024, 2, 1), ordinal(2024, 3, 1))
+    with pytest.raises(ValueError):
+        period_bounds("2024-13")
+
+
+def test_full_month_pay_and_deductions():
+    run = run_for("2024-04", [(0, ordinal(2020, 1, 1), OPEN_ENDED)], salaries=(10000.0,))
+    payslip = run.payslip("e0")
+
+    assert payslip['days_paid'] == 30
+    assert payslip['basic_salary'] == 10000.0
+    assert payslip['gross_pay'] == 13500.0
+    assert payslip['gosi_employee'] == 1350.0
+    assert payslip['net_pay'] == 12150.0
+
+
+def test_joiners_and_leavers_are_prorated():
+    run = run_for("2024-03", [
+        # Joined on the 11th: 21 of 31 days
+        (0, ordinal(2024, 3, 11), OPEN_ENDED),
+        # Left after the 15th, then rejoined on the 25th: 15 + 7 days
+        (1, ordinal(2023, 1, 1), ordinal(2024, 3, 16)),
+        (1, ordinal(2024, 3, 25), OPEN_ENDED),
+    ])
+
+    assert run.payslip("e0")['days_paid'] == 21
+    assert run.payslip("e0")['basic_salary'] == round(9000 * 21 / 31, 2)
+    assert run.payslip("e1")['days_paid'] == 22
+
+
+def test_employees_without_a_day_in_the_period_are_left_out():
+    run = run_for("2024-03", [(0, ordinal(2024, 4, 1), OPEN_ENDED), (1, ordinal(2023, 1, 1), ordinal(2024, 3, 1))])
+
+    assert len(run) == 0
+    assert run.payslip("e0") is None
+
+
+def test_contributory_salary_is_capped():
+    run = run_for("2024-04", [(0, ordinal(2020, 1, 1), OPEN_ENDED)], salaries=(60000.0,))
+
+    assert run.payslip("e0")['contributory_salary'] == MAX_CONTRIBUTORY_SALARY
+
+
+def test_payroll_run_pays_for_days_employed(client):
+    created = [
+        client.post("/employees", json=employee_row(1, hire_date="2024-03-11")).json(),
+        client.post("/employees", json=employee_row(2, hire_date="2024-01-01")).json(),
+    ]
+    client.delete(f"/employees/{created[1]['id']}", params={'effective_date': "2024-05-16"}).raise_for_status()
+
+    def days_paid(period):
+        run = client.post("/payroll/runs", params={'period': period}).json()
+        return {
+            employee['id']: client.get(f"/payroll/runs/{run['id']}/payslips/{employee['id']}").json().get('days_paid')
+            for employee in created
+        }
+
+    first, leaver = created[0]['id'], created[1]['id']
+    assert days_paid("2024-02") == {first: None, leaver: 29}
+    assert days_paid("2024-03") == {first: 21, leaver: 31}
+    assert days_paid("2024-05") == {first: 31, leaver: 15}
+    assert days_paid("2024-06") == {first: 30, leaver: None}
+    assert client.post("/payroll/runs", params={'period': "2024"}).status_code == 400
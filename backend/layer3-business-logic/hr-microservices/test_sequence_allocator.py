@@ -0,0 +1,78 @@
+"""Tests for block-leased employee number allocation"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from conftest import employee_row
+from employee_service import DuplicateEmployeeError, EmployeeCreate, EmployeeService
+from sequence_allocator import BlockSequenceAllocator
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sequences.db")
+
+
+def test_processes_lease_disjoint_blocks(path):
+    first = BlockSequenceAllocator(path, block_size=10)
+    second = BlockSequenceAllocator(path, block_size=10)
+
+    assert first.allocate("EMP") == range(1, 2)
+    assert second.allocate("EMP") == range(11, 12)
+    assert first.allocate("EMP", 3) == range(2, 5)
+    # Larger than a block: a dedicated lease
+    assert second.allocate("EMP", 25) == range(21, 46)
+    first.close()
+    second.close()
+
+
+def test_restart_skips_the_unused_rest_of_a_block(path):
+    allocator = BlockSequenceAllocator(path, block_size=10)
+    allocator.allocate("EMP", 4)
+    allocator.close()
+
+    allocator = BlockSequenceAllocator(path, block_size=10)
+    assert allocator.allocate("EMP") == range(11, 12)
+    allocator.close()
+
+
+def test_advance_to_drops_a_block_behind_it(path):
+    allocator = BlockSequenceAllocator(path, block_size=10)
+    allocator.allocate("EMP")
+    allocator.advance_to("EMP", 500)
+
+    assert allocator.allocate("EMP") == range(500, 501)
+    allocator.advance_to("EMP", 20)
+    assert allocator.allocate("EMP") == range(501, 502)
+    allocator.close()
+
+
+def test_reindexing_never_reissues_persisted_numbers(service, client):
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(1, 4)]).raise_for_status()
+    # A fresh sequence file, as if it had been lost
+    service.employee_number_allocator.close()
+    service.open_sequence_allocator(service.employee_number_allocator.path + ".new")
+    service.rebuild_indexes()
+
+    created = client.post("/employees", json=employee_row(4)).json()
+    assert created['employee_number'] == f"EMP-{datetime.now().year}-0004"
+
+
+def test_concurrent_creates_cannot_share_a_national_id(service, tmp_path):
+    # One number per lease, so every create awaits the allocator thread
+    service.employee_number_allocator.close()
+    service.employee_number_allocator = BlockSequenceAllocator(str(tmp_path / "one.db"), block_size=1)
+
+    async def create_twice():
+        return await asyncio.gather(
+            EmployeeService.create_employee(EmployeeCreate(**employee_row(1)), "test"),
+            EmployeeService.create_employee(EmployeeCreate(**employee_row(2, national_id="1000000001")), "test"),
+            return_exceptions=True
+        )
+
+    created, duplicate = sorted(asyncio.run(create_twice()), key=lambda result: isinstance(result, Exception))
+    assert created.national_id == "1000000001"
+    assert isinstance(duplicate, DuplicateEmployeeError)
+    assert len(service.employees_db) == 1
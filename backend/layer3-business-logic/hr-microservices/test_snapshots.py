@@ -0,0 +1,99 @@
+"""Tests for snapshot files, the snapshot gate and restoring the service"""
+
+import asyncio
+
+import pytest
+
+from conftest import employee_row
+from snapshots import SnapshotError, SnapshotGate, encode_snapshot, read_snapshot, write_snapshot
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "state.snapshot")
+    size = write_snapshot(path, encode_snapshot({'rows': [1, 2, 3]}, {'employees': 3}))
+
+    meta, state = read_snapshot(path)
+    assert size == (tmp_path / "state.snapshot").stat().st_size
+    assert meta['employees'] == 3
+    assert state == {'rows': [1, 2, 3]}
+
+
+def test_an_older_snapshot_never_replaces_a_newer_one(tmp_path):
+    path = str(tmp_path / "state.snapshot")
+    older = encode_snapshot("older", {})
+    write_snapshot(path, encode_snapshot("newer", {}))
+
+    assert write_snapshot(path, older) == 0
+    assert read_snapshot(path)[1] == "newer"
+
+
+def test_damaged_snapshots_are_rejected(tmp_path):
+    path = tmp_path / "state.snapshot"
+    write_snapshot(str(path), encode_snapshot(list(range(1000)), {}))
+    path.write_bytes(path.read_bytes()[:-10])
+
+    with pytest.raises(SnapshotError, match="truncated"):
+        read_snapshot(str(path))
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path))
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(tmp_path / "missing.snapshot"))
+
+
+def test_gate_holds_changes_while_paused():
+    async def scenario():
+        gate = SnapshotGate()
+        events = []
+
+        async def change():
+            async with gate.changing():
+                events.append("changed")
+
+        async with gate.paused():
+            task = asyncio.create_task(change())
+            await asyncio.sleep(0.01)
+            events.append("pickled")
+        await task
+        return events
+
+    assert asyncio.run(scenario()) == ["pickled", "changed"]
+
+
+def test_gate_pause_waits_for_changes_in_flight():
+    async def scenario():
+        gate = SnapshotGate()
+        events = []
+
+        async def change():
+            async with gate.changing():
+                await asyncio.sleep(0.01)
+                events.append("changed")
+
+        task = asyncio.create_task(change())
+        await asyncio.sleep(0)
+        async with gate.paused():
+            events.append("pickled")
+        await task
+        return events
+
+    assert asyncio.run(scenario()) == ["changed", "pickled"]
+
+
+def test_restore_replays_changes_after_the_snapshot(service, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "SNAPSHOT_PATH", str(tmp_path / "state.snapshot"))
+    client.post("/employees/bulk", json=[employee_row(seq) for seq in range(1, 4)]).raise_for_status()
+    saved = asyncio.run(service.save_snapshot())
+    added = client.post("/employees", json=employee_row(4)).json()
+    first = client.get("/employees").json()[0]
+    client.put(f"/employees/{first['id']}", json={'position_title': "Lead"}).raise_for_status()
+    expected = client.get("/employees/statistics/summary").json()
+
+    restored = service.restore_snapshot(service.SNAPSHOT_PATH)
+
+    assert saved['employees'] == 3
+    assert restored['replayed'] == service.change_feed.last_seq - saved['change_seq'] > 0
+    assert service.last_snapshot['replayed'] == restored['replayed']
+    assert client.get(f"/employees/{added['id']}").json()['employee_number'] == added['employee_number']
+    assert client.get(f"/employees/{first['id']}").json()['position_title'] == "Lead"
+    assert client.get("/employees/statistics/summary").json() == expected
@@ -0,0 +1,88 @@
+"""Tests for the tenant shard environment and router"""
+
+import json
+import os
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import employee_service
+from tenant_shards import ShardMap, create_router, shard_environment
+
+
+def test_shards_get_their_own_snapshot_files(tmp_path):
+    base = {'SNAPSHOT_PATH': "/app/data/employee_state.snapshot"}
+    first = shard_environment(0, "est-a", str(tmp_path), base)
+    second = shard_environment(1, "est-b", str(tmp_path), base)
+
+    assert first['SNAPSHOT_PATH'] != second['SNAPSHOT_PATH']
+    assert first['SNAPSHOT_PATH'] == os.path.join(tmp_path, "shard-0", "employee_state.snapshot")
+    assert second['SNAPSHOT_PATH'] == os.path.join(tmp_path, "shard-1", "employee_state.snapshot")
+
+
+def test_shards_share_only_the_sequence_file(tmp_path):
+    first = shard_environment(0, "est-a", str(tmp_path), {})
+    second = shard_environment(1, "est-b", str(tmp_path), {})
+
+    per_shard = {'SHARD_ID', 'SHARD_TENANT', 'ESTABLISHMENT_ID'}
+    shared = {name for name in first if name not in per_shard and first[name] == second[name]}
+    assert shared == {'EMPLOYEE_SEQUENCE_PATH'}
+    assert (first['SHARD_TENANT'], second['SHARD_TENANT']) == ("est-a", "est-b")
+
+
+def test_shard_map_holds_one_tenant_per_shard(tmp_path):
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps({"est-a": 1, "est-b": 0}))
+
+    assert ShardMap.load(tenants="est-a, est-b").tenants == {"est-a": 0, "est-b": 1}
+    assert ShardMap.load(str(path)).tenant_of == {0: "est-b", 1: "est-a"}
+    assert ShardMap.load().shards == 0
+    with pytest.raises(ValueError):
+        ShardMap({"est-a": 0, "est-b": 0})
+
+
+@pytest.fixture
+def router():
+    seen = []
+
+    def shard(number):
+        def handle(request):
+            seen.append((number, request.url.path, dict(request.url.params), request.headers.get("x-establishment-id")))
+            # Streamed like a real shard's response, which the router relays
+            body = json.dumps({'shard': number}).encode()
+            return httpx.Response(200, headers={'content-type': "application/json"}, stream=httpx.ByteStream(body))
+        return httpx.AsyncClient(transport=httpx.MockTransport(handle), base_url=f"http://shard-{number}")
+
+    app = create_router(ShardMap.from_tenants(["est-a", "est-b"]), [shard(0), shard(1)])
+    return TestClient(app), seen
+
+
+def test_router_forwards_to_the_tenant_shard(router):
+    client, seen = router
+
+    assert client.get("/employees", headers={'X-Establishment-ID': "est-b"}).json() == {'shard': 1}
+    assert client.get("/employees", params={'establishment_id': "est-a", 'limit': 5}).json() == {'shard': 0}
+    assert seen == [
+        (1, "/employees", {}, "est-b"),
+        # The query parameter becomes the header the shard checks
+        (0, "/employees", {'limit': "5"}, "est-a")
+    ]
+
+
+def test_router_rejects_unscoped_and_unknown_tenants(router):
+    client, seen = router
+
+    assert client.get("/employees").status_code == 400
+    assert client.get("/employees", headers={'X-Establishment-ID': "est-z"}).status_code == 404
+    assert seen == []
+
+
+def test_shard_refuses_other_tenants(monkeypatch):
+    monkeypatch.setattr(employee_service, "SHARD_TENANT", "est-a")
+    client = TestClient(employee_service.app)
+
+    assert client.get("/employees").status_code == 421
+    assert client.get("/employees", headers={'X-Establishment-ID': "est-b"}).status_code == 421
+    # Scoped requests reach the routes
+    assert client.get("/no-such-route", headers={'X-Establishment-ID': "est-a"}).status_code == 404